@@ -11,6 +11,9 @@ from pydantic import BaseModel
 # API key header
 api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
 
+# Role of service accounts whose tool calls run as batch work
+BATCH_ROLE = "batch"
+
 
 class User(BaseModel):
     """User model."""
@@ -23,6 +26,7 @@ class User(BaseModel):
 # Mock user database
 users = {
     "test-api-key": User(id="user1", name="Test User", roles=["admin"]),
+    "test-batch-api-key": User(id="batch1", name="Test Batch User", roles=[BATCH_ROLE]),
 }
 
 
@@ -2,16 +2,39 @@
 Main FastAPI application.
 """
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.routes import router as api_router
+from app.api.routes.tools import db as tool_db
+from app.api.routes.tools import executor as tool_executor
+from app.api.routes.tools import registry as tool_registry
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Application lifespan.
+    
+    Initializes tool adapters before serving traffic, follows tool changes made by
+    other workers, and releases everything on shutdown.
+    """
+    await tool_registry.start_sync()
+    await tool_executor.warm_up("all")
+    yield
+    await tool_registry.stop_sync()
+    await tool_executor.shutdown()
+    await tool_db.close()
+
 
 # Create FastAPI app
 app = FastAPI(
     title="LYRAIOS API",
     description="API for the LYRAIOS AI Operating System",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # Add CORS middleware
@@ -2,23 +2,141 @@
 API routes for the Tool Integration Protocol.
 """
 
-from typing import Any, Dict, List, Optional
+import asyncio
+import json
+from typing import Any, Awaitable, Dict, List, Optional, TypeVar
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 
-from app.api.auth import get_current_user
-from app.db.memory import MemoryDatabase
-from app.tools.protocol.executor import ToolExecutionError, ToolExecutor
-from app.tools.protocol.models import ToolImplementation, ToolManifest, ValidationResult
+from app.api.auth import BATCH_ROLE, User, get_current_user
+from app.db.search import DEFAULT_SEARCH_LIMIT, MAX_SEARCH_LIMIT, MODE_AND, MODE_OR
+from app.db.sqlite_tools import SQLiteToolDatabase
+from app.tools.protocol.admission import PRIORITY_BATCH, PRIORITY_INTERACTIVE
+from app.tools.protocol.errors import (
+    CircuitOpenError,
+    PipelineError,
+    ToolQueueFullError,
+    ToolQueueTimeoutError,
+    ToolValidationError,
+)
+from app.tools.protocol.executor import ToolExecutor, ToolTimeoutError
+from app.tools.protocol.models import (
+    Pipeline,
+    ToolCall,
+    ToolImplementation,
+    ToolManifest,
+    ToolRegistration,
+    ValidationResult,
+)
 from app.tools.protocol.registry import ToolRegistry
 
 router = APIRouter()
 
-# Initialize database and registry
-db = MemoryDatabase()
+# Initialize database and registry; the catalog is shared by every worker process
+db = SQLiteToolDatabase()
 registry = ToolRegistry(db)
 executor = ToolExecutor(registry)
 
+# How often a running execution checks whether its client is still connected
+DISCONNECT_POLL_INTERVAL = 0.5
+
+# Query parameter choosing the priority class of a call
+PRIORITY_QUERY = Query(
+    None,
+    pattern=f"^({PRIORITY_INTERACTIVE}|{PRIORITY_BATCH})$",
+    description="Priority class; batch calls yield to interactive ones when the executor is busy"
+)
+
+T = TypeVar("T")
+
+
+def to_http_exception(error: Exception) -> HTTPException:
+    """
+    Map an execution error to an HTTP error.
+    
+    Args:
+        error: Error raised by the executor
+        
+    Returns:
+        HTTP exception
+    """
+    if isinstance(error, PipelineError):
+        return HTTPException(status_code=400, detail=str(error))
+    if isinstance(error, ToolValidationError):
+        return HTTPException(status_code=422, detail={"message": str(error), "errors": error.errors})
+    if isinstance(error, (ToolQueueFullError, ToolQueueTimeoutError)):
+        return HTTPException(status_code=429, detail=str(error))
+    if isinstance(error, CircuitOpenError):
+        return HTTPException(
+            status_code=503,
+            detail=str(error),
+            headers={"Retry-After": str(max(1, round(error.retry_after)))}
+        )
+    if isinstance(error, ToolTimeoutError):
+        return HTTPException(status_code=504, detail=str(error))
+    return HTTPException(status_code=500, detail=str(error))
+
+
+def get_priority(user: Optional[User], requested: Optional[str]) -> str:
+    """
+    Choose the priority class of a call.
+    
+    Users with the batch role always run as batch; others may ask for batch
+    priority, e.g. for background jobs, and otherwise run as interactive.
+    
+    Args:
+        user: Current user
+        requested: Priority class requested by the caller
+        
+    Returns:
+        Priority class
+    """
+    if user and BATCH_ROLE in user.roles:
+        return PRIORITY_BATCH
+    return requested or PRIORITY_INTERACTIVE
+
+
+def format_sse(data: Dict[str, Any], event: Optional[str] = None) -> str:
+    """
+    Format a server-sent event.
+    
+    Args:
+        data: Event data, sent as JSON
+        event: Event type, or None for the default `message` type
+        
+    Returns:
+        Encoded event
+    """
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data, default=str)}\n\n"
+
+
+async def run_until_disconnected(request: Request, awaitable: Awaitable[T]) -> T:
+    """
+    Await a call, cancelling it if the client disconnects first.
+    
+    Args:
+        request: Incoming request
+        awaitable: Call to await
+        
+    Returns:
+        Call result
+    """
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_INTERVAL)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                task.cancel()
+                # 499: client closed request; nobody receives this response
+                raise HTTPException(status_code=499, detail="Client disconnected")
+    finally:
+        if not task.done():
+            task.cancel()
+
 
 @router.post("/register", response_model=Dict[str, Any])
 async def register_tool(
@@ -43,6 +161,93 @@ async def register_tool(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/register-batch", response_model=List[Dict[str, Any]])
+async def register_tools(
+    tools: List[ToolRegistration] = Body(..., embed=True),
+    user = Depends(get_current_user)
+):
+    """
+    Register or update several tools in one request.
+    
+    Each result reports whether its tool was `created`, `updated`, `unchanged`
+    (same manifest and implementation as stored, so nothing was written) or
+    `invalid`, with validation errors, in the same order as the tools.
+    """
+    try:
+        results = await registry.register_many([(tool.manifest, tool.implementation) for tool in tools])
+        
+        return [result.dict() for result in results]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/execute-batch", response_model=List[Dict[str, Any]])
+async def execute_batch(
+    calls: List[ToolCall] = Body(..., embed=True),
+    priority: Optional[str] = PRIORITY_QUERY,
+    user = Depends(get_current_user)
+):
+    """
+    Execute several tool capabilities in one request.
+    
+    Calls run concurrently; each result reports its own success or error, in the
+    same order as the calls.
+    """
+    try:
+        results = await executor.execute_many(
+            calls,
+            user_id=user.id if user else None,
+            priority=get_priority(user, priority)
+        )
+        
+        return [result.dict() for result in results]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/execute-pipeline")
+async def execute_pipeline(
+    pipeline: Pipeline,
+    priority: Optional[str] = PRIORITY_QUERY,
+    user = Depends(get_current_user)
+):
+    """
+    Execute a graph of capability calls, streaming step results as server-sent events.
+    
+    Each finished step is sent as a `data` event, followed by an `end` event
+    reporting whether every step succeeded. A malformed pipeline is rejected
+    with 400 before any step runs.
+    """
+    try:
+        results = executor.execute_pipeline(
+            pipeline,
+            user_id=user.id if user else None,
+            priority=get_priority(user, priority)
+        )
+        first = await results.__anext__()
+    except Exception as e:
+        raise to_http_exception(e)
+    
+    async def events():
+        success = first.success
+        try:
+            yield format_sse(first.dict())
+            async for result in results:
+                success = success and result.success
+                yield format_sse(result.dict())
+            yield format_sse({"success": success}, event="end")
+        except Exception as e:
+            yield format_sse({"error": str(e), "error_type": type(e).__name__}, event="error")
+        finally:
+            await results.aclose()
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/list", response_model=List[Dict[str, Any]])
 async def list_tools(
     category: Optional[str] = Query(None, description="Filter by category"),
@@ -66,6 +271,65 @@ async def list_tools(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/search", response_model=Dict[str, Any])
+async def search_tools(
+    category: List[str] = Query([], description="Categories to match"),
+    tag: List[str] = Query([], description="Tags to match"),
+    author: List[str] = Query([], description="Authors to match"),
+    capability: List[str] = Query([], description="Capability IDs to match"),
+    status: List[str] = Query([], description="Statuses to match"),
+    mode: str = Query(MODE_AND, pattern=f"^({MODE_AND}|{MODE_OR})$", description="Match every value or any"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(DEFAULT_SEARCH_LIMIT, ge=1, le=MAX_SEARCH_LIMIT, description="Page size"),
+    summary: bool = Query(False, description="Return summary fields only"),
+    user = Depends(get_current_user)
+):
+    """
+    Search registered tools, one page at a time.
+    """
+    query = {"category": category, "tag": tag, "author": author, "capability": capability, "status": status}
+    try:
+        return await registry.search_tools(
+            {field: values for field, values in query.items() if values},
+            mode=mode,
+            cursor=cursor,
+            limit=limit,
+            summary=summary
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/metrics", response_model=Dict[str, Any])
+async def get_metrics(
+    user = Depends(get_current_user)
+):
+    """
+    Get tool execution metrics.
+    """
+    return executor.get_metrics()
+
+
+@router.get("/circuit-breakers", response_model=Dict[str, Dict[str, Any]])
+async def get_circuit_breakers(
+    user = Depends(get_current_user)
+):
+    """
+    Get the circuit breaker state of every tool that has been called.
+    """
+    return executor.circuit_breakers.get_stats()
+
+
+@router.get("/concurrency-limits", response_model=Dict[str, Optional[int]])
+async def get_concurrency_limits(
+    user = Depends(get_current_user)
+):
+    """
+    Get the current concurrency limit of every tool that has been called.
+    """
+    return executor.scheduler.get_concurrency_limits()
+
+
 @router.get("/{tool_id}", response_model=Dict[str, Any])
 async def get_tool(
     tool_id: str,
@@ -104,14 +368,19 @@ async def delete_tool(
 
 @router.post("/{tool_id}/capabilities/{capability_id}/execute", response_model=Dict[str, Any])
 async def execute_capability(
+    request: Request,
     tool_id: str,
     capability_id: str,
     parameters: Dict[str, Any],
     context: Optional[Dict[str, Any]] = None,
+    timeout: Optional[float] = Query(None, gt=0, description="Time budget in seconds"),
+    priority: Optional[str] = PRIORITY_QUERY,
     user = Depends(get_current_user)
 ):
     """
     Execute a tool capability.
+    
+    The execution is cancelled if the client disconnects before it finishes.
     """
     try:
         # Get tool
@@ -120,16 +389,81 @@ async def execute_capability(
             raise HTTPException(status_code=404, detail=f"Tool not found: {tool_id}")
         
         # Execute capability
-        result = await executor.execute(
+        result = await run_until_disconnected(request, executor.execute(
             tool_id=tool_id,
             capability_id=capability_id,
             parameters=parameters,
             context=context or {},
-            user_id=user.id if user else None
-        )
+            user_id=user.id if user else None,
+            timeout=timeout,
+            priority=get_priority(user, priority)
+        ))
         
         return result
-    except ToolExecutionError as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise to_http_exception(e)
+
+
+@router.post("/{tool_id}/capabilities/{capability_id}/execute-stream")
+async def execute_capability_stream(
+    tool_id: str,
+    capability_id: str,
+    parameters: Dict[str, Any],
+    context: Optional[Dict[str, Any]] = None,
+    timeout: Optional[float] = Query(None, gt=0, description="Time budget in seconds"),
+    priority: Optional[str] = PRIORITY_QUERY,
+    user = Depends(get_current_user)
+):
+    """
+    Execute a tool capability, streaming result chunks as server-sent events.
+    
+    Each chunk is sent as a `data` event, followed by an `end` event. Errors
+    raised before the first chunk are returned as regular HTTP errors; later
+    errors end the stream with an `error` event. The execution is cancelled
+    if the client disconnects.
+    """
+    try:
+        # Get tool
+        tool = await registry.get_tool(tool_id)
+        if not tool:
+            raise HTTPException(status_code=404, detail=f"Tool not found: {tool_id}")
+        
+        stream = executor.execute_stream(
+            tool_id=tool_id,
+            capability_id=capability_id,
+            parameters=parameters,
+            context=context or {},
+            user_id=user.id if user else None,
+            timeout=timeout,
+            priority=get_priority(user, priority)
+        )
+        
+        # Wait for the first chunk, so that admission and early errors get a status code
+        try:
+            first = await stream.__anext__()
+        except StopAsyncIteration:
+            first = None
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+        raise to_http_exception(e)
+    
+    async def events():
+        try:
+            if first is not None:
+                yield format_sse(first)
+                async for chunk in stream:
+                    yield format_sse(chunk)
+            yield format_sse({}, event="end")
+        except Exception as e:
+            yield format_sse({"error": str(e), "error_type": type(e).__name__}, event="error")
+        finally:
+            await stream.aclose()
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    ) 
\ No newline at end of file
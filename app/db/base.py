@@ -1,6 +1,23 @@
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from abc import ABC, abstractmethod
 
+from app.db.search import (
+    DEFAULT_SEARCH_LIMIT,
+    MODE_AND,
+    check_search,
+    decode_cursor,
+    get_query_terms,
+    get_terms,
+    make_page,
+    matches_terms,
+    summarize,
+)
+
+# Outcomes of writing a tool with `upsert_many`
+TOOL_CREATED = "created"
+TOOL_UPDATED = "updated"
+TOOL_UNCHANGED = "unchanged"
+
 class BaseStorage(ABC):
     """Base storage interface"""
     
@@ -99,4 +116,137 @@ class Database(ABC):
         Returns:
             True if deleted, False if not found
         """
+        pass
+    
+    async def upsert_tool(self, tool_data: Dict[str, Any]) -> bool:
+        """
+        Insert a tool, or update it if it exists.
+        
+        An existing tool keeps its `created_at` and `status`. Implementations
+        should override this to check and write in one transaction.
+        
+        Args:
+            tool_data: Tool data
+            
+        Returns:
+            True if the tool was created, False if it was updated
+        """
+        if await self.get_tool(tool_data["tool_id"]) is None:
+            await self.insert_tool(tool_data)
+            return True
+        
+        updates = {key: value for key, value in tool_data.items() if key not in ("created_at", "status")}
+        await self.update_tool(tool_data["tool_id"], updates)
+        return False
+    
+    async def upsert_many(self, tools: List[Dict[str, Any]]) -> List[str]:
+        """
+        Insert or update several tools, like `upsert_tool`.
+        
+        A tool whose `content_hash` matches the stored one is left as it is.
+        Implementations should override this to write every tool in one
+        transaction.
+        
+        Args:
+            tools: Tool data of each tool, with an optional `content_hash`
+            
+        Returns:
+            `created`, `updated` or `unchanged` for each tool, in order
+        """
+        outcomes = []
+        for tool_data in tools:
+            content_hash = tool_data.get("content_hash")
+            existing = await self.get_tool(tool_data["tool_id"])
+            if existing is not None and content_hash and existing.get("content_hash") == content_hash:
+                outcomes.append(TOOL_UNCHANGED)
+            elif await self.upsert_tool(tool_data):
+                outcomes.append(TOOL_CREATED)
+            else:
+                outcomes.append(TOOL_UPDATED)
+        return outcomes
+    
+    async def get_content_hashes(self, tool_ids: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Get the stored `content_hash` of several tools.
+        
+        Args:
+            tool_ids: Tool IDs
+            
+        Returns:
+            Content hash of each stored tool, or None if it has none; missing
+            tools are left out
+        """
+        hashes = {}
+        for tool_id in tool_ids:
+            tool_data = await self.get_tool(tool_id)
+            if tool_data is not None:
+                hashes[tool_id] = tool_data.get("content_hash")
+        return hashes
+    
+    async def search_tools(
+        self,
+        query: Dict[str, List[str]],
+        mode: str = MODE_AND,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_SEARCH_LIMIT,
+        summary: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Search tools by category, tag, author, capability ID and status.
+        
+        Results are ordered by tool ID and paged with cursors. This default
+        implementation scans every tool; databases should answer searches from
+        indexes instead.
+        
+        Args:
+            query: Values to search for, keyed by field (`category`, `tag`,
+                `author`, `capability` or `status`)
+            mode: `and` to match tools having every value, `or` to match tools
+                having any of them
+            cursor: `next_cursor` of the previous page, or None for the first page
+            limit: Maximum number of tools per page
+            summary: Whether to return summaries instead of whole tools
+            
+        Returns:
+            Page with `items` and `next_cursor`, which is None on the last page
+            
+        Raises:
+            ValueError: If the query, mode, cursor or limit is invalid
+        """
+        check_search(mode, limit)
+        query_terms = get_query_terms(query)
+        after = decode_cursor(cursor)
+        
+        tools = sorted(await self.list_tools({}), key=lambda tool: tool["tool_id"])
+        items = []
+        for tool in tools:
+            if after is not None and tool["tool_id"] <= after:
+                continue
+            if matches_terms(get_terms(tool), query_terms, mode):
+                items.append(summarize(tool) if summary else tool)
+                if len(items) > limit:
+                    break
+        
+        return make_page(items, limit)
+    
+    async def get_changes(self, since: int) -> Tuple[int, Optional[List[str]]]:
+        """
+        Get the IDs of tools changed through other database instances after a
+        catalog version, e.g. by other worker processes.
+        
+        Databases that cannot be shared never report changes.
+        
+        Args:
+            since: Catalog version the caller is up to date with
+            
+        Returns:
+            Current catalog version, and the changed tool IDs, or None if the
+            changes since `since` are no longer known
+        """
+        return since, []
+    
+    async def close(self) -> None:
+        """
+        Release the database's resources.
+        """
         pass 
\ No newline at end of file
@@ -0,0 +1,131 @@
+"""
+Immutable tool records.
+
+Databases hand out frozen snapshots of their records instead of copies: a
+snapshot cannot be changed, so every reader can share it, and a write builds a
+new snapshot that reuses the unchanged parts of the old one.
+
+Frozen containers subclass `dict` and `list`, so they compare equal to plain
+containers and serialize like them (JSON, pydantic, FastAPI responses).
+"""
+
+from typing import Any, Dict, NoReturn
+
+
+def _immutable(self, *args: Any, **kwargs: Any) -> NoReturn:
+    """Reject an attempt to modify a frozen container."""
+    raise TypeError(f"{type(self).__name__} is immutable; use thaw() for a mutable copy")
+
+
+class FrozenDict(dict):
+    """
+    Read-only dict.
+
+    Copying returns the same object, since there is nothing to protect it from.
+    """
+
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = __ior__ = _immutable
+    clear = pop = popitem = setdefault = update = _immutable
+
+    def __copy__(self) -> "FrozenDict":
+        return self
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "FrozenDict":
+        return self
+
+    def __reduce__(self):
+        return (type(self), (dict(self),))
+
+    def __repr__(self) -> str:
+        return f"FrozenDict({dict.__repr__(self)})"
+
+    def copy(self) -> "FrozenDict":
+        return self
+
+    def merge(self, updates: Dict[str, Any]) -> "FrozenDict":
+        """
+        Build a snapshot with some top-level keys replaced.
+
+        Values that are not replaced are shared with this snapshot.
+
+        Args:
+            updates: New values by key
+
+        Returns:
+            New snapshot
+        """
+        merged = dict(self)
+        merged.update((key, freeze(value)) for key, value in updates.items())
+        return FrozenDict(merged)
+
+
+class FrozenList(list):
+    """
+    Read-only list.
+
+    Copying returns the same object, since there is nothing to protect it from.
+    """
+
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _immutable
+    append = clear = extend = insert = pop = remove = reverse = sort = _immutable
+
+    def __copy__(self) -> "FrozenList":
+        return self
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "FrozenList":
+        return self
+
+    def __reduce__(self):
+        return (type(self), (list(self),))
+
+    def __repr__(self) -> str:
+        return f"FrozenList({list.__repr__(self)})"
+
+    def copy(self) -> "FrozenList":
+        return self
+
+
+def freeze(value: Any) -> Any:
+    """
+    Make a frozen snapshot of a value.
+
+    Dicts and lists are converted recursively, and tuples and sets become
+    frozen lists and frozensets. Frozen containers are returned as they are,
+    so freezing a snapshot, or a dict built from the parts of one, is cheap.
+
+    Args:
+        value: Value to freeze; it is not modified
+
+    Returns:
+        Frozen value
+    """
+    if isinstance(value, (FrozenDict, FrozenList)):
+        return value
+    if isinstance(value, dict):
+        return FrozenDict({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return FrozenList(freeze(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(freeze(item) for item in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """
+    Make a mutable deep copy of a frozen value.
+
+    Args:
+        value: Value to copy
+
+    Returns:
+        Copy built from plain dicts and lists
+    """
+    if isinstance(value, dict):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [thaw(item) for item in value]
+    return value
@@ -2,20 +2,44 @@
 In-memory database implementation for testing.
 """
 
-import copy
-from typing import Any, Dict, List, Optional
+import bisect
+import heapq
+from typing import Any, Dict, Iterable, List, Optional, Set
 
-from app.db.base import Database
+from app.db.base import TOOL_CREATED, TOOL_UNCHANGED, TOOL_UPDATED, Database
+from app.db.frozen import FrozenDict, freeze
+from app.db.search import (
+    DEFAULT_SEARCH_LIMIT,
+    FILTER_FIELDS,
+    MODE_AND,
+    Term,
+    check_search,
+    decode_cursor,
+    get_query_terms,
+    get_terms,
+    make_page,
+    matches_filters,
+    summarize,
+)
 
 
 class MemoryDatabase(Database):
     """
     In-memory database implementation for testing.
+    
+    Tools are stored as frozen snapshots (see `app.db.frozen`), which reads
+    return without copying; writes replace a tool's snapshot. Tools are
+    indexed by their search terms (categories, tags, author, capability IDs
+    and status), and their IDs are kept sorted, so that searches and filtered
+    listings only touch matching tools.
     """
     
     def __init__(self):
         """Initialize the in-memory database."""
-        self.tools: Dict[str, Dict[str, Any]] = {}
+        self.tools: Dict[str, FrozenDict] = {}
+        self._index: Dict[Term, Set[str]] = {}
+        self._terms: Dict[str, Set[Term]] = {}
+        self._ids: List[str] = []
     
     async def insert_tool(self, tool_data: Dict[str, Any]) -> None:
         """
@@ -28,7 +52,7 @@ class MemoryDatabase(Database):
         if not tool_id:
             raise ValueError("Tool ID is required")
         
-        self.tools[tool_id] = copy.deepcopy(tool_data)
+        self._store(tool_id, freeze(tool_data))
     
     async def update_tool(self, tool_id: str, tool_data: Dict[str, Any]) -> None:
         """
@@ -41,7 +65,57 @@ class MemoryDatabase(Database):
         if tool_id not in self.tools:
             raise ValueError(f"Tool not found: {tool_id}")
         
-        self.tools[tool_id].update(copy.deepcopy(tool_data))
+        self._store(tool_id, self.tools[tool_id].merge(tool_data))
+    
+    async def upsert_many(self, tools: List[Dict[str, Any]]) -> List[str]:
+        """
+        Insert or update several tools.
+        
+        A tool whose `content_hash` matches the stored one is left as it is;
+        an updated tool keeps its `created_at` and `status`.
+        
+        Args:
+            tools: Tool data of each tool, with an optional `content_hash`
+            
+        Returns:
+            `created`, `updated` or `unchanged` for each tool, in order
+        """
+        outcomes = []
+        for tool_data in tools:
+            tool_id = tool_data.get("tool_id")
+            if not tool_id:
+                raise ValueError("Tool ID is required")
+            
+            existing = self.tools.get(tool_id)
+            content_hash = tool_data.get("content_hash")
+            if existing is None:
+                self._store(tool_id, freeze(tool_data))
+                outcomes.append(TOOL_CREATED)
+            elif content_hash and existing.get("content_hash") == content_hash:
+                outcomes.append(TOOL_UNCHANGED)
+            else:
+                updates = {
+                    key: value for key, value in tool_data.items() if key not in ("created_at", "status")
+                }
+                self._store(tool_id, existing.merge(updates))
+                outcomes.append(TOOL_UPDATED)
+        return outcomes
+    
+    async def get_content_hashes(self, tool_ids: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Get the stored `content_hash` of several tools.
+        
+        Args:
+            tool_ids: Tool IDs
+            
+        Returns:
+            Content hash of each stored tool, or None if it has none; missing
+            tools are left out
+        """
+        return {
+            tool_id: self.tools[tool_id].get("content_hash")
+            for tool_id in tool_ids if tool_id in self.tools
+        }
     
     async def get_tool(self, tool_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -51,34 +125,81 @@ class MemoryDatabase(Database):
             tool_id: Tool ID
             
         Returns:
-            Tool data or None if not found
+            Frozen tool data or None if not found
         """
-        return copy.deepcopy(self.tools.get(tool_id))
+        return self.tools.get(tool_id)
     
     async def list_tools(self, filters: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
         List tools with optional filtering.
         
+        Filter keys are dotted paths into the tool data, such as
+        `manifest.categories`; a filter matches a list containing its value or
+        a value equal to it. Filters on indexed fields are answered from the index.
+        
         Args:
             filters: Filters
             
         Returns:
-            List of tools
+            List of frozen tools, ordered by tool ID
+        """
+        indexed = [
+            (FILTER_FIELDS[key], value) for key, value in filters.items()
+            if key in FILTER_FIELDS and isinstance(value, str)
+        ]
+        if indexed:
+            tool_ids: Iterable[str] = sorted(self._match(indexed, MODE_AND))
+        else:
+            tool_ids = self._ids
+        
+        return [
+            self.tools[tool_id] for tool_id in tool_ids
+            if matches_filters(self.tools[tool_id], filters)
+        ]
+    
+    async def search_tools(
+        self,
+        query: Dict[str, List[str]],
+        mode: str = MODE_AND,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_SEARCH_LIMIT,
+        summary: bool = False
+    ) -> Dict[str, Any]:
         """
-        result = []
+        Search tools by category, tag, author, capability ID and status.
+        
+        Matching tool IDs come from the index, and tools are returned as frozen snapshots.
         
-        for tool_id, tool_data in self.tools.items():
-            # Apply filters
-            match = True
-            for key, value in filters.items():
-                if key not in tool_data or tool_data[key] != value:
-                    match = False
-                    break
+        Args:
+            query: Values to search for, keyed by field (`category`, `tag`,
+                `author`, `capability` or `status`)
+            mode: `and` to match tools having every value, `or` to match tools
+                having any of them
+            cursor: `next_cursor` of the previous page, or None for the first page
+            limit: Maximum number of tools per page
+            summary: Whether to return summaries instead of whole tools
+            
+        Returns:
+            Page with `items` and `next_cursor`, which is None on the last page
             
-            if match:
-                result.append(copy.deepcopy(tool_data))
+        Raises:
+            ValueError: If the query, mode, cursor or limit is invalid
+        """
+        check_search(mode, limit)
+        query_terms = get_query_terms(query)
+        after = decode_cursor(cursor)
         
-        return result
+        if query_terms:
+            candidates = self._match(query_terms, mode)
+            if after is not None:
+                candidates = (tool_id for tool_id in candidates if tool_id > after)
+            tool_ids = heapq.nsmallest(limit + 1, candidates)
+        else:
+            start = bisect.bisect_right(self._ids, after) if after is not None else 0
+            tool_ids = self._ids[start:start + limit + 1]
+        
+        tools = [self.tools[tool_id] for tool_id in tool_ids]
+        return make_page([summarize(tool) for tool in tools] if summary else tools, limit)
     
     async def delete_tool(self, tool_id: str) -> bool:
         """
@@ -92,5 +213,36 @@ class MemoryDatabase(Database):
         """
         if tool_id in self.tools:
             del self.tools[tool_id]
+            self._unindex(tool_id)
+            del self._ids[bisect.bisect_left(self._ids, tool_id)]
             return True
-        return False 
\ No newline at end of file
+        return False
+    
+    def _store(self, tool_id: str, tool_data: FrozenDict) -> None:
+        """Store a tool and index it."""
+        if tool_id not in self.tools:
+            bisect.insort(self._ids, tool_id)
+        self.tools[tool_id] = tool_data
+        
+        self._unindex(tool_id)
+        terms = get_terms(tool_data)
+        self._terms[tool_id] = terms
+        for term in terms:
+            self._index.setdefault(term, set()).add(tool_id)
+    
+    def _unindex(self, tool_id: str) -> None:
+        """Remove a tool from the index."""
+        for term in self._terms.pop(tool_id, ()):
+            tool_ids = self._index[term]
+            tool_ids.discard(tool_id)
+            if not tool_ids:
+                del self._index[term]
+    
+    def _match(self, terms: List[Term], mode: str) -> Set[str]:
+        """Get the IDs of tools having every (`and`) or any (`or`) of some terms."""
+        postings = [self._index.get(term, set()) for term in terms]
+        if mode == MODE_AND:
+            # Intersect starting from the rarest term
+            postings.sort(key=len)
+            return set(postings[0]).intersection(*postings[1:])
+        return set().union(*postings)
\ No newline at end of file
@@ -0,0 +1,209 @@
+"""
+Search over the tool catalog.
+
+Defines which fields of a tool can be searched, and the helpers the database
+implementations share to index, match, page and summarize tools.
+"""
+
+import base64
+import binascii
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+# Searchable fields and the values a tool has for them
+SEARCH_FIELDS = ("category", "tag", "author", "capability", "status")
+
+# How the terms of a query combine
+MODE_AND = "and"
+MODE_OR = "or"
+MODES = (MODE_AND, MODE_OR)
+
+# `list_tools` filter keys answered by a search field
+FILTER_FIELDS = {
+    "manifest.categories": "category",
+    "manifest.tags": "tag",
+    "manifest.author": "author",
+    "status": "status",
+}
+
+# Manifest fields returned by summary searches
+SUMMARY_FIELDS = ("name", "version", "description", "author", "categories", "tags")
+
+DEFAULT_SEARCH_LIMIT = 50
+MAX_SEARCH_LIMIT = 1000
+
+# A searchable field and one of its values
+Term = Tuple[str, str]
+
+
+def get_terms(tool_data: Dict[str, Any]) -> Set[Term]:
+    """
+    Get the terms a tool is indexed under.
+
+    Args:
+        tool_data: Tool data
+
+    Returns:
+        Terms of the tool
+    """
+    manifest = tool_data.get("manifest") or {}
+    terms = {("category", value) for value in manifest.get("categories") or []}
+    terms.update(("tag", value) for value in manifest.get("tags") or [])
+    terms.update(
+        ("capability", capability["capability_id"])
+        for capability in manifest.get("capabilities") or []
+        if capability.get("capability_id")
+    )
+    if manifest.get("author"):
+        terms.add(("author", manifest["author"]))
+    if tool_data.get("status"):
+        terms.add(("status", tool_data["status"]))
+    return terms
+
+
+def get_query_terms(query: Dict[str, Iterable[str]]) -> List[Term]:
+    """
+    Turn a query into terms.
+
+    Args:
+        query: Values to search for, keyed by search field
+
+    Returns:
+        Distinct terms of the query
+
+    Raises:
+        ValueError: If the query names an unknown field
+    """
+    unknown = sorted(set(query) - set(SEARCH_FIELDS))
+    if unknown:
+        raise ValueError(f"Unknown search fields: {', '.join(unknown)}")
+
+    terms = {(field, value) for field, values in query.items() for value in values}
+    return sorted(terms)
+
+
+def check_search(mode: str, limit: int) -> None:
+    """
+    Check the mode and page size of a search.
+
+    Raises:
+        ValueError: If either is invalid
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown search mode: {mode}")
+    if not 1 <= limit <= MAX_SEARCH_LIMIT:
+        raise ValueError(f"Search limit must be between 1 and {MAX_SEARCH_LIMIT}")
+
+
+def matches_terms(terms: Set[Term], query_terms: List[Term], mode: str) -> bool:
+    """
+    Check whether a tool's terms match a query.
+
+    Args:
+        terms: Terms of the tool
+        query_terms: Terms of the query; an empty query matches every tool
+        mode: `and` to require every term, `or` to require any
+
+    Returns:
+        True if the tool matches
+    """
+    if not query_terms:
+        return True
+    if mode == MODE_AND:
+        return all(term in terms for term in query_terms)
+    return any(term in terms for term in query_terms)
+
+
+def matches_filters(tool_data: Dict[str, Any], filters: Dict[str, Any]) -> bool:
+    """
+    Check whether a tool matches `list_tools` filters.
+
+    Filter keys are dotted paths into the tool data, such as
+    `manifest.categories`. A filter matches a list that contains its value,
+    and any other value equal to it.
+
+    Args:
+        tool_data: Tool data
+        filters: Filters
+
+    Returns:
+        True if every filter matches
+    """
+    for key, expected in filters.items():
+        value: Any = tool_data
+        for segment in key.split("."):
+            if not isinstance(value, dict) or segment not in value:
+                return False
+            value = value[segment]
+        if value != expected and not (isinstance(value, list) and expected in value):
+            return False
+    return True
+
+
+def summarize(tool_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Project a tool onto its summary fields.
+
+    Args:
+        tool_data: Tool data
+
+    Returns:
+        Tool summary
+    """
+    manifest = tool_data.get("manifest") or {}
+    return {
+        "tool_id": tool_data["tool_id"],
+        "status": tool_data.get("status"),
+        "updated_at": tool_data.get("updated_at"),
+        **{field: manifest.get(field) for field in SUMMARY_FIELDS},
+    }
+
+
+def encode_cursor(tool_id: str) -> str:
+    """
+    Encode the position after a tool as a page cursor.
+
+    Args:
+        tool_id: ID of the last tool on a page
+
+    Returns:
+        Opaque cursor
+    """
+    return base64.urlsafe_b64encode(tool_id.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[str]:
+    """
+    Decode a page cursor.
+
+    Args:
+        cursor: Cursor from a previous page, or None for the first page
+
+    Returns:
+        ID of the tool the next page starts after, or None for the first page
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    if not cursor:
+        return None
+    try:
+        return base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+    except (binascii.Error, UnicodeError):
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+
+def make_page(items: List[Dict[str, Any]], limit: int) -> Dict[str, Any]:
+    """
+    Build a search result page from up to `limit + 1` matching tools.
+
+    Args:
+        items: Matching tools or summaries in tool ID order; one more than
+            `limit` if there is a next page
+        limit: Page size
+
+    Returns:
+        Page with `items` and the `next_cursor`, which is None on the last page
+    """
+    page = items[:limit]
+    next_cursor = encode_cursor(page[-1]["tool_id"]) if len(items) > limit else None
+    return {"items": page, "next_cursor": next_cursor}
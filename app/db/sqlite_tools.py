@@ -0,0 +1,550 @@
+"""
+SQLite database implementation for the tool catalog.
+
+Tools are stored as JSON documents with their status and timestamps extracted
+into indexed columns, and their search terms (categories, tags, author,
+capability IDs and status) in an indexed term table. The database runs in WAL
+mode, so several API worker processes can share one catalog file: readers never
+block each other or the writer. Every write is also appended to a change log,
+whose sequence number is the catalog version, so that processes can find out
+which tools others changed.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from app.db.base import TOOL_CREATED, TOOL_UNCHANGED, TOOL_UPDATED, Database
+from app.db.search import (
+    DEFAULT_SEARCH_LIMIT,
+    FILTER_FIELDS,
+    MODE_AND,
+    SUMMARY_FIELDS,
+    Term,
+    check_search,
+    decode_cursor,
+    get_query_terms,
+    get_terms,
+    make_page,
+    matches_filters,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOOL_DATABASE_PATH = os.getenv("TOOL_DATABASE_PATH", "data/tools.db")
+
+# Top-level keys of tool data that have their own columns; other keys are kept in `extra`
+COLUMNS = ("tool_id", "manifest", "implementation", "status", "created_at", "updated_at")
+TIMESTAMP_COLUMNS = ("created_at", "updated_at")
+
+# Maximum number of tool IDs bound in one statement, well below SQLite's variable limit
+MAX_BATCH_VARIABLES = 500
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS tools (
+        tool_id TEXT PRIMARY KEY,
+        manifest TEXT NOT NULL,
+        implementation TEXT NOT NULL,
+        extra TEXT NOT NULL DEFAULT '{}',
+        status TEXT,
+        created_at TEXT,
+        updated_at TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_tools_status ON tools (status);
+    CREATE INDEX IF NOT EXISTS idx_tools_updated_at ON tools (updated_at);
+    CREATE TABLE IF NOT EXISTS tool_terms (
+        field TEXT NOT NULL,
+        value TEXT NOT NULL,
+        tool_id TEXT NOT NULL REFERENCES tools (tool_id) ON DELETE CASCADE,
+        PRIMARY KEY (field, value, tool_id)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_tool_terms_tool ON tool_terms (tool_id);
+    CREATE TABLE IF NOT EXISTS catalog_changes (
+        version INTEGER PRIMARY KEY AUTOINCREMENT,
+        tool_id TEXT NOT NULL,
+        origin TEXT NOT NULL,
+        changed_at REAL NOT NULL
+    );
+"""
+
+T = TypeVar("T")
+
+
+class SQLiteToolDatabase(Database):
+    """
+    SQLite database implementation for the tool catalog.
+
+    All statements run on one dedicated thread over one persistent connection,
+    so the event loop never blocks on disk I/O and writes from this process are
+    serialized. Writes take the database lock up front (`BEGIN IMMEDIATE`), which
+    makes read-modify-write operations atomic across processes as well.
+    """
+
+    def __init__(
+        self,
+        db_path: str = DEFAULT_TOOL_DATABASE_PATH,
+        busy_timeout: float = 5.0,
+        max_changes: int = 10000
+    ):
+        """
+        Initialize the database.
+
+        Args:
+            db_path: Path to the SQLite database, or ":memory:"
+            busy_timeout: Seconds to wait for another process's write lock
+            max_changes: Number of catalog changes kept in the change log
+        """
+        self.db_path = db_path
+        self.busy_timeout = busy_timeout
+        self.max_changes = max_changes
+        # Identifies the changes made through this instance in the change log
+        self.origin = uuid.uuid4().hex
+        self._data_version: Optional[int] = None
+        self._seen_version: Optional[int] = None
+        self._thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tool-database")
+        self._conn: Optional[sqlite3.Connection] = None
+
+    async def _run(self, function: Callable[..., T], *args: Any) -> T:
+        """Run a blocking function on the database thread."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._thread, function, *args)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database connection on the database thread."""
+        if self._conn is None:
+            if self.db_path != ":memory:":
+                directory = os.path.dirname(os.path.abspath(self.db_path))
+                os.makedirs(directory, exist_ok=True)
+
+            # Transactions are managed explicitly
+            conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+
+        return self._conn
+
+    def _write(self, function: Callable[[sqlite3.Connection], T]) -> T:
+        """Run a function in a write transaction."""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = function(conn)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return result
+
+    async def insert_tool(self, tool_data: Dict[str, Any]) -> None:
+        """
+        Insert a new tool.
+
+        Args:
+            tool_data: Tool data
+        """
+        tool_id = tool_data.get("tool_id")
+        if not tool_id:
+            raise ValueError("Tool ID is required")
+
+        await self._run(self._write, lambda conn: self._replace(conn, tool_data))
+
+    async def upsert_tool(self, tool_data: Dict[str, Any]) -> bool:
+        """
+        Insert a tool, or replace it if it exists, in one transaction.
+
+        An existing tool keeps its `created_at` and `status`.
+
+        Args:
+            tool_data: Tool data
+
+        Returns:
+            True if the tool was created, False if it was updated
+        """
+        tool_id = tool_data.get("tool_id")
+        if not tool_id:
+            raise ValueError("Tool ID is required")
+
+        def upsert(conn: sqlite3.Connection) -> bool:
+            existing = self._select(conn, tool_id)
+            if existing is None:
+                self._replace(conn, tool_data)
+                return True
+            self._replace(conn, {
+                **tool_data,
+                "created_at": existing.get("created_at"),
+                "status": existing.get("status"),
+            })
+            return False
+
+        return await self._run(self._write, upsert)
+
+    async def upsert_many(self, tools: List[Dict[str, Any]]) -> List[str]:
+        """
+        Insert or update several tools in one transaction.
+
+        A tool whose `content_hash` matches the stored one is left as it is;
+        an updated tool keeps its `created_at` and `status`. If any write
+        fails, none of the tools are written.
+
+        Args:
+            tools: Tool data of each tool, with an optional `content_hash`
+
+        Returns:
+            `created`, `updated` or `unchanged` for each tool, in order
+        """
+        if any(not tool_data.get("tool_id") for tool_data in tools):
+            raise ValueError("Tool ID is required")
+
+        def upsert(conn: sqlite3.Connection) -> List[str]:
+            outcomes = []
+            for tool_data in tools:
+                existing = conn.execute(
+                    "SELECT created_at, status, json_extract(extra, '$.content_hash') AS content_hash "
+                    "FROM tools WHERE tool_id = ?",
+                    (tool_data["tool_id"],)
+                ).fetchone()
+                content_hash = tool_data.get("content_hash")
+                if existing is None:
+                    self._replace(conn, tool_data)
+                    outcomes.append(TOOL_CREATED)
+                elif content_hash and existing["content_hash"] == content_hash:
+                    outcomes.append(TOOL_UNCHANGED)
+                else:
+                    created_at = existing["created_at"]
+                    self._replace(conn, {
+                        **tool_data,
+                        "created_at": datetime.fromisoformat(created_at) if created_at else None,
+                        "status": existing["status"],
+                    })
+                    outcomes.append(TOOL_UPDATED)
+            return outcomes
+
+        return await self._run(self._write, upsert)
+
+    async def get_content_hashes(self, tool_ids: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Get the stored `content_hash` of several tools.
+
+        Args:
+            tool_ids: Tool IDs
+
+        Returns:
+            Content hash of each stored tool, or None if it has none; missing
+            tools are left out
+        """
+        def select() -> Dict[str, Optional[str]]:
+            conn = self._connect()
+            hashes = {}
+            for start in range(0, len(tool_ids), MAX_BATCH_VARIABLES):
+                batch = tool_ids[start:start + MAX_BATCH_VARIABLES]
+                rows = conn.execute(
+                    "SELECT tool_id, json_extract(extra, '$.content_hash') FROM tools "
+                    f"WHERE tool_id IN ({', '.join('?' * len(batch))})",
+                    batch
+                ).fetchall()
+                hashes.update((row[0], row[1]) for row in rows)
+            return hashes
+
+        return await self._run(select)
+
+    async def update_tool(self, tool_id: str, tool_data: Dict[str, Any]) -> None:
+        """
+        Update an existing tool.
+
+        Args:
+            tool_id: Tool ID
+            tool_data: Tool data; top-level keys replace the stored ones
+        """
+        def update(conn: sqlite3.Connection) -> None:
+            existing = self._select(conn, tool_id)
+            if existing is None:
+                raise ValueError(f"Tool not found: {tool_id}")
+            self._replace(conn, {**existing, **tool_data, "tool_id": tool_id})
+
+        await self._run(self._write, update)
+
+    async def get_tool(self, tool_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a tool by ID.
+
+        Args:
+            tool_id: Tool ID
+
+        Returns:
+            Tool data or None if not found
+        """
+        return await self._run(lambda: self._select(self._connect(), tool_id))
+
+    async def list_tools(self, filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        List tools with optional filtering.
+
+        Filter keys are dotted paths into the tool data, such as
+        `manifest.categories`; a filter matches a list containing its value or
+        a value equal to it. Filters on status, categories, tags and author are
+        answered from the indexes.
+
+        Args:
+            filters: Filters
+
+        Returns:
+            List of tools, ordered by tool ID
+        """
+        terms = [
+            (FILTER_FIELDS[key], value) for key, value in filters.items()
+            if key in FILTER_FIELDS and isinstance(value, str)
+        ]
+        condition, arguments = self._match(terms, MODE_AND)
+        query = "SELECT * FROM tools"
+        if condition:
+            query += f" WHERE {condition}"
+        query += " ORDER BY tool_id"
+
+        def select() -> List[Dict[str, Any]]:
+            rows = self._connect().execute(query, arguments).fetchall()
+            return [self._decode(row) for row in rows]
+
+        tools = await self._run(select)
+        return [tool for tool in tools if matches_filters(tool, filters)]
+
+    async def search_tools(
+        self,
+        query: Dict[str, List[str]],
+        mode: str = MODE_AND,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_SEARCH_LIMIT,
+        summary: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Search tools by category, tag, author, capability ID and status.
+
+        Matches come from the term index and pages are read in primary key
+        order. Summaries are extracted from the stored JSON by SQLite, without
+        decoding whole manifests.
+
+        Args:
+            query: Values to search for, keyed by field (`category`, `tag`,
+                `author`, `capability` or `status`)
+            mode: `and` to match tools having every value, `or` to match tools
+                having any of them
+            cursor: `next_cursor` of the previous page, or None for the first page
+            limit: Maximum number of tools per page
+            summary: Whether to return summaries instead of whole tools
+
+        Returns:
+            Page with `items` and `next_cursor`, which is None on the last page
+
+        Raises:
+            ValueError: If the query, mode, cursor or limit is invalid
+        """
+        check_search(mode, limit)
+        condition, arguments = self._match(get_query_terms(query), mode)
+        conditions = [condition] if condition else []
+        after = decode_cursor(cursor)
+        if after is not None:
+            conditions.append("tool_id > ?")
+            arguments.append(after)
+
+        if summary:
+            columns = ", ".join(
+                ["tool_id", "status", "updated_at"]
+                + [f"json_extract(manifest, '$.{field}') AS {field}" for field in SUMMARY_FIELDS]
+            )
+        else:
+            columns = "*"
+        statement = f"SELECT {columns} FROM tools"
+        if conditions:
+            statement += " WHERE " + " AND ".join(conditions)
+        statement += " ORDER BY tool_id LIMIT ?"
+        arguments.append(limit + 1)
+
+        def select() -> List[Dict[str, Any]]:
+            rows = self._connect().execute(statement, arguments).fetchall()
+            return [self._decode_summary(row) if summary else self._decode(row) for row in rows]
+
+        return make_page(await self._run(select), limit)
+
+    async def delete_tool(self, tool_id: str) -> bool:
+        """
+        Delete a tool.
+
+        Args:
+            tool_id: Tool ID
+
+        Returns:
+            True if deleted, False if not found
+        """
+        def delete(conn: sqlite3.Connection) -> bool:
+            deleted = conn.execute("DELETE FROM tools WHERE tool_id = ?", (tool_id,)).rowcount > 0
+            if deleted:
+                self._record_change(conn, tool_id)
+            return deleted
+
+        return await self._run(self._write, delete)
+
+    async def get_changes(self, since: int) -> Tuple[int, Optional[List[str]]]:
+        """
+        Get the IDs of tools that other instances changed after a catalog version.
+
+        Polling is cheap: unless another connection committed since the last
+        call, the answer comes from `PRAGMA data_version` without reading any table.
+
+        Args:
+            since: Catalog version the caller is up to date with
+
+        Returns:
+            Current catalog version, and the changed tool IDs in the order they changed,
+            or None if the change log no longer reaches back to `since`
+        """
+        def select() -> Tuple[int, Optional[List[str]]]:
+            conn = self._connect()
+            data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+            if data_version == self._data_version and since == self._seen_version:
+                return since, []
+
+            rows = conn.execute(
+                "SELECT version, tool_id, origin FROM catalog_changes WHERE version > ? ORDER BY version",
+                (since,)
+            ).fetchall()
+            oldest = conn.execute("SELECT MIN(version) FROM catalog_changes").fetchone()[0]
+            version = rows[-1]["version"] if rows else since
+            self._data_version = data_version
+            self._seen_version = version
+
+            if rows and oldest is not None and since < oldest - 1:
+                return version, None
+            changed = dict.fromkeys(row["tool_id"] for row in rows if row["origin"] != self.origin)
+            return version, list(changed)
+
+        return await self._run(select)
+
+    async def close(self) -> None:
+        """Close the connection and stop the database thread."""
+        def close() -> None:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+        await self._run(close)
+        self._thread.shutdown(wait=True)
+
+    def _select(self, conn: sqlite3.Connection, tool_id: str) -> Optional[Dict[str, Any]]:
+        """Read a tool."""
+        row = conn.execute("SELECT * FROM tools WHERE tool_id = ?", (tool_id,)).fetchone()
+        return self._decode(row) if row is not None else None
+
+    def _replace(self, conn: sqlite3.Connection, tool_data: Dict[str, Any]) -> None:
+        """Write a tool and its extracted categories and tags."""
+        tool_id = tool_data["tool_id"]
+        conn.execute(
+            """
+            INSERT INTO tools (tool_id, manifest, implementation, extra, status, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (tool_id) DO UPDATE SET
+                manifest = excluded.manifest,
+                implementation = excluded.implementation,
+                extra = excluded.extra,
+                status = excluded.status,
+                created_at = excluded.created_at,
+                updated_at = excluded.updated_at
+            """,
+            self._encode(tool_data)
+        )
+
+        conn.execute("DELETE FROM tool_terms WHERE tool_id = ?", (tool_id,))
+        self._index(conn, tool_data)
+        self._record_change(conn, tool_id)
+
+    @staticmethod
+    def _index(conn: sqlite3.Connection, tool_data: Dict[str, Any]) -> None:
+        """Write the search terms of a tool."""
+        conn.executemany(
+            "INSERT INTO tool_terms (field, value, tool_id) VALUES (?, ?, ?)",
+            [(field, value, tool_data["tool_id"]) for field, value in get_terms(tool_data)]
+        )
+
+    @staticmethod
+    def _match(terms: List[Term], mode: str) -> Tuple[str, List[Any]]:
+        """
+        Build the condition selecting tools with every (`and`) or any (`or`) of some terms.
+
+        Returns:
+            SQL condition on `tool_id`, empty if there are no terms, and its arguments
+        """
+        if not terms:
+            return "", []
+
+        terms = sorted(set(terms))
+        matches = " OR ".join(["(field = ? AND value = ?)"] * len(terms))
+        arguments: List[Any] = [item for term in terms for item in term]
+        if mode == MODE_AND:
+            condition = (
+                f"tool_id IN (SELECT tool_id FROM tool_terms WHERE {matches} "
+                "GROUP BY tool_id HAVING COUNT(*) = ?)"
+            )
+            arguments.append(len(terms))
+        else:
+            condition = f"tool_id IN (SELECT tool_id FROM tool_terms WHERE {matches})"
+        return condition, arguments
+
+    def _record_change(self, conn: sqlite3.Connection, tool_id: str) -> None:
+        """Append a change to the change log, bumping the catalog version, and trim the log."""
+        cursor = conn.execute(
+            "INSERT INTO catalog_changes (tool_id, origin, changed_at) VALUES (?, ?, ?)",
+            (tool_id, self.origin, time.time())
+        )
+        conn.execute("DELETE FROM catalog_changes WHERE version <= ?", (cursor.lastrowid - self.max_changes,))
+
+    @staticmethod
+    def _encode(tool_data: Dict[str, Any]) -> Tuple[Any, ...]:
+        """Serialize tool data into a table row."""
+        extra = {key: value for key, value in tool_data.items() if key not in COLUMNS}
+        timestamps = [tool_data.get(column) for column in TIMESTAMP_COLUMNS]
+        return (
+            tool_data["tool_id"],
+            json.dumps(tool_data.get("manifest") or {}, default=str),
+            json.dumps(tool_data.get("implementation") or {}, default=str),
+            json.dumps(extra, default=str),
+            tool_data.get("status"),
+            *[value.isoformat() if isinstance(value, datetime) else value for value in timestamps],
+        )
+
+    @staticmethod
+    def _decode(row: sqlite3.Row) -> Dict[str, Any]:
+        """Deserialize a table row into tool data."""
+        tool_data = json.loads(row["extra"])
+        tool_data.update({
+            "tool_id": row["tool_id"],
+            "manifest": json.loads(row["manifest"]),
+            "implementation": json.loads(row["implementation"]),
+            "status": row["status"],
+        })
+        for column in TIMESTAMP_COLUMNS:
+            value = row[column]
+            tool_data[column] = datetime.fromisoformat(value) if value else None
+        return tool_data
+
+    @staticmethod
+    def _decode_summary(row: sqlite3.Row) -> Dict[str, Any]:
+        """Deserialize a summary row."""
+        summary = {
+            "tool_id": row["tool_id"],
+            "status": row["status"],
+            "updated_at": datetime.fromisoformat(row["updated_at"]) if row["updated_at"] else None,
+        }
+        for field in SUMMARY_FIELDS:
+            value = row[field]
+            # json_extract returns arrays as JSON text
+            summary[field] = json.loads(value) if field in ("categories", "tags") and value else value
+        return summary
@@ -5,11 +5,24 @@ This module defines the base adapter interface for the Tool Integration Protocol
 """
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from typing import Any, AsyncIterator, Dict, Optional
 
 from app.tools.protocol.models import ToolManifest, ValidationResult
 
 
+def to_chunk(value: Any) -> Dict[str, Any]:
+    """
+    Wrap a result or result chunk in a dictionary if it is not one.
+    
+    Args:
+        value: Result or chunk
+        
+    Returns:
+        Dictionary result
+    """
+    return value if isinstance(value, dict) else {"result": value}
+
+
 class ToolAdapter(ABC):
     """
     Base class for tool adapters.
@@ -69,6 +82,37 @@ class ToolAdapter(ABC):
         """
         pass
     
+    async def execute_stream(
+        self,
+        capability_id: str,
+        parameters: Dict[str, Any],
+        context: Dict[str, Any]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Execute a tool capability, yielding its result in chunks.
+        
+        Adapters that can deliver partial results override this; by default the
+        complete result is yielded as a single chunk.
+        
+        Args:
+            capability_id: Capability ID
+            parameters: Input parameters
+            context: Execution context
+            
+        Returns:
+            Iterator over result chunks
+        """
+        yield await self.execute(capability_id, parameters, context)
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get adapter metrics.
+        
+        Returns:
+            Adapter-specific metrics
+        """
+        return {}
+    
     @abstractmethod
     async def shutdown(self) -> None:
         """
@@ -0,0 +1,155 @@
+"""
+Tool Integration Protocol - Micro-Batching
+
+This module collects concurrent calls into batches, so that adapters can send them to
+a backend's batch endpoint in a single request.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Sends a batch of items and returns one result or exception per item, in order
+BatchSender = Callable[[Hashable, List[Any]], Awaitable[List[Any]]]
+
+
+class MicroBatcher:
+    """
+    Collects items submitted within a short window into batches.
+
+    A batch is sent when it reaches `max_batch_size` items or when `window`
+    seconds have passed since its first item, whichever comes first. Items are
+    only batched with items of the same key, e.g. the same credentials. Each
+    caller receives the result or exception for its own item; if the whole
+    batch fails, every caller receives that error.
+    """
+
+    def __init__(self, send: BatchSender, max_batch_size: int = 100, window: float = 0.005):
+        """
+        Initialize the micro-batcher.
+
+        Args:
+            send: Function sending a batch; it receives the batch key and items and
+                returns a result or exception instance per item
+            max_batch_size: Maximum number of items per batch
+            window: Maximum time in seconds an item waits for others to join its batch
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+
+        self.send = send
+        self.max_batch_size = max_batch_size
+        self.window = window
+        self._pending: Dict[Hashable, List[Tuple[Any, "asyncio.Future[Any]"]]] = {}
+        self._timers: Dict[Hashable, asyncio.TimerHandle] = {}
+        self._tasks: Set["asyncio.Task[None]"] = set()
+
+        # Statistics
+        self.batches = 0
+        self.items = 0
+        self.failed_batches = 0
+
+    async def submit(self, key: Hashable, item: Any) -> Any:
+        """
+        Add an item to the next batch for its key and wait for its result.
+
+        Args:
+            key: Batch key; only items with equal keys share a batch
+            item: Item to send
+
+        Returns:
+            Result of the item
+
+        Raises:
+            Exception: The item's error, or the error of its whole batch
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        batch = self._pending.setdefault(key, [])
+        batch.append((item, future))
+
+        if len(batch) >= self.max_batch_size:
+            self._flush(key)
+        elif len(batch) == 1:
+            self._timers[key] = loop.call_later(self.window, self._flush, key)
+
+        # A cancelled caller cancels its future, and its item is dropped if not yet sent
+        return await future
+
+    def _flush(self, key: Hashable) -> None:
+        """Send the pending batch for a key in the background."""
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+
+        batch = [(item, future) for item, future in self._pending.pop(key, []) if not future.done()]
+        if not batch:
+            return
+
+        # Run detached from the callers, so that one caller going away does not fail the others
+        task = asyncio.ensure_future(self._send_batch(key, batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send_batch(self, key: Hashable, batch: List[Tuple[Any, "asyncio.Future[Any]"]]) -> None:
+        """Send a batch and hand each caller its outcome."""
+        self.batches += 1
+        self.items += len(batch)
+        try:
+            outcomes = await self.send(key, [item for item, _ in batch])
+            if len(outcomes) != len(batch):
+                raise RuntimeError(f"Batch returned {len(outcomes)} results for {len(batch)} items")
+        except asyncio.CancelledError:
+            for _, future in batch:
+                future.cancel()
+            raise
+        except Exception as e:
+            self.failed_batches += 1
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), outcome in zip(batch, outcomes):
+            if future.done():
+                continue
+            if isinstance(outcome, BaseException):
+                future.set_exception(outcome)
+            else:
+                future.set_result(outcome)
+
+    async def close(self) -> None:
+        """Cancel pending items and batches in flight."""
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+
+        for batch in self._pending.values():
+            for _, future in batch:
+                future.cancel()
+        self._pending.clear()
+
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get batching statistics.
+
+        Returns:
+            Batching statistics
+        """
+        return {
+            "max_batch_size": self.max_batch_size,
+            "window": self.window,
+            "pending": sum(len(batch) for batch in self._pending.values()),
+            "in_flight": len(self._tasks),
+            "batches": self.batches,
+            "items": self.items,
+            "failed_batches": self.failed_batches,
+            "average_batch_size": self.items / self.batches if self.batches else 0.0,
+        }
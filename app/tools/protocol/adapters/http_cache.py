@@ -0,0 +1,407 @@
+"""
+Tool Integration Protocol - HTTP Response Cache
+
+This module implements the private HTTP cache of the REST API adapter. Responses are
+cached according to their Cache-Control, Expires, ETag and Last-Modified headers,
+in memory with an optional on-disk tier.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Response headers kept with a cached response
+STORED_HEADERS = ("content-type", "etag", "last-modified", "cache-control", "expires")
+
+
+def parse_cache_control(value: Optional[str]) -> Dict[str, Optional[str]]:
+    """
+    Parse a Cache-Control header.
+
+    Args:
+        value: Header value
+
+    Returns:
+        Directives with their arguments, or None for directives without one
+    """
+    directives: Dict[str, Optional[str]] = {}
+    for part in (value or "").split(","):
+        name, _, argument = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = argument.strip('"') if argument else None
+    return directives
+
+
+def _seconds(value: Optional[str]) -> Optional[float]:
+    """Parse a delta-seconds directive argument."""
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None
+
+
+class CachedResponse:
+    """A stored HTTP response and its freshness information."""
+
+    __slots__ = (
+        "url", "status_code", "headers", "content", "stored_at",
+        "max_age", "stale_while_revalidate", "etag", "last_modified",
+    )
+
+    def __init__(
+        self,
+        url: str,
+        status_code: int,
+        headers: Dict[str, str],
+        content: bytes,
+        stored_at: float,
+        max_age: float,
+        stale_while_revalidate: Optional[float]
+    ):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.stored_at = stored_at
+        self.max_age = max_age
+        self.stale_while_revalidate = stale_while_revalidate
+        self.etag = headers.get("etag")
+        self.last_modified = headers.get("last-modified")
+
+    @classmethod
+    def from_response(cls, response: httpx.Response, now: float) -> Optional["CachedResponse"]:
+        """
+        Build a cache entry from a response.
+
+        Args:
+            response: HTTP response
+            now: Current wall clock time
+
+        Returns:
+            Cache entry, or None if the response may not be stored or reused
+        """
+        if response.status_code != 200:
+            return None
+
+        directives = parse_cache_control(response.headers.get("cache-control"))
+        if "no-store" in directives:
+            return None
+
+        headers = {name: response.headers[name] for name in STORED_HEADERS if name in response.headers}
+        max_age = cls._freshness_lifetime(response, directives)
+        if "no-cache" in directives:
+            max_age = 0.0
+
+        # Without freshness, validators or a stale window the response can never be reused
+        stale_while_revalidate = _seconds(directives.get("stale-while-revalidate"))
+        if not (max_age or stale_while_revalidate) and "etag" not in headers and "last-modified" not in headers:
+            return None
+
+        age = _seconds(response.headers.get("age")) or 0.0
+        return cls(
+            url=str(response.request.url),
+            status_code=response.status_code,
+            headers=headers,
+            content=response.content,
+            stored_at=now - age,
+            max_age=max_age or 0.0,
+            stale_while_revalidate=stale_while_revalidate
+        )
+
+    @staticmethod
+    def _freshness_lifetime(response: httpx.Response, directives: Dict[str, Optional[str]]) -> Optional[float]:
+        """Get how long a response stays fresh from max-age or Expires."""
+        max_age = _seconds(directives.get("max-age"))
+        if max_age is not None:
+            return max_age
+
+        expires = response.headers.get("expires")
+        if not expires:
+            return None
+        try:
+            expires_at = parsedate_to_datetime(expires).timestamp()
+            date = response.headers.get("date")
+            served_at = parsedate_to_datetime(date).timestamp() if date else time.time()
+        except (TypeError, ValueError):
+            return 0.0
+        return max(0.0, expires_at - served_at)
+
+    def refreshed(self, response: httpx.Response, now: float) -> "CachedResponse":
+        """
+        Build an entry with the freshness of a 304 Not Modified response.
+
+        The entry itself is not modified, since the cache accounts for its size
+        and other calls may be reading it.
+
+        Args:
+            response: Revalidation response
+            now: Current wall clock time
+
+        Returns:
+            Refreshed cache entry with the same content
+        """
+        headers = dict(self.headers)
+        for name in STORED_HEADERS:
+            if name in response.headers:
+                headers[name] = response.headers[name]
+        directives = parse_cache_control(headers.get("cache-control"))
+        max_age = self._freshness_lifetime(response, directives)
+        if max_age is None:
+            max_age = self.max_age
+        elif "no-cache" in directives:
+            max_age = 0.0
+        return CachedResponse(
+            url=self.url,
+            status_code=self.status_code,
+            headers=headers,
+            content=self.content,
+            stored_at=now,
+            max_age=max_age,
+            stale_while_revalidate=_seconds(directives.get("stale-while-revalidate"))
+        )
+
+    def age(self, now: float) -> float:
+        """Get the time in seconds since the response was generated."""
+        return max(0.0, now - self.stored_at)
+
+    def is_fresh(self, now: float) -> bool:
+        """Check whether the response may be used without revalidation."""
+        return self.age(now) < self.max_age
+
+    def validators(self) -> Dict[str, str]:
+        """Get the conditional request headers that revalidate this response."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def to_response(self, now: float) -> httpx.Response:
+        """
+        Build a response from the cache entry.
+
+        Args:
+            now: Current wall clock time
+
+        Returns:
+            HTTP response
+        """
+        headers = {**self.headers, "age": str(int(self.age(now)))}
+        return httpx.Response(
+            self.status_code,
+            headers=headers,
+            content=self.content,
+            request=httpx.Request("GET", self.url)
+        )
+
+    def size(self) -> int:
+        """Get the approximate memory footprint in bytes."""
+        return len(self.content) + sum(len(name) + len(value) for name, value in self.headers.items())
+
+    def dumps(self) -> bytes:
+        """Serialize the entry for the disk tier."""
+        header = {
+            "url": self.url,
+            "status_code": self.status_code,
+            "headers": self.headers,
+            "stored_at": self.stored_at,
+            "max_age": self.max_age,
+            "stale_while_revalidate": self.stale_while_revalidate,
+        }
+        return json.dumps(header).encode("utf-8") + b"\n" + self.content
+
+    @classmethod
+    def loads(cls, data: bytes) -> "CachedResponse":
+        """Deserialize an entry from the disk tier."""
+        header, _, content = data.partition(b"\n")
+        return cls(content=content, **json.loads(header))
+
+
+class HttpCache:
+    """
+    Private HTTP cache with an in-memory LRU and an optional disk tier.
+
+    The memory tier is bounded by entry count and size. The disk tier keeps one
+    file per entry and evicts the least recently written files beyond
+    `max_disk_entries`.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        max_bytes: int = 16 * 1024 * 1024,
+        disk_path: Optional[str] = None,
+        max_disk_entries: int = 10000
+    ):
+        """
+        Initialize the HTTP cache.
+
+        Args:
+            max_entries: Maximum number of responses kept in memory
+            max_bytes: Maximum total size of responses kept in memory
+            disk_path: Directory of the disk tier, or None to keep responses in memory only
+            max_disk_entries: Maximum number of responses kept on disk
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.disk_path = disk_path
+        self.max_disk_entries = max_disk_entries
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._bytes = 0
+        self._disk_writes = 0
+
+        # Statistics
+        self.hits = 0
+        self.stale_hits = 0
+        self.revalidations = 0
+        self.misses = 0
+        self.disk_hits = 0
+
+        if disk_path:
+            os.makedirs(disk_path, exist_ok=True)
+
+    @staticmethod
+    def make_key(url: str, parameters: Dict[str, Any], headers: Dict[str, str]) -> str:
+        """
+        Build a cache key for a GET request.
+
+        Request headers are part of the key, so responses are never shared
+        between different credentials.
+
+        Args:
+            url: Request URL
+            parameters: Query parameters
+            headers: Request headers
+
+        Returns:
+            Cache key
+        """
+        encoded = json.dumps(
+            [url, parameters, {name.lower(): value for name, value in headers.items()}],
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        """
+        Get a stored response, fresh or not.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Stored response or None if missing
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry
+
+        if not self.disk_path:
+            return None
+
+        loop = asyncio.get_running_loop()
+        entry = await loop.run_in_executor(None, self._read, key)
+        if entry is not None:
+            self.disk_hits += 1
+            self._store(key, entry)
+        return entry
+
+    async def set(self, key: str, entry: CachedResponse) -> None:
+        """
+        Store a response.
+
+        Args:
+            key: Cache key
+            entry: Response to store
+        """
+        self._store(key, entry)
+        if self.disk_path:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._write, key, entry.dumps())
+
+    def _store(self, key: str, entry: CachedResponse) -> None:
+        """Put an entry in the memory tier."""
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= previous.size()
+        if entry.size() > self.max_bytes:
+            return
+
+        self._entries[key] = entry
+        self._bytes += entry.size()
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.size()
+
+    def _file(self, key: str) -> str:
+        """Get the disk tier file of a key."""
+        return os.path.join(self.disk_path, f"{key}.cache")
+
+    def _read(self, key: str) -> Optional[CachedResponse]:
+        """Read an entry from the disk tier."""
+        try:
+            with open(self._file(key), "rb") as f:
+                return CachedResponse.loads(f.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"Discarding unreadable HTTP cache entry {key}: {str(e)}")
+            return None
+
+    def _write(self, key: str, data: bytes) -> None:
+        """Write an entry to the disk tier, replacing it atomically."""
+        path = self._file(key)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write HTTP cache entry {key}: {str(e)}")
+            return
+
+        self._disk_writes += 1
+        if self._disk_writes % 100 == 0:
+            self._prune()
+
+    def _prune(self) -> None:
+        """Remove the oldest disk tier files beyond the size limit."""
+        try:
+            entries = [entry for entry in os.scandir(self.disk_path) if entry.name.endswith(".cache")]
+            if len(entries) <= self.max_disk_entries:
+                return
+            entries.sort(key=lambda entry: entry.stat().st_mtime)
+            for entry in entries[:len(entries) - self.max_disk_entries]:
+                os.remove(entry.path)
+        except OSError as e:
+            logger.warning(f"Failed to prune HTTP cache: {str(e)}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get HTTP cache statistics.
+
+        Returns:
+            HTTP cache statistics
+        """
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "revalidations": self.revalidations,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+        }
@@ -0,0 +1,174 @@
+"""
+Tool Integration Protocol - HTTP Client Pool
+
+This module shares HTTP clients between REST API adapters, so that tools on the same
+origin reuse one connection pool instead of each opening their own.
+"""
+
+import importlib.util
+import logging
+import os
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONNECTIONS = int(os.getenv("TOOL_HTTP_MAX_CONNECTIONS", 100))
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("TOOL_HTTP_MAX_KEEPALIVE_CONNECTIONS", 20))
+DEFAULT_KEEPALIVE_EXPIRY = float(os.getenv("TOOL_HTTP_KEEPALIVE_EXPIRY", 5.0))
+DEFAULT_HTTP2 = os.getenv("TOOL_HTTP2", "false").lower() in ("1", "true", "yes")
+
+
+def get_origin(url: str) -> str:
+    """
+    Get the origin of a URL.
+
+    Args:
+        url: URL
+
+    Returns:
+        Origin as scheme://host[:port]
+    """
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+class HttpClientPool:
+    """
+    Process-wide pool of HTTP clients, one per origin.
+
+    Clients are reference counted: adapters acquire the client for their base URL
+    and release it on shutdown, and a client is closed once nobody uses it.
+    Clients carry no headers, base URL or timeout of their own; adapters pass
+    those with every request.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        max_keepalive_connections: int = DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+        http2: bool = DEFAULT_HTTP2
+    ):
+        """
+        Initialize the client pool.
+
+        Args:
+            max_connections: Maximum number of connections per origin
+            max_keepalive_connections: Maximum number of idle connections kept per origin
+            keepalive_expiry: Time in seconds after which idle connections are closed
+            http2: Whether to negotiate HTTP/2; requires the `h2` package
+        """
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("HTTP/2 requested but the h2 package is not installed; using HTTP/1.1")
+            http2 = False
+
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.http2 = http2
+        self._clients: Dict[str, Tuple[httpx.AsyncClient, int]] = {}
+
+    def acquire(self, url: str) -> httpx.AsyncClient:
+        """
+        Get the shared client for a URL's origin.
+
+        Args:
+            url: Base URL of a tool
+
+        Returns:
+            HTTP client
+        """
+        origin = get_origin(url)
+        client, users = self._clients.get(origin, (None, 0))
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(limits=self.limits, http2=self.http2)
+            users = 0
+
+        self._clients[origin] = (client, users + 1)
+        return client
+
+    async def release(self, url: str) -> None:
+        """
+        Stop using the shared client for a URL's origin.
+
+        Args:
+            url: Base URL the client was acquired for
+        """
+        origin = get_origin(url)
+        if origin not in self._clients:
+            return
+
+        client, users = self._clients[origin]
+        if users > 1:
+            self._clients[origin] = (client, users - 1)
+            return
+
+        del self._clients[origin]
+        await client.aclose()
+
+    async def close(self) -> None:
+        """Close every client."""
+        clients = [client for client, _ in self._clients.values()]
+        self._clients.clear()
+        for client in clients:
+            await client.aclose()
+
+    @staticmethod
+    def _get_connection_stats(client: httpx.AsyncClient) -> Dict[str, Any]:
+        """Read connection counts from a client's connection pool, where available."""
+        pool = getattr(getattr(client, "_transport", None), "_pool", None)
+        connections = getattr(pool, "connections", None)
+        requests = getattr(pool, "_requests", None)
+        if connections is None or requests is None:
+            return {}
+
+        try:
+            idle = sum(1 for connection in connections if connection.is_idle())
+            waiting = sum(1 for request in requests if request.is_queued())
+        except Exception:
+            return {}
+
+        return {
+            "open": len(connections),
+            "idle": idle,
+            "active": len(connections) - idle,
+            "waiting": waiting,
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get client pool statistics.
+
+        Returns:
+            Connection counts and users per origin
+        """
+        return {
+            "http2": self.http2,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "origins": {
+                origin: {"users": users, **self._get_connection_stats(client)}
+                for origin, (client, users) in self._clients.items()
+            },
+        }
+
+
+_shared_pool: Optional[HttpClientPool] = None
+
+
+def get_shared_http_pool() -> HttpClientPool:
+    """
+    Get the HTTP client pool shared by REST API adapters.
+
+    Returns:
+        Shared HTTP client pool
+    """
+    global _shared_pool
+    if _shared_pool is None:
+        _shared_pool = HttpClientPool()
+    return _shared_pool
@@ -0,0 +1,306 @@
+"""
+Tool Integration Protocol - OAuth2 Tokens
+
+This module fetches and caches OAuth2 access tokens with the client credentials grant,
+so that REST API adapters can authenticate without callers supplying tokens.
+"""
+
+import asyncio
+import functools
+import hashlib
+import logging
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+from app.tools.protocol.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+AUTH_METHOD_BASIC = "client_secret_basic"
+AUTH_METHOD_POST = "client_secret_post"
+AUTH_METHODS = (AUTH_METHOD_BASIC, AUTH_METHOD_POST)
+
+# Client ID, digest of the client secret, and scope
+PrincipalKey = Tuple[str, str, Optional[str]]
+
+
+class AccessToken:
+    """An access token and its lifetime."""
+
+    __slots__ = ("value", "token_type", "expires_at", "refresh_at")
+
+    def __init__(self, value: str, token_type: str, expires_at: float, refresh_at: float):
+        self.value = value
+        self.token_type = token_type
+        self.expires_at = expires_at
+        self.refresh_at = refresh_at
+
+    def is_valid(self, now: float) -> bool:
+        """Check whether the token may still be used."""
+        return now < self.expires_at
+
+    def needs_refresh(self, now: float) -> bool:
+        """Check whether the token is close enough to expiry to be replaced."""
+        return now >= self.refresh_at
+
+    def authorization(self) -> str:
+        """Get the Authorization header value."""
+        return f"{self.token_type} {self.value}"
+
+
+class TokenManager:
+    """
+    Caches client credentials tokens per principal and refreshes them ahead of expiry.
+
+    A principal is a client ID, its secret and a scope. A token is used until
+    `refresh_ahead` seconds before it expires; after that, callers keep using it
+    while a new one is fetched in the background, and only wait for a token when
+    there is no valid one. Concurrent fetches for a principal share a single token request.
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        token_url: str,
+        client_id: str,
+        client_secret: str,
+        scope: Optional[str] = None,
+        audience: Optional[str] = None,
+        auth_method: str = AUTH_METHOD_BASIC,
+        refresh_ahead: float = 60.0,
+        default_expires_in: float = 3600.0,
+        timeout: float = 10.0
+    ):
+        """
+        Initialize the token manager.
+
+        Args:
+            client: HTTP client for the token endpoint
+            token_url: Token endpoint URL
+            client_id: Default client ID
+            client_secret: Default client secret
+            scope: Default scope
+            audience: Audience, for providers that require one
+            auth_method: How the client authenticates, `client_secret_basic` or `client_secret_post`
+            refresh_ahead: Seconds before expiry at which a token is refreshed, at most half its lifetime
+            default_expires_in: Lifetime assumed for tokens issued without `expires_in`
+            timeout: Timeout of token requests in seconds
+        """
+        if auth_method not in AUTH_METHODS:
+            raise ValueError(f"Unsupported token auth method: {auth_method}")
+
+        self.client = client
+        self.token_url = token_url
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.scope = scope
+        self.audience = audience
+        self.auth_method = auth_method
+        self.refresh_ahead = refresh_ahead
+        self.default_expires_in = default_expires_in
+        self.timeout = timeout
+        self._tokens: Dict[PrincipalKey, AccessToken] = {}
+        self._flights = SingleFlight()
+        self._refreshes: Dict[PrincipalKey, "asyncio.Task[Any]"] = {}
+
+        # Statistics
+        self.hits = 0
+        self.fetches = 0
+        self.background_refreshes = 0
+        self.failures = 0
+
+    @staticmethod
+    def check_config(config: Dict[str, Any]) -> None:
+        """
+        Check an authentication configuration before building a token manager from it.
+
+        Args:
+            config: Authentication configuration
+
+        Raises:
+            ValueError: If a required setting is missing or the auth method is unsupported
+        """
+        missing = [key for key in ("token_url", "client_id", "client_secret") if not config.get(key)]
+        if missing:
+            raise ValueError(f"OAuth2 configuration is missing {', '.join(missing)}")
+        if config.get("auth_method", AUTH_METHOD_BASIC) not in AUTH_METHODS:
+            raise ValueError(f"Unsupported token auth method: {config['auth_method']}")
+
+    @classmethod
+    def from_config(cls, client: httpx.AsyncClient, config: Dict[str, Any]) -> "TokenManager":
+        """
+        Build a token manager from an authentication configuration.
+
+        Args:
+            client: HTTP client for the token endpoint
+            config: Authentication configuration with `token_url`, `client_id`,
+                `client_secret` and optionally `scope`, `audience`, `auth_method`,
+                `refresh_ahead_seconds`, `default_expires_in` and `timeout`
+
+        Returns:
+            Token manager
+        """
+        cls.check_config(config)
+        return cls(
+            client,
+            config["token_url"],
+            config["client_id"],
+            config["client_secret"],
+            scope=config.get("scope"),
+            audience=config.get("audience"),
+            auth_method=config.get("auth_method", AUTH_METHOD_BASIC),
+            refresh_ahead=config.get("refresh_ahead_seconds", 60.0),
+            default_expires_in=config.get("default_expires_in", 3600.0),
+            timeout=config.get("timeout", 10.0)
+        )
+
+    async def get_token(
+        self,
+        client_id: Optional[str] = None,
+        client_secret: Optional[str] = None,
+        scope: Optional[str] = None
+    ) -> AccessToken:
+        """
+        Get a valid token for a principal.
+
+        Args:
+            client_id: Client ID, or None for the configured client
+            client_secret: Secret of `client_id`; required with `client_id`
+            scope: Scope, or None for the configured scope
+
+        Returns:
+            Access token
+
+        Raises:
+            RuntimeError: If no token could be obtained
+        """
+        key, client_secret = self._resolve(client_id, client_secret, scope)
+
+        now = time.monotonic()
+        token = self._tokens.get(key)
+        if token is not None and token.is_valid(now):
+            self.hits += 1
+            if token.needs_refresh(now):
+                self._refresh_in_background(key, client_secret)
+            return token
+
+        token, _ = await self._flights.do(key, lambda: self._fetch(key, client_secret))
+        return token
+
+    def invalidate(
+        self,
+        client_id: Optional[str] = None,
+        client_secret: Optional[str] = None,
+        scope: Optional[str] = None
+    ) -> None:
+        """
+        Forget a principal's token, e.g. after the backend rejected it.
+
+        Args:
+            client_id: Client ID, or None for the configured client
+            client_secret: Secret of `client_id`; required with `client_id`
+            scope: Scope, or None for the configured scope
+        """
+        key, _ = self._resolve(client_id, client_secret, scope)
+        self._tokens.pop(key, None)
+
+    def _resolve(
+        self,
+        client_id: Optional[str],
+        client_secret: Optional[str],
+        scope: Optional[str]
+    ) -> Tuple[PrincipalKey, str]:
+        """Get the cache key and client secret of a principal."""
+        if client_id is None:
+            client_id, client_secret = self.client_id, self.client_secret
+        elif not client_secret:
+            raise ValueError(f"Authentication required: client_secret for client {client_id}")
+
+        # Keyed by the secret too, so that a wrong secret never yields a cached token
+        digest = hashlib.sha256(client_secret.encode("utf-8")).hexdigest()
+        return (client_id, digest, scope or self.scope), client_secret
+
+    def _refresh_in_background(self, key: PrincipalKey, client_secret: str) -> None:
+        """Fetch a new token while callers keep using the current one."""
+        if key in self._refreshes:
+            return
+
+        self.background_refreshes += 1
+        task = asyncio.ensure_future(self._flights.do(key, lambda: self._fetch(key, client_secret)))
+        self._refreshes[key] = task
+        task.add_done_callback(functools.partial(self._on_refreshed, key))
+
+    def _on_refreshed(self, key: PrincipalKey, task: "asyncio.Task[Any]") -> None:
+        """Clean up after a background refresh."""
+        self._refreshes.pop(key, None)
+        if not task.cancelled() and task.exception() is not None:
+            # The current token stays in use until it expires
+            logger.warning(f"Background token refresh failed: {task.exception()}")
+
+    async def _fetch(self, key: PrincipalKey, client_secret: str) -> AccessToken:
+        """Request a token from the token endpoint and cache it."""
+        client_id, _, scope = key
+        data = {"grant_type": "client_credentials"}
+        if scope:
+            data["scope"] = scope
+        if self.audience:
+            data["audience"] = self.audience
+
+        auth = None
+        if self.auth_method == AUTH_METHOD_BASIC:
+            auth = httpx.BasicAuth(client_id, client_secret)
+        else:
+            data["client_id"] = client_id
+            data["client_secret"] = client_secret
+
+        self.fetches += 1
+        start = time.monotonic()
+        try:
+            response = await self.client.post(self.token_url, data=data, auth=auth, timeout=self.timeout)
+            response.raise_for_status()
+            payload = response.json()
+            value = payload["access_token"]
+        except Exception as e:
+            self.failures += 1
+            raise RuntimeError(f"Authentication error: token request for client {client_id} failed: {str(e)}")
+
+        expires_in = float(payload.get("expires_in") or self.default_expires_in)
+        token = AccessToken(
+            value=value,
+            token_type=self._normalize_token_type(payload.get("token_type")),
+            expires_at=start + expires_in,
+            refresh_at=start + expires_in - min(self.refresh_ahead, expires_in / 2)
+        )
+        self._tokens[key] = token
+        return token
+
+    @staticmethod
+    def _normalize_token_type(token_type: Optional[str]) -> str:
+        """Spell the token type as used in Authorization headers; providers often send `bearer`."""
+        if not token_type or token_type.lower() == "bearer":
+            return "Bearer"
+        return token_type
+
+    async def close(self) -> None:
+        """Cancel background refreshes."""
+        tasks = list(self._refreshes.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get token statistics.
+
+        Returns:
+            Token statistics
+        """
+        return {
+            "tokens": len(self._tokens),
+            "hits": self.hits,
+            "fetches": self.fetches,
+            "background_refreshes": self.background_refreshes,
+            "failures": self.failures,
+        }
@@ -0,0 +1,383 @@
+"""
+Tool Integration Protocol - Plugin Process Pool
+
+This module implements a pool of persistent worker processes for CPU-bound Python plugins.
+Each worker loads the plugin once and runs its `initialize` and `shutdown` hooks.
+
+Workers talk to the adapter over a pipe with pickled tuples:
+
+    request:   (function_name, parameters, context)
+    response:  (ok, result_or_error_message, peak_rss_kb)
+    stop:      None
+
+Right after start-up a worker sends one response whose payload is None (or the
+error that stopped it from loading the plugin).
+"""
+
+import asyncio
+import inspect
+import logging
+import multiprocessing
+import os
+import pickle
+import sys
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from app.tools.protocol.errors import ToolTimeoutError
+from app.tools.protocol.retry import remaining_time
+
+logger = logging.getLogger(__name__)
+
+PICKLE_PROTOCOL = pickle.HIGHEST_PROTOCOL
+
+
+def _peak_rss_kb() -> int:
+    """Get the peak resident set size of the current process in KiB."""
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux reports KiB
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def _run_hook(module: Any, name: str) -> None:
+    """Run a plugin lifecycle hook if the plugin defines one."""
+    hook = getattr(module, name, None)
+    if not callable(hook):
+        return
+    result = hook()
+    if asyncio.iscoroutine(result):
+        asyncio.run(result)
+
+
+async def _collect(generator: Any) -> List[Any]:
+    """Collect the items of an async generator."""
+    return [item async for item in generator]
+
+
+def _worker_main(conn: Any, plugin_path: str) -> None:
+    """
+    Entry point of a worker process.
+
+    Args:
+        conn: Pipe connection to the adapter
+        plugin_path: Path to the plugin module
+    """
+    from app.tools.protocol.adapters.base import to_chunk
+    from app.tools.protocol.adapters.python_plugin import load_plugin
+
+    try:
+        module = load_plugin(plugin_path)
+        _run_hook(module, "initialize")
+    except Exception as e:
+        conn.send_bytes(pickle.dumps((False, f"{type(e).__name__}: {e}", _peak_rss_kb()), PICKLE_PROTOCOL))
+        return
+
+    conn.send_bytes(pickle.dumps((True, None, _peak_rss_kb()), PICKLE_PROTOCOL))
+
+    while True:
+        try:
+            message = pickle.loads(conn.recv_bytes())
+        except (EOFError, OSError):
+            break
+        if message is None:
+            break
+
+        function_name, parameters, context = message
+        try:
+            result = getattr(module, function_name)(parameters, context)
+            if asyncio.iscoroutine(result):
+                result = asyncio.run(result)
+            elif inspect.isgenerator(result):
+                # Generators cannot cross the pipe, so streamed results arrive as one
+                result = {"chunks": [to_chunk(chunk) for chunk in result]}
+            elif inspect.isasyncgen(result):
+                result = {"chunks": [to_chunk(chunk) for chunk in asyncio.run(_collect(result))]}
+            reply = pickle.dumps((True, result, _peak_rss_kb()), PICKLE_PROTOCOL)
+        except Exception as e:
+            reply = pickle.dumps((False, f"{type(e).__name__}: {e}", _peak_rss_kb()), PICKLE_PROTOCOL)
+
+        try:
+            conn.send_bytes(reply)
+        except (EOFError, OSError):
+            break
+
+    try:
+        _run_hook(module, "shutdown")
+    except Exception as e:
+        logger.error(f"Error shutting down plugin worker: {str(e)}")
+
+
+class PluginWorkerError(RuntimeError):
+    """Exception raised when a plugin worker process dies or fails to start."""
+    pass
+
+
+class _Worker:
+    """Handle on a worker process."""
+
+    def __init__(self, process: Any, conn: Any):
+        self.process = process
+        self.conn = conn
+        self.calls = 0
+        self.peak_rss_kb = 0
+
+    def request(self, message: Any) -> Tuple[bool, Any, int]:
+        """Send a message and wait for the reply. Blocks the calling thread."""
+        if message is not None:
+            self.conn.send_bytes(pickle.dumps(message, PICKLE_PROTOCOL))
+        return pickle.loads(self.conn.recv_bytes())
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Ask the worker to exit, terminating it if it does not. Blocks the calling thread."""
+        try:
+            self.conn.send_bytes(pickle.dumps(None, PICKLE_PROTOCOL))
+        except (EOFError, OSError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout)
+        self.conn.close()
+
+    def kill(self) -> None:
+        """Terminate the worker immediately. Blocks the calling thread."""
+        self.process.terminate()
+        self.process.join(5.0)
+        self.conn.close()
+
+
+class PluginProcessPool:
+    """
+    Pool of persistent worker processes running one plugin.
+
+    Workers are recycled after `max_calls_per_worker` calls, or once their peak
+    memory exceeds `max_memory_mb`. A worker whose call is cancelled is
+    killed and replaced, since the call cannot be interrupted otherwise.
+
+    Requests wait for replies on the I/O threads, one per worker. Starting and
+    stopping workers happens on separate threads, so that it never queues
+    behind a request blocked on a hung worker. If replacements fail until no
+    worker is left, calls fail at once instead of waiting for one.
+    """
+
+    def __init__(
+        self,
+        plugin_path: str,
+        size: Optional[int] = None,
+        max_calls_per_worker: Optional[int] = 1000,
+        max_memory_mb: Optional[float] = None
+    ):
+        """
+        Initialize the process pool.
+
+        Args:
+            plugin_path: Path to the plugin module
+            size: Number of worker processes, defaults to the number of CPUs
+            max_calls_per_worker: Calls after which a worker is replaced
+            max_memory_mb: Peak memory in MiB after which a worker is replaced
+        """
+        self.plugin_path = plugin_path
+        self.size = size or os.cpu_count() or 1
+        self.max_calls_per_worker = max_calls_per_worker
+        self.max_memory_mb = max_memory_mb
+
+        self._context = multiprocessing.get_context("spawn")
+        # Pipe reads block, so every worker gets an I/O thread to wait on
+        self._io = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="plugin-process-io")
+        self._lifecycle = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="plugin-process-lifecycle")
+        # None once the pool has no workers left, passed on from call to call
+        self._idle: "asyncio.Queue[Optional[_Worker]]" = asyncio.Queue()
+        self._workers: Set[_Worker] = set()
+        self._tasks: Set["asyncio.Task[None]"] = set()
+        self._closed = False
+
+        # Statistics
+        self.calls = 0
+        self.recycled = 0
+        self.crashed = 0
+
+    async def start(self) -> None:
+        """
+        Start every worker and wait until each has loaded the plugin.
+
+        Raises:
+            PluginWorkerError: If a worker fails to load the plugin
+        """
+        workers = await asyncio.gather(
+            *[self._spawn() for _ in range(self.size)],
+            return_exceptions=True
+        )
+        errors = [worker for worker in workers if isinstance(worker, BaseException)]
+        for worker in workers:
+            if not isinstance(worker, BaseException):
+                self._idle.put_nowait(worker)
+        if errors:
+            await self.shutdown()
+            raise PluginWorkerError(f"Failed to start plugin workers: {errors[0]}")
+
+    async def _spawn(self) -> _Worker:
+        """Start a worker process and wait for its handshake."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._lifecycle, self._spawn_blocking)
+
+    def _spawn_blocking(self) -> _Worker:
+        """Start a worker process and wait for its handshake. Blocks the calling thread."""
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(child_conn, self.plugin_path),
+            daemon=True
+        )
+        process.start()
+        child_conn.close()
+
+        worker = _Worker(process, parent_conn)
+        try:
+            ok, error, peak_rss_kb = worker.request(None)
+        except (EOFError, OSError):
+            worker.kill()
+            raise PluginWorkerError("Plugin worker exited during start-up")
+        if not ok:
+            worker.kill()
+            raise PluginWorkerError(error)
+
+        worker.peak_rss_kb = peak_rss_kb
+        self._workers.add(worker)
+        return worker
+
+    async def run(self, function_name: str, parameters: Dict[str, Any], context: Dict[str, Any]) -> Any:
+        """
+        Run a plugin function on an idle worker.
+
+        Args:
+            function_name: Plugin function name
+            parameters: Input parameters
+            context: Execution context; waiting for an idle worker stops at its
+                `deadline`
+
+        Returns:
+            Function result
+
+        Raises:
+            ToolTimeoutError: If no worker becomes idle before the deadline
+            PluginWorkerError: If the pool has no workers left
+        """
+        if self._closed:
+            raise PluginWorkerError("Plugin process pool is shut down")
+        if not self._workers and not self._tasks:
+            raise PluginWorkerError(f"No plugin workers are running for {self.plugin_path}")
+
+        try:
+            worker = await asyncio.wait_for(self._idle.get(), timeout=remaining_time(context.get("deadline")))
+        except asyncio.TimeoutError:
+            raise ToolTimeoutError(f"No plugin worker became idle in time to run {function_name}")
+        if worker is None:
+            self._idle.put_nowait(None)
+            raise PluginWorkerError(f"No plugin workers are running for {self.plugin_path}")
+
+        request = self._io.submit(worker.request, (function_name, parameters, context))
+        try:
+            ok, payload, peak_rss_kb = await asyncio.wrap_future(request)
+        except asyncio.CancelledError:
+            # Killing is immediate and unblocks the I/O thread waiting for the reply
+            worker.process.kill()
+            self._replace(worker, kill=True, request=request)
+            raise
+        except (EOFError, OSError):
+            self.crashed += 1
+            self._replace(worker, kill=True)
+            raise PluginWorkerError(f"Plugin worker died while running {function_name}")
+        except Exception:
+            # E.g. a request or reply that cannot be pickled; the pipe is still in step
+            if worker.process.is_alive():
+                self._idle.put_nowait(worker)
+            else:
+                self.crashed += 1
+                self._replace(worker, kill=True)
+            raise
+
+        self.calls += 1
+        worker.calls += 1
+        worker.peak_rss_kb = peak_rss_kb
+        if self._should_recycle(worker):
+            self.recycled += 1
+            self._replace(worker, kill=False)
+        else:
+            self._idle.put_nowait(worker)
+
+        if not ok:
+            raise RuntimeError(payload)
+        return payload
+
+    def _should_recycle(self, worker: _Worker) -> bool:
+        """Check whether a worker reached its call or memory limit."""
+        if self.max_calls_per_worker and worker.calls >= self.max_calls_per_worker:
+            return True
+        if self.max_memory_mb and worker.peak_rss_kb > self.max_memory_mb * 1024:
+            return True
+        return False
+
+    def _replace(self, worker: _Worker, kill: bool, request: Optional["Future[Any]"] = None) -> None:
+        """Stop a worker and start a replacement in the background."""
+        task = asyncio.ensure_future(self._replace_worker(worker, kill, request))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _replace_worker(self, worker: _Worker, kill: bool, request: Optional["Future[Any]"]) -> None:
+        """Stop a worker and start a replacement."""
+        self._workers.discard(worker)
+        if request is not None:
+            # Let the I/O thread see the worker exit before its pipe is closed
+            await asyncio.gather(asyncio.wrap_future(request), return_exceptions=True)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._lifecycle, worker.kill if kill else worker.stop)
+
+        if self._closed:
+            return
+        try:
+            self._idle.put_nowait(await self._spawn())
+        except Exception as e:
+            logger.error(f"Failed to replace plugin worker for {self.plugin_path}: {str(e)}")
+            if not self._workers and not self._tasks - {asyncio.current_task()}:
+                # Wake the calls waiting for a worker that will never come
+                self._idle.put_nowait(None)
+
+    async def shutdown(self) -> None:
+        """Stop every worker, running the plugin's shutdown hook in each."""
+        self._closed = True
+        for task in list(self._tasks):
+            await asyncio.gather(task, return_exceptions=True)
+
+        loop = asyncio.get_running_loop()
+        workers = list(self._workers)
+        self._workers.clear()
+        await asyncio.gather(
+            *[loop.run_in_executor(self._lifecycle, worker.stop) for worker in workers],
+            return_exceptions=True
+        )
+        self._io.shutdown(wait=False)
+        self._lifecycle.shutdown(wait=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get process pool statistics.
+
+        Returns:
+            Process pool statistics
+        """
+        return {
+            "size": self.size,
+            "workers": len(self._workers),
+            "idle": self._idle.qsize(),
+            "calls": self.calls,
+            "recycled": self.recycled,
+            "crashed": self.crashed,
+            "peak_rss_kb": max((worker.peak_rss_kb for worker in self._workers), default=0),
+        }
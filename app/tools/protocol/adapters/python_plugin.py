@@ -5,18 +5,90 @@ This module implements the Python Plugin adapter for the Tool Integration Protoc
 """
 
 import asyncio
+import contextlib
 import importlib.util
 import inspect
 import logging
 import os
 import sys
-from typing import Any, Callable, Dict, Optional
+from concurrent.futures import Future
+from typing import Any, AsyncIterator, Callable, Dict, Optional
 
-from app.tools.protocol.adapters.base import ToolAdapter
+from app.tools.protocol.adapters.base import ToolAdapter, to_chunk
+from app.tools.protocol.adapters.process_pool import PluginProcessPool
+from app.tools.protocol.adapters.thread_pool import PluginThreadPool, get_shared_pool
+from app.tools.protocol.errors import ToolTimeoutError
 from app.tools.protocol.models import ToolManifest, ValidationResult
 
 logger = logging.getLogger(__name__)
 
+# How a capability may be run, declared as `concurrency` in its metadata
+CONCURRENCY_THREAD_SAFE = "thread_safe"  # Run concurrently on the thread pool
+CONCURRENCY_SERIAL = "serial"  # Run on the thread pool, one call at a time per plugin
+CONCURRENCY_ASYNC = "async"  # Run on the event loop; the function must not block
+CONCURRENCY_MODES = (CONCURRENCY_THREAD_SAFE, CONCURRENCY_SERIAL, CONCURRENCY_ASYNC)
+
+# Where plugin functions run, set as `execution_mode` in the adapter config
+EXECUTION_MODE_THREAD = "thread"  # In this process, per the capability's concurrency mode
+EXECUTION_MODE_PROCESS = "process"  # In a pool of worker processes, each with its own copy of the plugin
+EXECUTION_MODES = (EXECUTION_MODE_THREAD, EXECUTION_MODE_PROCESS)
+
+# Returned by `next` when a generator is exhausted
+_EXHAUSTED = object()
+
+
+class _SerialSlot:
+    """The plugin's serial lock, held by one call."""
+
+    __slots__ = ("future",)
+
+    def __init__(self):
+        # Pool future of the function the call is running, if any
+        self.future: Optional["Future[Any]"] = None
+
+
+def is_streaming_function(func: Callable[..., Any]) -> bool:
+    """
+    Check whether a plugin function yields its result in chunks.
+    
+    Args:
+        func: Plugin function
+        
+    Returns:
+        True for generator and async generator functions
+    """
+    return inspect.isgeneratorfunction(func) or inspect.isasyncgenfunction(func)
+
+
+def load_plugin(path: str) -> Any:
+    """
+    Load a Python module from a file path.
+    
+    Args:
+        path: Path to the Python file
+        
+    Returns:
+        Loaded module
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Plugin file not found: {path}")
+    
+    # Get module name from file path
+    module_name = os.path.basename(path)
+    if module_name.endswith(".py"):
+        module_name = module_name[:-3]
+    
+    # Load module
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    if not spec or not spec.loader:
+        raise ImportError(f"Failed to load plugin: {path}")
+    
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    
+    return module
+
 
 class PythonPluginAdapter(ToolAdapter):
     """
@@ -37,6 +109,13 @@ class PythonPluginAdapter(ToolAdapter):
         self.plugin_module = None
         self.sandbox_enabled = True
         self.functions = {}
+        self.concurrency = {}
+        self.thread_pool: Optional[PluginThreadPool] = None
+        self._owns_thread_pool = False
+        self._serial_lock = asyncio.Lock()
+        self._serial_waiting = 0
+        self.execution_mode = EXECUTION_MODE_THREAD
+        self.process_pool: Optional[PluginProcessPool] = None
     
     async def initialize(self, config: Dict[str, Any]) -> bool:
         """
@@ -57,6 +136,21 @@ class PythonPluginAdapter(ToolAdapter):
             
             self.sandbox_enabled = config.get("sandbox_enabled", True)
             
+            self.execution_mode = config.get("execution_mode", EXECUTION_MODE_THREAD)
+            if self.execution_mode not in EXECUTION_MODES:
+                logger.error(f"Invalid execution_mode for Python Plugin adapter: {self.execution_mode}")
+                return False
+            
+            # Synchronous functions run on a thread pool, shared by default
+            if config.get("thread_pool", "shared") == "dedicated":
+                self.thread_pool = PluginThreadPool(
+                    self.manifest.tool_id,
+                    max_workers=config.get("max_workers", 4)
+                )
+                self._owns_thread_pool = True
+            else:
+                self.thread_pool = get_shared_pool()
+            
             # Load plugin
             if self.sandbox_enabled:
                 # Use sandbox to load plugin
@@ -77,6 +171,20 @@ class PythonPluginAdapter(ToolAdapter):
                     return False
                 
                 self.functions[func_name] = getattr(self.plugin_module, func_name)
+                self.concurrency[func_name] = capability.metadata.get(
+                    "concurrency",
+                    CONCURRENCY_ASYNC if self._is_async(self.functions[func_name]) else CONCURRENCY_SERIAL
+                )
+            
+            # CPU-bound plugins run in worker processes, which load the plugin themselves
+            if self.execution_mode == EXECUTION_MODE_PROCESS:
+                self.process_pool = PluginProcessPool(
+                    os.path.abspath(self.plugin_path),
+                    size=config.get("processes"),
+                    max_calls_per_worker=config.get("max_calls_per_worker", 1000),
+                    max_memory_mb=config.get("max_worker_memory_mb")
+                )
+                await self.process_pool.start()
             
             logger.info(f"Python Plugin adapter initialized successfully: {self.plugin_path}")
             return True
@@ -94,24 +202,7 @@ class PythonPluginAdapter(ToolAdapter):
         Returns:
             Loaded module
         """
-        if not os.path.exists(path):
-            raise FileNotFoundError(f"Plugin file not found: {path}")
-        
-        # Get module name from file path
-        module_name = os.path.basename(path)
-        if module_name.endswith(".py"):
-            module_name = module_name[:-3]
-        
-        # Load module
-        spec = importlib.util.spec_from_file_location(module_name, path)
-        if not spec or not spec.loader:
-            raise ImportError(f"Failed to load plugin: {path}")
-        
-        module = importlib.util.module_from_spec(spec)
-        sys.modules[module_name] = module
-        spec.loader.exec_module(module)
-        
-        return module
+        return load_plugin(path)
     
     async def _load_sandboxed_plugin(self, path: str) -> Any:
         """
@@ -163,6 +254,14 @@ class PythonPluginAdapter(ToolAdapter):
             sig = inspect.signature(func)
             if len(sig.parameters) < 1:
                 errors.append(f"Function {func_name} must accept at least one parameter (parameters)")
+            
+            # Check concurrency mode
+            concurrency = capability.metadata.get("concurrency")
+            if concurrency is not None and concurrency not in CONCURRENCY_MODES:
+                errors.append(
+                    f"Capability {func_name} has invalid concurrency {concurrency!r}, "
+                    f"expected one of {', '.join(CONCURRENCY_MODES)}"
+                )
         
         # Check for initialize and shutdown functions
         if hasattr(self.plugin_module, "initialize") and not callable(getattr(self.plugin_module, "initialize")):
@@ -203,28 +302,196 @@ class PythonPluginAdapter(ToolAdapter):
         if not func:
             raise ValueError(f"Function not found: {capability_id}")
         
+        # Streaming functions return all their chunks at once
+        if is_streaming_function(func) and not self.process_pool:
+            return {"chunks": [chunk async for chunk in self.execute_stream(capability_id, parameters, context)]}
+        
         # Execute function
         try:
-            # Check if function is async
-            if asyncio.iscoroutinefunction(func):
-                result = await func(parameters, context)
+            concurrency = self.concurrency.get(capability_id, CONCURRENCY_SERIAL)
+            if self.process_pool:
+                # Each worker runs one call at a time, so every concurrency mode is safe
+                result = await self.process_pool.run(capability_id, parameters, context)
             else:
-                result = func(parameters, context)
+                async with self._slot(concurrency) as slot:
+                    result = await self._call(func, concurrency, parameters, context, slot)
             
             # Ensure result is a dictionary
-            if not isinstance(result, dict):
-                result = {"result": result}
-            
-            return result
+            return to_chunk(result)
+        except ToolTimeoutError:
+            raise
         except Exception as e:
             logger.error(f"Error executing capability {capability_id}: {str(e)}")
             raise RuntimeError(f"Execution error: {str(e)}")
     
+    async def execute_stream(
+        self,
+        capability_id: str,
+        parameters: Dict[str, Any],
+        context: Dict[str, Any]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Execute a tool capability, yielding its result in chunks.
+        
+        Generator functions yield one chunk per item; synchronous generators are
+        advanced on the thread pool. Other functions, and every function in
+        process mode, yield their whole result as a single chunk.
+        
+        Args:
+            capability_id: Capability ID
+            parameters: Input parameters
+            context: Execution context
+            
+        Returns:
+            Iterator over result chunks
+        """
+        if not self.plugin_module:
+            raise RuntimeError("Python Plugin not loaded")
+        
+        func = self.functions.get(capability_id)
+        if not func:
+            raise ValueError(f"Function not found: {capability_id}")
+        
+        if not is_streaming_function(func) or self.process_pool:
+            yield await self.execute(capability_id, parameters, context)
+            return
+        
+        concurrency = self.concurrency.get(capability_id, CONCURRENCY_SERIAL)
+        try:
+            async with self._slot(concurrency) as slot:
+                if inspect.isasyncgenfunction(func):
+                    async for chunk in func(parameters, context):
+                        yield to_chunk(chunk)
+                    return
+                
+                generator = func(parameters, context)
+                try:
+                    while True:
+                        if concurrency == CONCURRENCY_ASYNC:
+                            chunk = next(generator, _EXHAUSTED)
+                        else:
+                            chunk = await self._run_on_pool(slot, next, generator, _EXHAUSTED)
+                        if chunk is _EXHAUSTED:
+                            break
+                        yield to_chunk(chunk)
+                finally:
+                    with contextlib.suppress(ValueError):
+                        # Raises if a cancelled call is still running on the pool
+                        generator.close()
+        except Exception as e:
+            logger.error(f"Error streaming capability {capability_id}: {str(e)}")
+            raise RuntimeError(f"Execution error: {str(e)}")
+    
+    @contextlib.asynccontextmanager
+    async def _slot(self, concurrency: str) -> AsyncIterator[Optional[_SerialSlot]]:
+        """
+        Hold the plugin's serial lock for a call, if its concurrency mode requires it.
+        
+        A call cancelled while its function runs on the thread pool cannot stop
+        the function, so the lock is held until the function returns.
+        
+        Args:
+            concurrency: Concurrency mode
+            
+        Returns:
+            Slot to run pool functions in with `_run_on_pool`, or None if the
+            call does not take the lock
+        """
+        if concurrency != CONCURRENCY_SERIAL:
+            yield None
+            return
+        
+        self._serial_waiting += 1
+        try:
+            await self._serial_lock.acquire()
+        finally:
+            self._serial_waiting -= 1
+        slot = _SerialSlot()
+        try:
+            yield slot
+        finally:
+            if slot.future is not None and not slot.future.done():
+                loop = asyncio.get_running_loop()
+                slot.future.add_done_callback(
+                    lambda _: loop.call_soon_threadsafe(self._serial_lock.release)
+                )
+            else:
+                self._serial_lock.release()
+    
+    async def _run_on_pool(self, slot: Optional[_SerialSlot], func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run a function on the thread pool within a call's slot.
+        
+        Args:
+            slot: Slot of the call, or None
+            func: Function to run
+            *args: Function arguments
+            
+        Returns:
+            Function result
+        """
+        future = self.thread_pool.submit(func, *args)
+        if slot is not None:
+            slot.future = future
+        return await self.thread_pool.wait(future)
+    
+    @staticmethod
+    def _is_async(func: Callable[..., Any]) -> bool:
+        """Check whether a plugin function runs on the event loop."""
+        return asyncio.iscoroutinefunction(func) or inspect.isasyncgenfunction(func)
+    
+    async def _call(
+        self,
+        func: Callable[..., Any],
+        concurrency: str,
+        parameters: Dict[str, Any],
+        context: Dict[str, Any],
+        slot: Optional[_SerialSlot] = None
+    ) -> Any:
+        """
+        Call a plugin function according to its concurrency mode.
+        
+        Args:
+            func: Plugin function
+            concurrency: Concurrency mode
+            parameters: Input parameters
+            context: Execution context
+            slot: Serial slot held by the call, if any
+            
+        Returns:
+            Function result
+        """
+        if asyncio.iscoroutinefunction(func):
+            return await func(parameters, context)
+        
+        if concurrency == CONCURRENCY_ASYNC:
+            return func(parameters, context)
+        
+        return await self._run_on_pool(slot, func, parameters, context)
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get adapter metrics.
+        
+        Returns:
+            Thread pool, process pool and serial queue metrics
+        """
+        return {
+            "execution_mode": self.execution_mode,
+            "thread_pool": self.thread_pool.get_stats() if self.thread_pool else None,
+            "process_pool": self.process_pool.get_stats() if self.process_pool else None,
+            "serial_waiting": self._serial_waiting,
+        }
+    
     async def shutdown(self) -> None:
         """
         Shutdown the adapter and release resources.
         """
-        if self.plugin_module and hasattr(self.plugin_module, "shutdown"):
+        if self.process_pool:
+            # Workers run the plugin's shutdown hook themselves
+            await self.process_pool.shutdown()
+            self.process_pool = None
+        elif self.plugin_module and hasattr(self.plugin_module, "shutdown"):
             try:
                 shutdown_func = getattr(self.plugin_module, "shutdown")
                 if asyncio.iscoroutinefunction(shutdown_func):
@@ -234,6 +501,10 @@ class PythonPluginAdapter(ToolAdapter):
             except Exception as e:
                 logger.error(f"Error shutting down plugin: {str(e)}")
         
+        if self.thread_pool and self._owns_thread_pool:
+            self.thread_pool.shutdown()
+        self.thread_pool = None
+        
         self.plugin_module = None
         self.functions = {}
         logger.info("Python Plugin adapter shut down") 
\ No newline at end of file
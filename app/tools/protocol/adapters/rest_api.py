@@ -4,16 +4,105 @@ Tool Integration Protocol - REST API Adapter
 This module implements the REST API adapter for the Tool Integration Protocol.
 """
 
+import asyncio
+import functools
+import json
 import logging
-from typing import Any, Dict, Optional
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
 
 import httpx
 
-from app.tools.protocol.adapters.base import ToolAdapter
-from app.tools.protocol.models import ToolManifest, ValidationResult
+from app.tools.protocol.adapters.base import ToolAdapter, to_chunk
+from app.tools.protocol.adapters.batching import MicroBatcher
+from app.tools.protocol.adapters.http_cache import CachedResponse, HttpCache
+from app.tools.protocol.adapters.http_pool import HttpClientPool, get_shared_http_pool
+from app.tools.protocol.adapters.oauth import TokenManager
+from app.tools.protocol.errors import ToolRequestError, ToolTimeoutError
+from app.tools.protocol.models import AuthenticationType, Capability, ToolManifest, ValidationResult
+from app.tools.protocol.retry import LatencyTracker, RetryBudget, RetryPolicy, remaining_time
 
 logger = logging.getLogger(__name__)
 
+# Response body formats of streaming capabilities, declared as `stream` in their metadata
+STREAM_NDJSON = "ndjson"  # One JSON document per line
+STREAM_SSE = "sse"  # Server-sent events with JSON data
+STREAM_FORMATS = (STREAM_NDJSON, STREAM_SSE)
+
+# Capability, endpoint, HTTP method, request parameters and authentication headers of a call
+PreparedRequest = Tuple[Capability, str, str, Dict[str, Any], Dict[str, str]]
+
+# Item statuses of a batch response that mean the item timed out
+BATCH_TIMEOUT_STATUSES = (408, 504)
+
+# Client error statuses that still reflect the backend's health: it is overloaded or too slow
+BACKEND_CLIENT_STATUSES = (408, 429)
+
+
+def is_rejected_request(status_code: int) -> bool:
+    """
+    Check whether a status means the backend rejected the request itself.
+    
+    Args:
+        status_code: HTTP status code
+        
+    Returns:
+        Whether the status is a client error caused by the request
+    """
+    return 400 <= status_code < 500 and status_code not in BACKEND_CLIENT_STATUSES
+
+
+async def parse_ndjson(lines: AsyncIterator[str]) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Parse newline-delimited JSON.
+    
+    Args:
+        lines: Response body lines
+        
+    Returns:
+        Iterator over the parsed documents
+    """
+    async for line in lines:
+        if line.strip():
+            yield to_chunk(json.loads(line))
+
+
+async def parse_sse(lines: AsyncIterator[str]) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Parse server-sent events.
+    
+    Event data that is not JSON is returned as a string under `data`.
+    
+    Args:
+        lines: Response body lines
+        
+    Returns:
+        Iterator over the events' data
+    """
+    data: List[str] = []
+    async for line in lines:
+        if line:
+            field, _, value = line.partition(":")
+            if field == "data":
+                data.append(value[1:] if value.startswith(" ") else value)
+            continue
+        
+        # A blank line dispatches the event
+        if data:
+            yield _parse_event_data("\n".join(data))
+            data = []
+    
+    if data:
+        yield _parse_event_data("\n".join(data))
+
+
+def _parse_event_data(data: str) -> Dict[str, Any]:
+    """Decode the data of a server-sent event."""
+    try:
+        return to_chunk(json.loads(data))
+    except ValueError:
+        return {"data": data}
+
 
 class RestApiAdapter(ToolAdapter):
     """
@@ -34,6 +123,20 @@ class RestApiAdapter(ToolAdapter):
         self.headers = {}
         self.timeout = 30
         self.client = None
+        self.http_pool: Optional[HttpClientPool] = None
+        self.retry_policies: Dict[str, RetryPolicy] = {}
+        self.retry_budget = RetryBudget()
+        self._latency: Dict[str, LatencyTracker] = {}
+        self.http_cache: Optional[HttpCache] = None
+        self._revalidations: Dict[str, "asyncio.Task[httpx.Response]"] = {}
+        self.batchers: Dict[str, MicroBatcher] = {}
+        self.token_manager: Optional[TokenManager] = None
+        
+        # Statistics
+        self.requests = 0
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
     
     async def initialize(self, config: Dict[str, Any]) -> bool:
         """
@@ -54,23 +157,60 @@ class RestApiAdapter(ToolAdapter):
             
             self.headers = config.get("headers", {})
             self.timeout = config.get("timeout", 30)
+            self.retry_budget = RetryBudget(ratio=config.get("retry_budget_ratio", 0.1))
+            
+            # Retry policies are declared per capability
+            for capability in self.manifest.capabilities:
+                retry = capability.metadata.get("retry")
+                if retry:
+                    self.retry_policies[capability.capability_id] = RetryPolicy(**retry)
+            
+            # Collect concurrent calls of capabilities with a batch endpoint
+            for capability in self.manifest.capabilities:
+                if capability.metadata.get("batch_endpoint"):
+                    self.batchers[capability.capability_id] = MicroBatcher(
+                        functools.partial(self._send_batch, capability),
+                        max_batch_size=capability.metadata.get("max_batch_size", 100),
+                        window=capability.metadata.get("batch_window_ms", 5) / 1000
+                    )
             
-            # Initialize HTTP client
-            self.client = httpx.AsyncClient(
-                base_url=self.base_url,
-                headers=self.headers,
-                timeout=self.timeout
+            # Cache GET responses according to their caching headers
+            http_cache = config.get("http_cache", {})
+            if http_cache is not False:
+                self.http_cache = HttpCache(**http_cache)
+            
+            # Fetch OAuth2 tokens ourselves if the tool declares a token endpoint
+            auth = self.manifest.authentication
+            oauth_config = {**auth.config, **config.get("oauth", {})}
+            manages_tokens = (
+                auth.type in (AuthenticationType.OAUTH2, AuthenticationType.BEARER)
+                and bool(oauth_config.get("token_url"))
             )
+            if manages_tokens:
+                TokenManager.check_config(oauth_config)
+            
+            # Borrow the HTTP clients shared by tools on the same origins; they are
+            # released below if the rest of the initialization fails
+            self.http_pool = get_shared_http_pool()
+            self.client = self.http_pool.acquire(self.base_url)
+            if manages_tokens:
+                self.token_manager = TokenManager.from_config(
+                    self.http_pool.acquire(oauth_config["token_url"]),
+                    oauth_config
+                )
+                # Have a token ready before the first call
+                await self.token_manager.get_token()
             
             # Test connection
             test_url = config.get("test_url", "/")
-            response = await self.client.get(test_url)
+            response = await self.client.get(self._url(test_url), headers=self.headers, timeout=self.timeout)
             response.raise_for_status()
             
             logger.info(f"REST API adapter initialized successfully: {self.base_url}")
             return True
         except Exception as e:
             logger.error(f"Failed to initialize REST API adapter: {str(e)}")
+            await self._release_clients()
             return False
     
     async def validate(self) -> ValidationResult:
@@ -90,16 +230,19 @@ class RestApiAdapter(ToolAdapter):
         
         # Check authentication
         auth = self.manifest.authentication
-        if auth.type != "none" and not auth.name:
+        if auth.type != "none" and not auth.name and self.token_manager is None:
             errors.append("Authentication name is required for REST API tools")
         
         # Check capabilities
         for capability in self.manifest.capabilities:
             # Check if endpoint is specified in metadata
-            endpoint = capability.metadata.get("endpoint")
+            endpoint = capability.metadata.get("endpoint") or capability.metadata.get("batch_endpoint")
             if not endpoint:
                 errors.append(f"Capability {capability.capability_id} must specify endpoint in metadata")
             
+            if capability.metadata.get("batch_endpoint") and capability.metadata.get("stream"):
+                errors.append(f"Capability {capability.capability_id} cannot both batch and stream")
+            
             # Check if method is specified in metadata
             method = capability.metadata.get("method")
             if not method:
@@ -128,6 +271,169 @@ class RestApiAdapter(ToolAdapter):
         Returns:
             Execution result
         """
+        batcher = self.batchers.get(capability_id)
+        if batcher is not None:
+            return await self._execute_batched(batcher, parameters, context)
+        
+        request = await self._prepare_request(capability_id, parameters, context)
+        capability = request[0]
+        
+        # Streaming capabilities return all their chunks at once
+        if capability.metadata.get("stream"):
+            return {"chunks": [chunk async for chunk in self._execute_prepared_stream(request, context)]}
+        return await self._execute_prepared(request, context)
+    
+    async def execute_stream(
+        self,
+        capability_id: str,
+        parameters: Dict[str, Any],
+        context: Dict[str, Any]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Execute a tool capability, yielding its result in chunks.
+        
+        Capabilities declaring `stream` as `ndjson` or `sse` in their metadata
+        are read incrementally, one chunk per JSON line or server-sent event.
+        Other capabilities yield their whole result as a single chunk.
+        
+        Args:
+            capability_id: Capability ID
+            parameters: Input parameters
+            context: Execution context
+            
+        Returns:
+            Iterator over result chunks
+        """
+        if capability_id in self.batchers:
+            yield await self.execute(capability_id, parameters, context)
+            return
+        
+        request = await self._prepare_request(capability_id, parameters, context)
+        capability = request[0]
+        if not capability.metadata.get("stream"):
+            yield await self._execute_prepared(request, context)
+            return
+        
+        async for chunk in self._execute_prepared_stream(request, context):
+            yield chunk
+    
+    async def _execute_prepared(self, request: PreparedRequest, context: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Send a prepared request and return its parsed response.
+        
+        Args:
+            request: Prepared request
+            context: Execution context
+            
+        Returns:
+            Execution result
+        """
+        capability, endpoint, method, request_parameters, headers = request
+        capability_id = capability.capability_id
+        try:
+            if self.http_cache is not None and method == "GET":
+                response = await self._send_cached(capability, endpoint, request_parameters, headers, context)
+            else:
+                response = await self._send_with_policy(
+                    capability_id, method, endpoint, request_parameters, headers, context
+                )
+            
+            # Check response
+            self._check_unauthorized(response, context)
+            response.raise_for_status()
+            
+            # Parse response
+            result = response.json()
+            
+            return result
+        except Exception as e:
+            raise self._map_error(capability_id, e)
+    
+    async def _execute_prepared_stream(
+        self,
+        request: PreparedRequest,
+        context: Dict[str, Any]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Send a prepared request of a streaming capability and read its response incrementally.
+        
+        Args:
+            request: Prepared request
+            context: Execution context
+            
+        Returns:
+            Iterator over result chunks
+        """
+        capability, endpoint, method, request_parameters, headers = request
+        capability_id = capability.capability_id
+        stream_format = capability.metadata.get("stream")
+        if stream_format not in STREAM_FORMATS:
+            raise ValueError(f"Unsupported stream format for capability {capability_id}: {stream_format}")
+        
+        if method in ("GET", "DELETE"):
+            request_args = {"params": request_parameters}
+        else:
+            request_args = {"json": request_parameters}
+        try:
+            self.requests += 1
+            async with self.client.stream(
+                method,
+                self._url(endpoint),
+                headers={**self.headers, **headers},
+                timeout=self._get_timeout(context),
+                **request_args
+            ) as response:
+                self._check_unauthorized(response, context)
+                response.raise_for_status()
+                
+                lines = response.aiter_lines()
+                chunks = parse_ndjson(lines) if stream_format == STREAM_NDJSON else parse_sse(lines)
+                async for chunk in chunks:
+                    yield chunk
+        except Exception as e:
+            raise self._map_error(capability_id, e)
+    
+    def _map_error(self, capability_id: str, error: Exception) -> Exception:
+        """
+        Translate an exception raised while calling the backend.
+        
+        Args:
+            capability_id: Capability ID
+            error: Exception
+            
+        Returns:
+            Exception to raise
+        """
+        if isinstance(error, (httpx.TimeoutException, ToolTimeoutError)):
+            logger.error(f"Timeout executing capability {capability_id}: {str(error)}")
+            return ToolTimeoutError(f"Capability {capability_id} of tool {self.manifest.tool_id} timed out")
+        if isinstance(error, httpx.HTTPError):
+            logger.error(f"HTTP error executing capability {capability_id}: {str(error)}")
+            if isinstance(error, httpx.HTTPStatusError) and is_rejected_request(error.response.status_code):
+                return ToolRequestError(f"HTTP error: {str(error)}")
+            return RuntimeError(f"HTTP error: {str(error)}")
+        
+        logger.error(f"Error executing capability {capability_id}: {str(error)}")
+        return RuntimeError(f"Execution error: {str(error)}")
+    
+    async def _prepare_request(
+        self,
+        capability_id: str,
+        parameters: Dict[str, Any],
+        context: Dict[str, Any]
+    ) -> PreparedRequest:
+        """
+        Resolve a capability into the parts of its HTTP request.
+        
+        Args:
+            capability_id: Capability ID
+            parameters: Input parameters
+            context: Execution context
+            
+        Returns:
+            Tuple of the capability, endpoint, HTTP method, request parameters
+            and authentication headers
+        """
         # Check if client is initialized
         if not self.client:
             raise RuntimeError("REST API adapter not initialized")
@@ -149,54 +455,597 @@ class RestApiAdapter(ToolAdapter):
         
         method = capability.metadata.get("method", "POST").upper()
         
-        # Prepare request
+        # Add authentication if required, without modifying the caller's parameters
+        headers, query = await self._get_auth(context)
+        if query:
+            parameters = {**parameters, **query}
+        
+        return capability, endpoint, method, parameters, headers
+    
+    async def _get_auth(self, context: Dict[str, Any]) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """
+        Get the authentication of a call.
+        
+        A value for the authentication parameter in `context["auth"]` is used as
+        is. Otherwise, tools with a token endpoint use a cached OAuth2 token, for
+        the client in `context["auth"]` (`client_id`, `client_secret`, `scope`)
+        or the configured one.
+        
+        Args:
+            context: Execution context
+            
+        Returns:
+            Tuple of the authentication headers and query parameters
+        """
         headers = {}
+        query = {}
         
-        # Add authentication if required
         auth = self.manifest.authentication
-        if auth.type != "none" and auth.required:
-            auth_value = context.get("auth", {}).get(auth.name)
+        credentials = context.get("auth", {})
+        auth_value = credentials.get(auth.name) if auth.name else None
+        
+        if not auth_value and self.token_manager is not None:
+            token = await self.token_manager.get_token(
+                credentials.get("client_id"),
+                credentials.get("client_secret"),
+                credentials.get("scope")
+            )
+            if auth.location == "query":
+                query[auth.name or "access_token"] = token.value
+            else:
+                headers[auth.name or "Authorization"] = token.authorization()
+        elif auth.type != "none" and auth.required:
             if not auth_value:
                 raise ValueError(f"Authentication required: {auth.name}")
             
             if auth.location == "header":
                 headers[auth.name] = auth_value
             elif auth.location == "query":
-                # Add to query parameters
-                parameters[auth.name] = auth_value
+                query[auth.name] = auth_value
+        
+        return headers, query
+    
+    def _check_unauthorized(self, response: httpx.Response, context: Dict[str, Any]) -> None:
+        """
+        Drop a managed token the backend rejected, so that the next call fetches a new one.
+        
+        Args:
+            response: HTTP response
+            context: Execution context
+        """
+        if response.status_code != 401 or self.token_manager is None:
+            return
+        
+        auth = self.manifest.authentication
+        credentials = context.get("auth", {})
+        if auth.name and credentials.get(auth.name):
+            # The caller supplied the token
+            return
+        
+        self.token_manager.invalidate(
+            credentials.get("client_id"),
+            credentials.get("client_secret"),
+            credentials.get("scope")
+        )
+    
+    async def _execute_batched(
+        self,
+        batcher: MicroBatcher,
+        parameters: Dict[str, Any],
+        context: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Execute a call as part of a batch.
+        
+        Only calls with the same credentials share a batch.
+        
+        Args:
+            batcher: Micro-batcher of the capability
+            parameters: Input parameters
+            context: Execution context
+            
+        Returns:
+            Execution result
+        """
+        if not self.client:
+            raise RuntimeError("REST API adapter not initialized")
+        
+        headers, query = await self._get_auth(context)
+        key = (tuple(sorted(headers.items())), tuple(sorted(query.items())))
+        return to_chunk(await batcher.submit(key, (parameters, context)))
+    
+    async def _send_batch(self, capability: Capability, key: Hashable, items: List[Any]) -> List[Any]:
+        """
+        Send a batch of calls to a capability's batch endpoint.
+        
+        The endpoint receives `{"requests": [parameters, ...]}` and answers with
+        `{"results": [...]}` in the same order, each item holding either a
+        `result` or an `error` with an optional HTTP `status`.
+        
+        Args:
+            capability: Capability
+            key: Batch key holding the authentication headers and query parameters
+            items: Parameters and execution context of each call
+            
+        Returns:
+            Result or exception per call
+        """
+        capability_id = capability.capability_id
+        headers, query = (dict(part) for part in key)
+        
+        # The batch runs until the last caller's deadline; callers with earlier ones stop waiting on their own
+        deadlines = [context.get("deadline") for _, context in items]
+        context = {} if None in deadlines else {"deadline": max(deadlines)}
         
-        # Execute request
         try:
-            if method == "GET":
-                response = await self.client.get(endpoint, params=parameters, headers=headers)
-            elif method == "POST":
-                response = await self.client.post(endpoint, json=parameters, headers=headers)
-            elif method == "PUT":
-                response = await self.client.put(endpoint, json=parameters, headers=headers)
-            elif method == "DELETE":
-                response = await self.client.delete(endpoint, params=parameters, headers=headers)
+            send = functools.partial(
+                self.client.post,
+                self._url(capability.metadata["batch_endpoint"]),
+                json={"requests": [parameters for parameters, _ in items]},
+                params=query or None,
+                headers={**self.headers, **headers},
+                timeout=self._get_timeout(context)
+            )
+            policy = self.retry_policies.get(capability_id)
+            if policy:
+                response = await self._send_with_retries(capability_id, "POST", policy, send, context)
             else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
+                self.requests += 1
+                response = await send()
             
-            # Check response
+            # Every call in a batch has the same credentials
+            self._check_unauthorized(response, items[0][1])
             response.raise_for_status()
+            results = response.json().get("results")
+            if not isinstance(results, list):
+                raise ValueError("Batch response has no results list")
+        except Exception as e:
+            raise self._map_error(capability_id, e)
+        
+        return [self._get_batch_outcome(capability_id, item) for item in results]
+    
+    def _get_batch_outcome(self, capability_id: str, item: Any) -> Any:
+        """
+        Translate one item of a batch response into a result or an exception.
+        
+        Args:
+            capability_id: Capability ID
+            item: Batch response item
             
-            # Parse response
-            result = response.json()
+        Returns:
+            Result, or the exception to raise for the call
+        """
+        if not isinstance(item, dict) or ("result" not in item and "error" not in item):
+            return RuntimeError(f"Execution error: malformed batch result for capability {capability_id}")
+        
+        if "error" not in item:
+            return item["result"]
+        
+        error = item["error"]
+        message = error.get("message", str(error)) if isinstance(error, dict) else str(error)
+        status = item.get("status")
+        if status in BATCH_TIMEOUT_STATUSES:
+            return ToolTimeoutError(f"Capability {capability_id} of tool {self.manifest.tool_id} timed out")
+        if isinstance(status, int) and is_rejected_request(status):
+            return ToolRequestError(f"HTTP error: {status} {message}")
+        if status is not None:
+            return RuntimeError(f"HTTP error: {status} {message}")
+        return RuntimeError(f"Execution error: {message}")
+    
+    async def _send_with_policy(
+        self,
+        capability_id: str,
+        method: str,
+        endpoint: str,
+        parameters: Dict[str, Any],
+        headers: Dict[str, str],
+        context: Dict[str, Any]
+    ) -> httpx.Response:
+        """
+        Send a request, applying the capability's retry policy if it has one.
+        
+        Args:
+            capability_id: Capability ID
+            method: HTTP method
+            endpoint: Endpoint path
+            parameters: Input parameters
+            headers: Request headers
+            context: Execution context
             
-            return result
-        except httpx.HTTPError as e:
-            logger.error(f"HTTP error executing capability {capability_id}: {str(e)}")
-            raise RuntimeError(f"HTTP error: {str(e)}")
-        except Exception as e:
-            logger.error(f"Error executing capability {capability_id}: {str(e)}")
-            raise RuntimeError(f"Execution error: {str(e)}")
+        Returns:
+            HTTP response
+        """
+        send = functools.partial(self._send, method, endpoint, parameters, headers, context)
+        policy = self.retry_policies.get(capability_id)
+        if policy:
+            return await self._send_with_retries(capability_id, method, policy, send, context)
+        
+        self.requests += 1
+        return await send()
+    
+    async def _send_cached(
+        self,
+        capability: Capability,
+        endpoint: str,
+        parameters: Dict[str, Any],
+        headers: Dict[str, str],
+        context: Dict[str, Any]
+    ) -> httpx.Response:
+        """
+        Send a GET request through the HTTP cache.
+        
+        Fresh responses are served from the cache. Stale responses are revalidated
+        with their ETag or Last-Modified date, or served while revalidating in the
+        background if the capability opts in to `stale_while_revalidate`.
+        
+        Args:
+            capability: Capability
+            endpoint: Endpoint path
+            parameters: Input parameters
+            headers: Request headers
+            context: Execution context
+            
+        Returns:
+            HTTP response
+        """
+        key = HttpCache.make_key(self._url(endpoint), parameters, {**self.headers, **headers})
+        entry = await self.http_cache.get(key)
+        now = time.time()
+        
+        if entry is None:
+            self.http_cache.misses += 1
+        elif entry.is_fresh(now):
+            self.http_cache.hits += 1
+            return entry.to_response(now)
+        else:
+            window = self._get_stale_window(capability, entry)
+            if window and entry.age(now) < entry.max_age + window:
+                self.http_cache.stale_hits += 1
+                # The caller's deadline does not apply to the background request
+                background_context = {name: value for name, value in context.items() if name != "deadline"}
+                self._revalidate_in_background(key, entry, capability, endpoint, parameters, headers, background_context)
+                return entry.to_response(now)
+        
+        return await self._fetch(key, entry, capability, endpoint, parameters, headers, context)
+    
+    async def _fetch(
+        self,
+        key: str,
+        entry: Optional[CachedResponse],
+        capability: Capability,
+        endpoint: str,
+        parameters: Dict[str, Any],
+        headers: Dict[str, str],
+        context: Dict[str, Any]
+    ) -> httpx.Response:
+        """
+        Fetch a response from the backend, revalidating a stored one if possible, and cache it.
+        
+        Args:
+            key: Cache key
+            entry: Stored response, if any
+            capability: Capability
+            endpoint: Endpoint path
+            parameters: Input parameters
+            headers: Request headers
+            context: Execution context
+            
+        Returns:
+            HTTP response
+        """
+        conditional = entry.validators() if entry is not None else {}
+        response = await self._send_with_policy(
+            capability.capability_id, "GET", endpoint, parameters, {**headers, **conditional}, context
+        )
+        now = time.time()
+        
+        if response.status_code == 304 and entry is not None:
+            self.http_cache.revalidations += 1
+            entry = entry.refreshed(response, now)
+            await self.http_cache.set(key, entry)
+            return entry.to_response(now)
+        
+        new_entry = CachedResponse.from_response(response, now)
+        if new_entry is not None:
+            await self.http_cache.set(key, new_entry)
+        
+        return response
+    
+    def _get_stale_window(self, capability: Capability, entry: CachedResponse) -> Optional[float]:
+        """
+        Get how long past its freshness a response may be served while revalidating.
+        
+        Capabilities opt in with `stale_while_revalidate` in their metadata: true
+        uses the response's own directive, a number of seconds also applies when
+        the response has none.
+        
+        Args:
+            capability: Capability
+            entry: Stored response
+            
+        Returns:
+            Window in seconds, or None if stale responses must not be served
+        """
+        opt_in = capability.metadata.get("stale_while_revalidate")
+        if not opt_in:
+            return None
+        
+        if entry.stale_while_revalidate is not None:
+            return entry.stale_while_revalidate
+        
+        if isinstance(opt_in, bool):
+            return None
+        
+        return float(opt_in)
+    
+    def _revalidate_in_background(
+        self,
+        key: str,
+        entry: CachedResponse,
+        capability: Capability,
+        endpoint: str,
+        parameters: Dict[str, Any],
+        headers: Dict[str, str],
+        context: Dict[str, Any]
+    ) -> None:
+        """Refresh a stale response unless a refresh is already running."""
+        if key in self._revalidations:
+            return
+        
+        task = asyncio.ensure_future(self._fetch(key, entry, capability, endpoint, parameters, headers, context))
+        self._revalidations[key] = task
+        task.add_done_callback(functools.partial(self._on_revalidated, key))
+    
+    def _on_revalidated(self, key: str, task: "asyncio.Task[httpx.Response]") -> None:
+        """Clean up after a background revalidation."""
+        self._revalidations.pop(key, None)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Background revalidation failed for tool {self.manifest.tool_id}: {task.exception()}")
+    
+    async def _send(
+        self,
+        method: str,
+        endpoint: str,
+        parameters: Dict[str, Any],
+        headers: Dict[str, str],
+        context: Dict[str, Any]
+    ) -> httpx.Response:
+        """
+        Send a single request.
+        
+        Args:
+            method: HTTP method
+            endpoint: Endpoint path
+            parameters: Input parameters
+            headers: Request headers
+            context: Execution context
+            
+        Returns:
+            HTTP response
+        """
+        url = self._url(endpoint)
+        headers = {**self.headers, **headers}
+        timeout = self._get_timeout(context)
+        if method == "GET":
+            return await self.client.get(url, params=parameters, headers=headers, timeout=timeout)
+        elif method == "POST":
+            return await self.client.post(url, json=parameters, headers=headers, timeout=timeout)
+        elif method == "PUT":
+            return await self.client.put(url, json=parameters, headers=headers, timeout=timeout)
+        elif method == "DELETE":
+            return await self.client.delete(url, params=parameters, headers=headers, timeout=timeout)
+        else:
+            raise ValueError(f"Unsupported HTTP method: {method}")
+    
+    async def _send_with_retries(
+        self,
+        capability_id: str,
+        method: str,
+        policy: RetryPolicy,
+        send: Callable[[], Awaitable[httpx.Response]],
+        context: Dict[str, Any]
+    ) -> httpx.Response:
+        """
+        Send a request, retrying transient failures according to a retry policy.
+        
+        Only idempotent methods are retried once a request may have reached the
+        backend. Retries back off exponentially with jitter, stop at the call's
+        deadline, and draw on the adapter's retry budget.
+        
+        Args:
+            capability_id: Capability ID
+            method: HTTP method
+            policy: Retry policy
+            send: Function sending one request
+            context: Execution context
+            
+        Returns:
+            HTTP response
+        """
+        self.requests += 1
+        self.retry_budget.deposit()
+        idempotent = policy.is_idempotent(method)
+        tracker = self._latency.setdefault(capability_id, LatencyTracker())
+        attempt = 1
+        
+        while True:
+            error = None
+            try:
+                if policy.hedge and method == "GET":
+                    response = await self._send_hedged(send, policy, tracker)
+                else:
+                    response = await self._send_timed(send, tracker)
+                if not idempotent or response.status_code not in policy.retry_on_status:
+                    return response
+                reason = f"status {response.status_code}"
+            except httpx.TransportError as e:
+                # A failed connection never reached the backend, so any method may be retried
+                if not idempotent and not isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout)):
+                    raise
+                error = e
+                reason = type(e).__name__
+            
+            delay = policy.backoff(attempt)
+            remaining = remaining_time(context.get("deadline"))
+            if (
+                attempt >= policy.max_attempts
+                or (remaining is not None and delay >= remaining)
+                or not self.retry_budget.withdraw()
+            ):
+                if error is not None:
+                    raise error
+                return response
+            
+            self.retries += 1
+            logger.warning(
+                f"Retrying capability {capability_id} of tool {self.manifest.tool_id} "
+                f"after {reason} (attempt {attempt + 1} of {policy.max_attempts})"
+            )
+            await asyncio.sleep(delay)
+            attempt += 1
+    
+    async def _send_timed(
+        self,
+        send: Callable[[], Awaitable[httpx.Response]],
+        tracker: LatencyTracker
+    ) -> httpx.Response:
+        """Send a request and record its latency if the backend handled it."""
+        start = time.monotonic()
+        response = await send()
+        if response.status_code < 500:
+            tracker.record(time.monotonic() - start)
+        return response
+    
+    async def _send_hedged(
+        self,
+        send: Callable[[], Awaitable[httpx.Response]],
+        policy: RetryPolicy,
+        tracker: LatencyTracker
+    ) -> httpx.Response:
+        """
+        Send a request, and a second one if the first is slower than usual.
+        
+        The second request is sent once the first has taken longer than the
+        policy's latency percentile. Whichever response arrives first is used and
+        the other request is cancelled.
+        
+        Args:
+            send: Function sending one request
+            policy: Retry policy
+            tracker: Latency tracker of the capability
+            
+        Returns:
+            HTTP response
+        """
+        delay = tracker.percentile(policy.hedge_percentile)
+        tasks: List["asyncio.Task[httpx.Response]"] = [asyncio.ensure_future(self._send_timed(send, tracker))]
+        try:
+            if delay is None:
+                return await tasks[0]
+            
+            done, _ = await asyncio.wait(tasks, timeout=max(delay, policy.hedge_min_delay))
+            if done or not self.retry_budget.withdraw():
+                return await tasks[0]
+            
+            self.hedges += 1
+            tasks.append(asyncio.ensure_future(self._send_timed(send, tracker)))
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is tasks[1]:
+                            self.hedge_wins += 1
+                        return task.result()
+            
+            # Both requests failed
+            return tasks[0].result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+    
+    def _url(self, endpoint: str) -> str:
+        """
+        Resolve an endpoint against the tool's base URL.
+        
+        Args:
+            endpoint: Endpoint path, or an absolute URL
+            
+        Returns:
+            Absolute URL
+        """
+        if endpoint.startswith(("http://", "https://")):
+            return endpoint
+        
+        return f"{self.base_url.rstrip('/')}/{endpoint.lstrip('/')}"
+    
+    def _get_timeout(self, context: Dict[str, Any]) -> float:
+        """
+        Get the HTTP timeout for a call from its remaining time budget.
+        
+        Args:
+            context: Execution context
+            
+        Returns:
+            Timeout in seconds, never longer than the configured timeout
+            
+        Raises:
+            ToolTimeoutError: If the call's deadline has already passed
+        """
+        deadline = context.get("deadline")
+        if deadline is None:
+            return self.timeout
+        
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise ToolTimeoutError("Deadline passed before the request was sent")
+        
+        return min(self.timeout, remaining)
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get adapter metrics.
+        
+        Returns:
+            Request, retry, hedging, HTTP cache, batching and token counts
+        """
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "retry_budget_exhausted": self.retry_budget.exhausted,
+            "http_cache": self.http_cache.get_stats() if self.http_cache else None,
+            "batching": {
+                capability_id: batcher.get_stats() for capability_id, batcher in self.batchers.items()
+            },
+            "oauth": self.token_manager.get_stats() if self.token_manager else None,
+        }
     
     async def shutdown(self) -> None:
         """
         Shutdown the adapter and release resources.
         """
+        for task in list(self._revalidations.values()):
+            task.cancel()
+        self._revalidations = {}
+        
+        for batcher in self.batchers.values():
+            await batcher.close()
+        
+        if self.client:
+            await self._release_clients()
+            logger.info("REST API adapter shut down")
+    
+    async def _release_clients(self) -> None:
+        """Give the shared HTTP clients back to the pool."""
+        if self.token_manager:
+            await self.token_manager.close()
+            await self.http_pool.release(self.token_manager.token_url)
+            self.token_manager = None
+        
         if self.client:
-            await self.client.aclose()
-            self.client = None
-            logger.info("REST API adapter shut down") 
\ No newline at end of file
+            # The client is shared; only the pool closes it
+            await self.http_pool.release(self.base_url)
+            self.client = None
\ No newline at end of file
@@ -0,0 +1,144 @@
+"""
+Tool Integration Protocol - Plugin Thread Pool
+
+This module implements the bounded thread pool that runs synchronous plugin functions
+off the event loop.
+"""
+
+import asyncio
+import contextvars
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = int(os.getenv("PLUGIN_THREAD_POOL_SIZE", min(32, (os.cpu_count() or 1) + 4)))
+
+
+class PluginThreadPool:
+    """
+    Bounded thread pool that tracks its queue depth and saturation.
+    """
+
+    def __init__(self, name: str, max_workers: int = DEFAULT_MAX_WORKERS):
+        """
+        Initialize the thread pool.
+
+        Args:
+            name: Pool name, used for thread names and metrics
+            max_workers: Maximum number of worker threads
+        """
+        self.name = name
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"plugin-{name}")
+        self._lock = threading.Lock()
+
+        # Statistics
+        self.queued = 0
+        self.active = 0
+        self.completed = 0
+        self.peak_queued = 0
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run a function on the pool.
+
+        Args:
+            func: Function to run
+            *args: Function arguments
+
+        Returns:
+            Function result
+        """
+        return await self.wait(self.submit(func, *args))
+
+    def submit(self, func: Callable[..., Any], *args: Any) -> "Future[Any]":
+        """
+        Queue a function on the pool.
+
+        Args:
+            func: Function to run
+            *args: Function arguments
+
+        Returns:
+            Future of the function result, to pass to `wait`
+        """
+        context = contextvars.copy_context()
+
+        def call() -> Any:
+            with self._lock:
+                self.queued -= 1
+                self.active += 1
+            try:
+                return context.run(func, *args)
+            finally:
+                with self._lock:
+                    self.active -= 1
+                    self.completed += 1
+
+        with self._lock:
+            self.queued += 1
+            self.peak_queued = max(self.peak_queued, self.queued)
+
+        return self._executor.submit(call)
+
+    async def wait(self, future: "Future[Any]") -> Any:
+        """
+        Wait for a function queued with `submit`.
+
+        Cancelling the wait cancels the function only if it has not started yet.
+
+        Args:
+            future: Future returned by `submit`
+
+        Returns:
+            Function result
+        """
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # A call cancelled before it started never decrements the queue itself
+            if future.cancelled():
+                with self._lock:
+                    self.queued -= 1
+            raise
+
+    def shutdown(self) -> None:
+        """Stop accepting work and release the worker threads once idle."""
+        self._executor.shutdown(wait=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get thread pool statistics.
+
+        Returns:
+            Thread pool statistics
+        """
+        return {
+            "name": self.name,
+            "max_workers": self.max_workers,
+            "queued": self.queued,
+            "peak_queued": self.peak_queued,
+            "active": self.active,
+            "completed": self.completed,
+            "saturation": self.active / self.max_workers,
+        }
+
+
+_shared_pool: Optional[PluginThreadPool] = None
+
+
+def get_shared_pool() -> PluginThreadPool:
+    """
+    Get the thread pool shared by plugin adapters.
+
+    Returns:
+        Shared thread pool
+    """
+    global _shared_pool
+    if _shared_pool is None:
+        _shared_pool = PluginThreadPool("shared")
+    return _shared_pool
@@ -0,0 +1,238 @@
+"""
+Tool Integration Protocol - Adaptive Concurrency Limits
+
+This module adjusts a tool's concurrency limit to the latency its backend shows, so that
+throughput tracks backend capacity without a hand-tuned `concurrent_requests`.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class GradientLimit:
+    """
+    Gradient-style concurrency limit.
+
+    Latency samples are collected in windows. Each window's average (the short
+    RTT) is compared with a slow moving average of past windows (the long RTT):
+    while the short RTT stays within `tolerance` of the long RTT the limit grows
+    by about its square root per window, and as queuing at the backend drives
+    the short RTT up the limit shrinks in proportion. Calls that run out of
+    time cut the limit multiplicatively (AIMD backoff), at most once per RTT.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 20,
+        min_limit: int = 1,
+        max_limit: int = 1000,
+        smoothing: float = 0.2,
+        tolerance: float = 1.5,
+        window_size: int = 10,
+        long_window: int = 100,
+        backoff: float = 0.9
+    ):
+        """
+        Initialize the limit.
+
+        Args:
+            initial_limit: Limit before any samples were seen
+            min_limit: Lowest limit
+            max_limit: Highest limit, e.g. a static cap declared by the tool
+            smoothing: Weight of each window's new limit against the current one
+            tolerance: Ratio of short to long RTT still considered normal
+            window_size: Number of samples per window
+            long_window: Number of windows the long RTT averages over
+            backoff: Factor applied to the limit when a call times out
+        """
+        if not 1 <= min_limit <= max_limit:
+            raise ValueError("Limits must satisfy 1 <= min_limit <= max_limit")
+
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(min(max(initial_limit, min_limit), max_limit))
+        self.smoothing = smoothing
+        self.tolerance = tolerance
+        self.window_size = window_size
+        self.long_window = long_window
+        self.backoff = backoff
+        self.short_rtt: Optional[float] = None
+        self.long_rtt: Optional[float] = None
+        self._samples: Deque[float] = deque()
+        self._window_in_flight = 0
+        self._last_drop = float("-inf")
+
+        # Statistics
+        self.increases = 0
+        self.decreases = 0
+        self.drops = 0
+
+    @property
+    def current(self) -> int:
+        """Get the whole number of calls currently allowed in flight."""
+        return max(self.min_limit, int(self.limit))
+
+    def on_sample(self, rtt: float, in_flight: int) -> None:
+        """
+        Record the latency of a call that completed.
+
+        Args:
+            rtt: Latency of the call in seconds
+            in_flight: Number of calls in flight, including this one
+        """
+        self._samples.append(rtt)
+        self._window_in_flight = max(self._window_in_flight, in_flight)
+        if len(self._samples) >= self.window_size:
+            short_rtt = sum(self._samples) / len(self._samples)
+            in_flight = self._window_in_flight
+            self._samples.clear()
+            self._window_in_flight = 0
+            self._update(short_rtt, in_flight)
+
+    def on_drop(self, started: float) -> None:
+        """
+        Record a call that ran out of time.
+
+        Args:
+            started: Monotonic time the call started at
+        """
+        self.drops += 1
+        # Calls started before the last cut already saw the old limit
+        if started < self._last_drop:
+            return
+        self._last_drop = time.monotonic()
+        self._set(self.limit * self.backoff)
+
+    def _update(self, short_rtt: float, in_flight: int) -> None:
+        """Move the limit towards the one suggested by a window of samples."""
+        self.short_rtt = short_rtt
+        if self.long_rtt is None:
+            self.long_rtt = short_rtt
+        else:
+            self.long_rtt += (short_rtt - self.long_rtt) / self.long_window
+            # Forget a latency spike once the backend is fast again
+            if self.long_rtt > 2 * short_rtt:
+                self.long_rtt = 0.95 * self.long_rtt + 0.05 * short_rtt
+
+        # Traffic that does not use the limit says nothing about raising it
+        if in_flight < self.limit / 2:
+            return
+
+        gradient = max(0.5, min(1.0, self.tolerance * self.long_rtt / short_rtt)) if short_rtt > 0 else 1.0
+        target = self.limit * gradient + math.sqrt(self.limit)
+        self._set(self.limit * (1 - self.smoothing) + target * self.smoothing)
+
+    def _set(self, limit: float) -> None:
+        """Apply a new limit within the bounds."""
+        limit = min(max(limit, float(self.min_limit)), float(self.max_limit))
+        if int(limit) > int(self.limit):
+            self.increases += 1
+        elif int(limit) < int(self.limit):
+            self.decreases += 1
+        self.limit = limit
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get statistics of the limit.
+
+        Returns:
+            Limit statistics
+        """
+        return {
+            "limit": self.current,
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "short_rtt": self.short_rtt,
+            "long_rtt": self.long_rtt,
+            "increases": self.increases,
+            "decreases": self.decreases,
+            "drops": self.drops,
+        }
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency limiter whose limit follows a `GradientLimit`.
+
+    Works like a semaphore whose size changes: when the limit shrinks, calls in
+    flight finish normally and new calls wait until enough have left.
+    """
+
+    def __init__(self, limit: GradientLimit):
+        """
+        Initialize the limiter.
+
+        Args:
+            limit: Limit algorithm
+        """
+        self.limit = limit
+        self.in_flight = 0
+        self._waiters: Deque["asyncio.Future[None]"] = deque()
+
+    def locked(self) -> bool:
+        """Check whether a call would have to wait."""
+        return self.in_flight >= self.limit.current or bool(self._waiters)
+
+    async def acquire(self, timeout: Optional[float] = None) -> None:
+        """
+        Wait for a slot.
+
+        Args:
+            timeout: Maximum time to wait in seconds
+
+        Raises:
+            asyncio.TimeoutError: If no slot frees up in time
+        """
+        if not self.locked():
+            self.in_flight += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout=timeout)
+        except BaseException:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just before the caller gave up
+                self.release()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
+
+    def release(self, rtt: Optional[float] = None, dropped: bool = False) -> None:
+        """
+        Release a slot, feeding the call's outcome to the limit.
+
+        Args:
+            rtt: Latency of the call in seconds, or None if it gives no signal,
+                e.g. because its caller went away
+            dropped: Whether the call ran out of time
+        """
+        if rtt is not None:
+            if dropped:
+                self.limit.on_drop(time.monotonic() - rtt)
+            else:
+                self.limit.on_sample(rtt, self.in_flight)
+        self.in_flight -= 1
+
+        while self._waiters and self.in_flight < self.limit.current:
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self.in_flight += 1
+            waiter.set_result(None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get limiter statistics.
+
+        Returns:
+            Limiter statistics
+        """
+        return {**self.limit.get_stats(), "waiting": len(self._waiters)}
@@ -0,0 +1,304 @@
+"""
+Tool Integration Protocol - Admission Queue
+
+This module shares a global concurrency cap fairly between priority classes and users,
+so that one user's batch job cannot starve interactive callers.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Optional
+
+from app.tools.protocol.errors import ToolQueueFullError, ToolQueueTimeoutError
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_BATCH = "batch"
+PRIORITIES = (PRIORITY_INTERACTIVE, PRIORITY_BATCH)
+
+DEFAULT_PRIORITY_WEIGHTS = {PRIORITY_INTERACTIVE: 8.0, PRIORITY_BATCH: 1.0}
+
+# Queue of callers without a user ID
+ANONYMOUS_USER = ""
+
+
+class PriorityClass:
+    """
+    Waiting calls of one priority class, queued per user.
+
+    Users take turns: each grant goes to the head of the next user's queue, so a
+    user with many queued calls gets the same share of the class as a user with one.
+    """
+
+    def __init__(self, name: str, weight: float):
+        """
+        Initialize the priority class.
+
+        Args:
+            name: Class name
+            weight: Share of the concurrency cap relative to other classes
+        """
+        self.name = name
+        self.weight = weight
+        self.users: "OrderedDict[str, Deque[asyncio.Future[None]]]" = OrderedDict()
+        # Virtual time at which the call at the head of the class has received its share
+        self.finish_tag = 0.0
+
+        # Statistics
+        self.queued = 0
+        self.in_flight = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.queue_time_total = 0.0
+        self.queue_time_max = 0.0
+
+    def push(self, user_id: str, waiter: "asyncio.Future[None]") -> None:
+        """Queue a waiting call behind the user's other calls."""
+        self.users.setdefault(user_id, deque()).append(waiter)
+        self.queued += 1
+
+    def pop(self) -> "asyncio.Future[None]":
+        """Take the next call, moving its user to the back of the rotation."""
+        user_id, waiters = next(iter(self.users.items()))
+        waiter = waiters.popleft()
+        if waiters:
+            self.users.move_to_end(user_id)
+        else:
+            del self.users[user_id]
+        self.queued -= 1
+        return waiter
+
+    def remove(self, user_id: str, waiter: "asyncio.Future[None]") -> bool:
+        """Drop a call that stopped waiting, returning whether it was still queued."""
+        waiters = self.users.get(user_id)
+        if waiters is None or waiter not in waiters:
+            return False
+        waiters.remove(waiter)
+        if not waiters:
+            del self.users[user_id]
+        self.queued -= 1
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get statistics of the class.
+
+        Returns:
+            Class statistics
+        """
+        return {
+            "weight": self.weight,
+            "queued": self.queued,
+            "waiting_users": len(self.users),
+            "in_flight": self.in_flight,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "queue_time_total": self.queue_time_total,
+            "queue_time_avg": self.queue_time_total / self.admitted if self.admitted else 0.0,
+            "queue_time_max": self.queue_time_max,
+        }
+
+
+class AdmissionQueue:
+    """
+    Global concurrency cap with weighted fair queuing.
+
+    Calls run immediately while fewer than `max_concurrency` are in flight.
+    Otherwise they queue, and each freed slot goes to the priority class with
+    the smallest virtual finish tag (self-clocked fair queuing), so that
+    backlogged classes share slots in proportion to their weights. Within a
+    class, users take turns. Idle classes do not bank credit for later.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 256,
+        weights: Optional[Dict[str, float]] = None,
+        default_priority: str = PRIORITY_INTERACTIVE,
+        max_queue_depth: int = 1000,
+        queue_timeout: Optional[float] = 30.0
+    ):
+        """
+        Initialize the admission queue.
+
+        Args:
+            max_concurrency: Maximum number of calls in flight across all tools
+            weights: Relative share of each priority class; defaults to 8:1 for
+                interactive over batch calls
+            default_priority: Class of calls that do not name one
+            max_queue_depth: Maximum number of calls waiting for admission
+            queue_timeout: Maximum time in seconds a call may wait for admission
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        weights = weights or DEFAULT_PRIORITY_WEIGHTS
+        if any(weight <= 0 for weight in weights.values()):
+            raise ValueError("Priority weights must be positive")
+        if default_priority not in weights:
+            raise ValueError(f"Unknown default priority: {default_priority}")
+
+        self.max_concurrency = max_concurrency
+        self.default_priority = default_priority
+        self.max_queue_depth = max_queue_depth
+        self.queue_timeout = queue_timeout
+        self.classes = {name: PriorityClass(name, weight) for name, weight in weights.items()}
+        self.in_flight = 0
+        self.queued = 0
+        self._virtual_time = 0.0
+
+    async def acquire(self, user_id: Optional[str] = None, priority: Optional[str] = None) -> float:
+        """
+        Wait for a slot.
+
+        Args:
+            user_id: User ID
+            priority: Priority class, or None for the default class
+
+        Returns:
+            Time spent waiting in seconds
+
+        Raises:
+            ValueError: If the priority class is unknown
+            ToolQueueFullError: If too many calls are already waiting
+            ToolQueueTimeoutError: If no slot frees up within the queue timeout
+        """
+        priority_class = self.get_class(priority)
+
+        if self.in_flight < self.max_concurrency and not self.queued:
+            self._admit(priority_class, 0.0)
+            return 0.0
+
+        if self.queued >= self.max_queue_depth:
+            priority_class.rejected += 1
+            raise ToolQueueFullError("Admission queue full")
+
+        user_key = user_id or ANONYMOUS_USER
+        waiter = asyncio.get_running_loop().create_future()
+        if not priority_class.users:
+            # A class becoming busy starts from the current virtual time, without credit for idling
+            start_tag = max(self._virtual_time, priority_class.finish_tag)
+            priority_class.finish_tag = start_tag + 1.0 / priority_class.weight
+        priority_class.push(user_key, waiter)
+        self.queued += 1
+
+        start = time.monotonic()
+        try:
+            await asyncio.wait_for(waiter, timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            if not self._give_back(priority_class, user_key, waiter):
+                return self._record_wait(priority_class, start)
+            priority_class.timed_out += 1
+            raise ToolQueueTimeoutError(f"Timed out waiting for admission as a {priority_class.name} call")
+        except asyncio.CancelledError:
+            if not self._give_back(priority_class, user_key, waiter):
+                # The slot was handed over just before the caller went away
+                self.release(priority_class.name)
+            raise
+
+        return self._record_wait(priority_class, start)
+
+    def release(self, priority: Optional[str] = None) -> None:
+        """
+        Release the slot held by a call and hand it to the next waiting call.
+
+        Args:
+            priority: Priority class the call was admitted with
+        """
+        priority_class = self.get_class(priority)
+        priority_class.in_flight -= 1
+        self.in_flight -= 1
+        self._dispatch()
+
+    def get_class(self, priority: Optional[str]) -> PriorityClass:
+        """
+        Get a priority class by name.
+
+        Args:
+            priority: Class name, or None for the default class
+
+        Returns:
+            Priority class
+
+        Raises:
+            ValueError: If the class is unknown
+        """
+        priority_class = self.classes.get(priority or self.default_priority)
+        if priority_class is None:
+            raise ValueError(f"Unknown priority class: {priority}")
+        return priority_class
+
+    def _admit(self, priority_class: PriorityClass, queue_time: float) -> None:
+        """Account for a call taking a slot."""
+        self.in_flight += 1
+        priority_class.in_flight += 1
+        priority_class.admitted += 1
+        priority_class.queue_time_total += queue_time
+        priority_class.queue_time_max = max(priority_class.queue_time_max, queue_time)
+
+    def _record_wait(self, priority_class: PriorityClass, start: float) -> float:
+        """Record the wait of a call that was handed a slot by `_dispatch`."""
+        queue_time = time.monotonic() - start
+        priority_class.admitted += 1
+        priority_class.queue_time_total += queue_time
+        priority_class.queue_time_max = max(priority_class.queue_time_max, queue_time)
+        return queue_time
+
+    def _give_back(
+        self,
+        priority_class: PriorityClass,
+        user_key: str,
+        waiter: "asyncio.Future[None]"
+    ) -> bool:
+        """
+        Withdraw a call that stopped waiting.
+
+        Returns:
+            True if the call was still queued; False if it had already been handed a slot
+        """
+        if waiter.done() and not waiter.cancelled():
+            return False
+
+        # `_dispatch` may already have dropped the call from the queue
+        if priority_class.remove(user_key, waiter):
+            self.queued -= 1
+        return True
+
+    def _dispatch(self) -> None:
+        """Hand free slots to waiting calls in fair order."""
+        while self.queued and self.in_flight < self.max_concurrency:
+            priority_class = min(
+                (priority_class for priority_class in self.classes.values() if priority_class.users),
+                key=lambda priority_class: (priority_class.finish_tag, -priority_class.weight)
+            )
+            waiter = priority_class.pop()
+            self.queued -= 1
+            if waiter.done():
+                # The call timed out or was cancelled and has not withdrawn yet
+                continue
+
+            self._virtual_time = priority_class.finish_tag
+            if priority_class.users:
+                priority_class.finish_tag += 1.0 / priority_class.weight
+            self.in_flight += 1
+            priority_class.in_flight += 1
+            waiter.set_result(None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get admission statistics.
+
+        Returns:
+            Admission statistics, with queue waits per priority class
+        """
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "classes": {name: priority_class.get_stats() for name, priority_class in self.classes.items()},
+        }
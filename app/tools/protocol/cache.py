@@ -0,0 +1,219 @@
+"""
+Tool Integration Protocol - Result Cache
+
+This module implements the result cache used by the Tool Executor for capabilities
+that declare themselves cacheable.
+"""
+
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+def canonical_hash(value: Any) -> Optional[str]:
+    """
+    Hash a JSON-serializable value independently of key order.
+
+    Args:
+        value: Value to hash
+
+    Returns:
+        Hex digest, or None if the value is not JSON-serializable
+    """
+    try:
+        encoded = json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    except (TypeError, ValueError):
+        return None
+
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class _CacheEntry:
+    """A cached result."""
+
+    __slots__ = ("tool_id", "payload", "expires_at")
+
+    def __init__(self, tool_id: str, payload: bytes, expires_at: float):
+        self.tool_id = tool_id
+        self.payload = payload
+        self.expires_at = expires_at
+
+
+class ResultCache:
+    """
+    LRU cache of capability results with per-entry TTL and a memory bound.
+
+    Results are stored JSON-encoded, so every hit returns a fresh copy and the
+    memory bound counts the encoded size.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: int = 64 * 1024 * 1024,
+        default_ttl: float = 300.0
+    ):
+        """
+        Initialize the result cache.
+
+        Args:
+            max_entries: Maximum number of cached results
+            max_bytes: Maximum total size of cached results in bytes
+            default_ttl: TTL in seconds for capabilities that do not declare one
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._keys_by_tool: Dict[str, Set[str]] = {}
+        self._bytes = 0
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(
+        tool_id: str,
+        tool_version: str,
+        capability_id: str,
+        parameters: Dict[str, Any]
+    ) -> Optional[str]:
+        """
+        Build a cache key for a capability call.
+
+        Args:
+            tool_id: Tool ID
+            tool_version: Tool version
+            capability_id: Capability ID
+            parameters: Input parameters
+
+        Returns:
+            Cache key, or None if the parameters are not JSON-serializable
+        """
+        return canonical_hash([tool_id, tool_version, capability_id, parameters])
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a cached result.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached result or None if missing or expired
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if entry.expires_at <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return json.loads(entry.payload)
+
+    def set(self, key: str, tool_id: str, result: Dict[str, Any], ttl: Optional[float] = None) -> bool:
+        """
+        Cache a result.
+
+        Args:
+            key: Cache key
+            tool_id: Tool ID, used for invalidation
+            result: Execution result
+            ttl: Time to live in seconds
+
+        Returns:
+            True if the result was cached, False if it is not serializable or too large
+        """
+        try:
+            payload = json.dumps(result, separators=(",", ":")).encode("utf-8")
+        except (TypeError, ValueError):
+            return False
+
+        if len(payload) > self.max_bytes:
+            return False
+
+        if key in self._entries:
+            self._remove(key)
+
+        expires_at = time.monotonic() + (self.default_ttl if ttl is None else ttl)
+        self._entries[key] = _CacheEntry(tool_id, payload, expires_at)
+        self._keys_by_tool.setdefault(tool_id, set()).add(key)
+        self._bytes += len(payload)
+
+        # Evict least recently used entries until within bounds
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+
+        return True
+
+    def invalidate_tool(self, tool_id: str) -> int:
+        """
+        Remove every cached result of a tool.
+
+        Args:
+            tool_id: Tool ID
+
+        Returns:
+            Number of removed entries
+        """
+        keys = self._keys_by_tool.pop(tool_id, set())
+        for key in keys:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= len(entry.payload)
+
+        self.invalidations += len(keys)
+        return len(keys)
+
+    def clear(self) -> None:
+        """Remove every cached result."""
+        self._entries.clear()
+        self._keys_by_tool.clear()
+        self._bytes = 0
+
+    def _remove(self, key: str) -> None:
+        """Remove a single entry."""
+        entry = self._entries.pop(key)
+        self._bytes -= len(entry.payload)
+
+        keys = self._keys_by_tool.get(entry.tool_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_tool[entry.tool_id]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Cache statistics
+        """
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
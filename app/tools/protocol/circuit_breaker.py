@@ -0,0 +1,294 @@
+"""
+Tool Integration Protocol - Circuit Breaker
+
+This module stops calls to tools whose backends are failing or slow, so that callers
+fail fast instead of waiting on a degraded backend.
+"""
+
+import logging
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from pydantic import BaseModel, Field
+
+from app.tools.protocol.errors import CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitBreakerConfig(BaseModel):
+    """Circuit breaker configuration, set as `circuit_breaker` in the tool manifest metadata."""
+
+    enabled: bool = Field(True, description="Whether the circuit breaker is active")
+    window_seconds: float = Field(60.0, gt=0, description="Length of the rolling window")
+    min_calls: int = Field(20, ge=1, description="Calls in the window required before the circuit may open")
+    error_rate_threshold: float = Field(0.5, gt=0, le=1, description="Failure rate that opens the circuit")
+    slow_call_seconds: Optional[float] = Field(None, gt=0, description="Duration above which a call is slow")
+    slow_call_rate_threshold: float = Field(0.5, gt=0, le=1, description="Slow call rate that opens the circuit")
+    open_seconds: float = Field(30.0, gt=0, description="Time the circuit stays open before probing")
+    half_open_max_calls: int = Field(3, ge=1, description="Probe calls allowed, and needed to close the circuit")
+
+
+class _Bucket:
+    """Call counts for one second of the rolling window."""
+
+    __slots__ = ("second", "calls", "failures", "slow")
+
+    def __init__(self, second: int):
+        self.second = second
+        self.calls = 0
+        self.failures = 0
+        self.slow = 0
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for a single tool.
+
+    While closed, call outcomes are counted in a rolling window of one-second
+    buckets. When the failure rate or slow call rate crosses its threshold the
+    circuit opens and calls are rejected. After `open_seconds` the circuit
+    half-opens and lets a few probe calls through: if they all succeed the
+    circuit closes, otherwise it opens again.
+    """
+
+    def __init__(self, tool_id: str, config: CircuitBreakerConfig, overrides: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the circuit breaker.
+
+        Args:
+            tool_id: Tool ID
+            config: Circuit breaker configuration
+            overrides: Settings from the tool manifest the configuration was built from
+        """
+        self.tool_id = tool_id
+        self.config = config
+        self.overrides = overrides
+        self.state = STATE_CLOSED
+        self.opened_at = 0.0
+
+        self._buckets: Deque[_Bucket] = deque()
+        self._calls = 0
+        self._failures = 0
+        self._slow = 0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+
+        # Statistics
+        self.rejected = 0
+        self.times_opened = 0
+
+    def acquire(self) -> None:
+        """
+        Check whether a call may proceed.
+
+        Every successful acquire must be followed by exactly one of
+        `record_success`, `record_failure` or `record_cancelled`.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with all probes taken
+        """
+        if not self.config.enabled:
+            return
+
+        if self.state == STATE_OPEN:
+            if time.monotonic() - self.opened_at < self.config.open_seconds:
+                self.rejected += 1
+                raise CircuitOpenError(
+                    f"Circuit open for tool {self.tool_id}; retry in {self.retry_after():.0f}s",
+                    retry_after=self.retry_after()
+                )
+            self._half_open()
+
+        if self.state == STATE_HALF_OPEN:
+            if self._probes_in_flight >= self.config.half_open_max_calls:
+                self.rejected += 1
+                raise CircuitOpenError(
+                    f"Circuit half-open for tool {self.tool_id}; probe calls in progress",
+                    retry_after=1.0
+                )
+            self._probes_in_flight += 1
+
+    def record_success(self, duration: float) -> None:
+        """
+        Record a completed call.
+
+        Args:
+            duration: Call duration in seconds
+        """
+        slow = self.config.slow_call_seconds is not None and duration > self.config.slow_call_seconds
+        self._record(failed=False, slow=slow)
+
+    def record_failure(self, duration: float) -> None:
+        """
+        Record a failed call.
+
+        Args:
+            duration: Call duration in seconds
+        """
+        self._record(failed=True, slow=False)
+
+    def record_cancelled(self) -> None:
+        """Record a call abandoned by its caller, which says nothing about the tool."""
+        if self.config.enabled and self.state == STATE_HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+    def retry_after(self) -> float:
+        """Get the time in seconds until an open circuit half-opens."""
+        return max(0.0, self.opened_at + self.config.open_seconds - time.monotonic())
+
+    def _record(self, failed: bool, slow: bool) -> None:
+        """Count a call outcome and move between states."""
+        if not self.config.enabled:
+            return
+
+        if self.state == STATE_HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+            if failed or slow:
+                self._open()
+                return
+            self._probe_successes += 1
+            if self._probe_successes >= self.config.half_open_max_calls:
+                self._close()
+            return
+
+        if self.state == STATE_OPEN:
+            # A call admitted before the circuit opened
+            return
+
+        now = time.monotonic()
+        self._trim(now)
+        second = int(now)
+        if not self._buckets or self._buckets[-1].second != second:
+            self._buckets.append(_Bucket(second))
+        bucket = self._buckets[-1]
+        bucket.calls += 1
+        bucket.failures += failed
+        bucket.slow += slow
+        self._calls += 1
+        self._failures += failed
+        self._slow += slow
+
+        if self._calls < self.config.min_calls:
+            return
+        if (
+            self._failures / self._calls >= self.config.error_rate_threshold
+            or self._slow / self._calls >= self.config.slow_call_rate_threshold
+        ):
+            self._open()
+
+    def _trim(self, now: float) -> None:
+        """Drop buckets that fell out of the rolling window."""
+        oldest = now - self.config.window_seconds
+        while self._buckets and self._buckets[0].second + 1 <= oldest:
+            bucket = self._buckets.popleft()
+            self._calls -= bucket.calls
+            self._failures -= bucket.failures
+            self._slow -= bucket.slow
+
+    def _reset_window(self) -> None:
+        """Forget every counted call."""
+        self._buckets.clear()
+        self._calls = 0
+        self._failures = 0
+        self._slow = 0
+
+    def _open(self) -> None:
+        """Reject calls for the open duration."""
+        logger.warning(f"Opening circuit for tool {self.tool_id}")
+        self.state = STATE_OPEN
+        self.opened_at = time.monotonic()
+        self.times_opened += 1
+        self._probes_in_flight = 0
+        self._reset_window()
+
+    def _half_open(self) -> None:
+        """Start letting probe calls through."""
+        logger.info(f"Half-opening circuit for tool {self.tool_id}")
+        self.state = STATE_HALF_OPEN
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+
+    def _close(self) -> None:
+        """Resume normal operation."""
+        logger.info(f"Closing circuit for tool {self.tool_id}")
+        self.state = STATE_CLOSED
+        self._reset_window()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get circuit breaker status.
+
+        Returns:
+            Circuit breaker status
+        """
+        self._trim(time.monotonic())
+        return {
+            "enabled": self.config.enabled,
+            "state": self.state,
+            "calls": self._calls,
+            "failures": self._failures,
+            "slow_calls": self._slow,
+            "error_rate": self._failures / self._calls if self._calls else 0.0,
+            "slow_call_rate": self._slow / self._calls if self._calls else 0.0,
+            "retry_after": self.retry_after() if self.state == STATE_OPEN else 0.0,
+            "probes_in_flight": self._probes_in_flight,
+            "rejected": self.rejected,
+            "times_opened": self.times_opened,
+        }
+
+
+class CircuitBreakerRegistry:
+    """
+    Circuit Breaker Registry keeps one circuit breaker per tool.
+    """
+
+    def __init__(self, default_config: Optional[CircuitBreakerConfig] = None):
+        """
+        Initialize the Circuit Breaker Registry.
+
+        Args:
+            default_config: Configuration for tools that do not declare their own
+        """
+        self.default_config = default_config or CircuitBreakerConfig()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get_breaker(self, tool_id: str, metadata: Dict[str, Any]) -> CircuitBreaker:
+        """
+        Get the circuit breaker for a tool, rebuilding it when its configuration changes.
+
+        Args:
+            tool_id: Tool ID
+            metadata: Tool manifest metadata
+
+        Returns:
+            Circuit breaker
+        """
+        overrides = metadata.get("circuit_breaker")
+        breaker = self._breakers.get(tool_id)
+        if breaker is None or breaker.overrides != overrides:
+            breaker = CircuitBreaker(tool_id, self._get_config(overrides), overrides)
+            self._breakers[tool_id] = breaker
+
+        return breaker
+
+    def _get_config(self, overrides: Optional[Dict[str, Any]]) -> CircuitBreakerConfig:
+        """Merge a tool's circuit breaker settings over the defaults."""
+        if not overrides:
+            return self.default_config
+
+        return CircuitBreakerConfig(**{**self.default_config.dict(), **overrides})
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the status of every circuit breaker.
+
+        Returns:
+            Circuit breaker status keyed by tool ID
+        """
+        return {tool_id: breaker.get_stats() for tool_id, breaker in self._breakers.items()}
@@ -0,0 +1,58 @@
+"""
+Tool Integration Protocol - Errors
+
+This module defines the exceptions raised by the Tool Execution Environment.
+"""
+
+from typing import List
+
+
+class ToolExecutionError(Exception):
+    """Exception raised when tool execution fails."""
+    pass
+
+
+class ToolQueueFullError(ToolExecutionError):
+    """Exception raised when a tool's execution queue is at capacity."""
+    pass
+
+
+class ToolQueueTimeoutError(ToolExecutionError):
+    """Exception raised when a call waits too long for a tool's rate limits."""
+    pass
+
+
+class ToolTimeoutError(ToolExecutionError):
+    """Exception raised when a call does not finish before its deadline."""
+    pass
+
+
+class ToolRequestError(RuntimeError):
+    """
+    Exception raised by an adapter when a tool's backend rejects a call as invalid.
+
+    Like the adapters' other failures it is a `RuntimeError`; it says nothing
+    about the health of the backend.
+    """
+    pass
+
+
+class CircuitOpenError(ToolExecutionError):
+    """Exception raised when a tool's circuit breaker rejects a call."""
+
+    def __init__(self, message: str, retry_after: float = 0.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ToolValidationError(ToolExecutionError):
+    """Exception raised when call parameters do not match the capability's schema."""
+
+    def __init__(self, message: str, errors: List[str]):
+        super().__init__(f"{message}: {'; '.join(errors)}")
+        self.errors = errors
+
+
+class PipelineError(ToolExecutionError):
+    """Exception raised when a pipeline is malformed."""
+    pass
@@ -0,0 +1,336 @@
+"""
+Tool Integration Protocol - Execution Log
+
+This module implements the persistent execution log of the Tool Execution Environment.
+Entries are buffered in memory and written to SQLite in batches by a background task,
+so recording an execution costs little more than appending to a queue.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Deque, Dict, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EXECUTION_LOG_PATH = os.getenv("TOOL_EXECUTION_LOG_PATH", "data/tool_executions.db")
+
+# Container items copied when a record's parameters and result are snapshotted
+SNAPSHOT_MAX_ITEMS = 1024
+
+
+class ExecutionRecord(NamedTuple):
+    """A tool execution waiting to be written to the log."""
+
+    execution_id: str
+    tool_id: str
+    capability_id: str
+    user_id: Optional[str]
+    parameters: Dict[str, Any]
+    result: Optional[Dict[str, Any]]
+    error: Optional[str]
+    execution_time: float
+    queue_time: float
+    cached: bool
+    coalesced: bool
+    timestamp: float
+
+
+def snapshot(value: Any, max_items: int = SNAPSHOT_MAX_ITEMS) -> Any:
+    """
+    Copy the dicts and lists of a value, up to a number of items.
+
+    Containers are copied while their items fit in the budget; larger ones, and
+    everything once the budget is spent, are shared with the value. Typical
+    values are detached from later changes, at a cost that does not grow with
+    the size of the value.
+
+    Args:
+        value: Value to copy
+        max_items: Maximum number of container items to copy
+
+    Returns:
+        Copy of the value
+    """
+    budget = max_items
+
+    def copy(item: Any) -> Any:
+        nonlocal budget
+        if isinstance(item, dict) and len(item) <= budget:
+            budget -= len(item)
+            return {key: copy(child) for key, child in item.items()}
+        if isinstance(item, list) and len(item) <= budget:
+            budget -= len(item)
+            return [copy(child) for child in item]
+        return item
+
+    return copy(value)
+
+
+class ExecutionLogSink:
+    """
+    Buffered SQLite sink for tool execution records.
+
+    Records go into a bounded in-memory buffer with a snapshot of their
+    parameters and result, so later changes by the caller do not reach the log
+    (see `snapshot` for the limits). A background task flushes the buffer when
+    it reaches `flush_size` entries or every `flush_interval` seconds, encoding
+    and writing each batch in a single transaction on a dedicated thread. When
+    the buffer is full, new records are dropped and counted instead of blocking.
+    """
+
+    def __init__(
+        self,
+        db_path: str = DEFAULT_EXECUTION_LOG_PATH,
+        capacity: int = 10000,
+        flush_size: int = 500,
+        flush_interval: float = 1.0,
+        max_result_bytes: int = 4096
+    ):
+        """
+        Initialize the execution log sink.
+
+        Args:
+            db_path: Path to the SQLite database, or ":memory:"
+            capacity: Maximum number of buffered records
+            flush_size: Number of buffered records that triggers a flush
+            flush_interval: Maximum time in seconds between flushes
+            max_result_bytes: Results larger than this are truncated and stored with their hash
+        """
+        self.db_path = db_path
+        self.capacity = capacity
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_result_bytes = max_result_bytes
+
+        self._buffer: Deque[ExecutionRecord] = deque()
+        self._wakeup = asyncio.Event()
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._closed = False
+        self._thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tool-execution-log")
+        self._conn: Optional[sqlite3.Connection] = None
+
+        # Statistics
+        self.recorded = 0
+        self.dropped = 0
+        self.written = 0
+        self.write_errors = 0
+        self.flushes = 0
+
+    def record(self, record: ExecutionRecord) -> bool:
+        """
+        Buffer an execution record without blocking.
+
+        Args:
+            record: Execution record
+
+        Returns:
+            True if the record was buffered, False if it was dropped
+        """
+        if self._closed or len(self._buffer) >= self.capacity:
+            self.dropped += 1
+            return False
+
+        self._buffer.append(record._replace(
+            parameters=snapshot(record.parameters),
+            result=snapshot(record.result)
+        ))
+        self.recorded += 1
+
+        if self._task is None:
+            self._start()
+        if len(self._buffer) >= self.flush_size:
+            self._wakeup.set()
+
+        return True
+
+    def _start(self) -> None:
+        """Start the background flush task on the running event loop."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+
+        self._task = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        """Flush the buffer whenever it fills up or the flush interval elapses."""
+        while not self._closed:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> int:
+        """
+        Write all buffered records.
+
+        Returns:
+            Number of records written
+        """
+        written = 0
+        while self._buffer:
+            count = min(len(self._buffer), self.flush_size)
+            batch = [self._buffer.popleft() for _ in range(count)]
+
+            loop = asyncio.get_running_loop()
+            try:
+                await loop.run_in_executor(self._thread, self._write, batch)
+            except Exception as e:
+                self.write_errors += len(batch)
+                logger.error(f"Failed to write {len(batch)} tool execution records: {str(e)}")
+                break
+
+            written += len(batch)
+            self.written += len(batch)
+            self.flushes += 1
+
+        return written
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database connection on the writer thread."""
+        if self._conn is None:
+            if self.db_path != ":memory:":
+                directory = os.path.dirname(os.path.abspath(self.db_path))
+                os.makedirs(directory, exist_ok=True)
+
+            conn = sqlite3.connect(self.db_path)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS tool_executions (
+                    execution_id TEXT PRIMARY KEY,
+                    tool_id TEXT,
+                    capability_id TEXT,
+                    user_id TEXT,
+                    parameters TEXT,
+                    result TEXT,
+                    result_hash TEXT,
+                    result_size INTEGER,
+                    result_truncated INTEGER,
+                    error TEXT,
+                    execution_time REAL,
+                    queue_time REAL,
+                    cached INTEGER,
+                    coalesced INTEGER,
+                    created_at TIMESTAMP
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_tool_executions_tool "
+                "ON tool_executions (tool_id, created_at)"
+            )
+            conn.commit()
+            self._conn = conn
+
+        return self._conn
+
+    def _write(self, records: List[ExecutionRecord]) -> None:
+        """Encode a batch of records and write it in one transaction."""
+        rows = [self._to_row(record) for record in records]
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                """
+                INSERT OR REPLACE INTO tool_executions
+                (execution_id, tool_id, capability_id, user_id, parameters, result, result_hash,
+                 result_size, result_truncated, error, execution_time, queue_time, cached,
+                 coalesced, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                rows
+            )
+
+    def _to_row(self, record: ExecutionRecord) -> Tuple[Any, ...]:
+        """Serialize a record into a table row."""
+        result, result_hash, result_size, truncated = self._encode_result(record.result)
+
+        return (
+            record.execution_id,
+            record.tool_id,
+            record.capability_id,
+            record.user_id,
+            self._encode(record.parameters),
+            result,
+            result_hash,
+            result_size,
+            int(truncated),
+            record.error,
+            record.execution_time,
+            record.queue_time,
+            int(record.cached),
+            int(record.coalesced),
+            datetime.utcfromtimestamp(record.timestamp).isoformat(),
+        )
+
+    @staticmethod
+    def _encode(value: Any) -> str:
+        """Encode a value as JSON, falling back to its string form."""
+        try:
+            return json.dumps(value, default=str)
+        except (TypeError, ValueError):
+            return json.dumps(str(value))
+        except RuntimeError:
+            # A large value's uncopied part was changed by the caller during encoding
+            return json.dumps("<changed while being logged>")
+
+    def _encode_result(self, result: Optional[Dict[str, Any]]) -> Tuple[Optional[str], Optional[str], int, bool]:
+        """
+        Encode a result, truncating it if it is too large.
+
+        Returns:
+            Tuple of the stored text, the hash of the full result (if truncated),
+            the full encoded size, and whether the result was truncated
+        """
+        if result is None:
+            return None, None, 0, False
+
+        encoded = self._encode(result)
+        size = len(encoded)
+        if size <= self.max_result_bytes:
+            return encoded, None, size, False
+
+        digest = hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+        return encoded[:self.max_result_bytes], digest, size, True
+
+    async def close(self) -> None:
+        """Flush remaining records and stop the background task."""
+        self._closed = True
+        if self._task is not None:
+            # Wake the flush task so it writes what is buffered and exits
+            self._wakeup.set()
+            await self._task
+            self._task = None
+
+        await self.flush()
+
+        if self._conn is not None:
+            conn = self._conn
+            self._conn = None
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self._thread, conn.close)
+        self._thread.shutdown(wait=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get execution log statistics.
+
+        Returns:
+            Execution log statistics
+        """
+        return {
+            "buffered": len(self._buffer),
+            "recorded": self.recorded,
+            "dropped": self.dropped,
+            "written": self.written,
+            "write_errors": self.write_errors,
+            "flushes": self.flushes,
+        }
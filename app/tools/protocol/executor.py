@@ -5,24 +5,57 @@ This module implements the Tool Execution Environment component of the Tool Inte
 """
 
 import asyncio
+import contextlib
+import copy
 import logging
 import time
 import uuid
-from datetime import datetime
-from typing import Any, Dict, List, Optional, Type
+from typing import Any, AsyncIterator, Awaitable, Dict, List, Optional, Set, Tuple, Type, Union
 
+from app.db.frozen import thaw
 from app.tools.protocol.adapters.base import ToolAdapter
+from app.tools.protocol.adapters.http_pool import get_shared_http_pool
 from app.tools.protocol.adapters.python_plugin import PythonPluginAdapter
 from app.tools.protocol.adapters.rest_api import RestApiAdapter
-from app.tools.protocol.models import ToolManifest, ValidationResult
+from app.tools.protocol.admission import AdmissionQueue
+from app.tools.protocol.cache import ResultCache, canonical_hash
+from app.tools.protocol.circuit_breaker import CircuitBreakerConfig, CircuitBreakerRegistry
+from app.tools.protocol.errors import (
+    ToolExecutionError,
+    ToolRequestError,
+    ToolTimeoutError,
+)
+from app.tools.protocol.execution_log import ExecutionLogSink, ExecutionRecord
+from app.tools.protocol.models import (
+    Capability,
+    Pipeline,
+    PipelineStep,
+    PipelineStepResult,
+    ToolCall,
+    ToolCallResult,
+    ToolManifest,
+    ValidationResult,
+)
+from app.tools.protocol.pipeline import (
+    STATUS_CANCELLED,
+    STATUS_FAILED,
+    STATUS_SKIPPED,
+    STATUS_SUCCEEDED,
+    get_dependencies,
+    get_dependents,
+    resolve_references,
+)
 from app.tools.protocol.registry import ToolRegistry
+from app.tools.protocol.scheduler import ExecutionScheduler
+from app.tools.protocol.single_flight import SingleFlight
+from app.tools.protocol.validation import ValidatorCache
 
 logger = logging.getLogger(__name__)
 
-
-class ToolExecutionError(Exception):
-    """Exception raised when tool execution fails."""
-    pass
+# Adapter errors caused by the call itself, such as missing credentials, an
+# unknown capability or a 4xx response; they do not count against the tool's
+# circuit breaker
+CALLER_ERRORS = (ValueError, ToolRequestError)
 
 
 class ToolExecutor:
@@ -30,19 +63,84 @@ class ToolExecutor:
     Tool Execution Environment manages tool execution.
     """
     
-    def __init__(self, registry: ToolRegistry):
+    def __init__(
+        self,
+        registry: ToolRegistry,
+        max_queue_depth: int = 100,
+        queue_timeout: Optional[float] = 30.0,
+        max_batch_concurrency: int = 16,
+        cache_max_entries: int = 1024,
+        cache_max_bytes: int = 64 * 1024 * 1024,
+        cache_default_ttl: float = 300.0,
+        single_flight: bool = True,
+        execution_log: Optional[ExecutionLogSink] = None,
+        circuit_breaker: Optional[CircuitBreakerConfig] = None,
+        validate_parameters: bool = True,
+        max_concurrency: int = 256,
+        priority_weights: Optional[Dict[str, float]] = None,
+        max_admission_queue_depth: int = 1000,
+        adaptive_concurrency: bool = True,
+        adapter_grace_period: float = 30.0
+    ):
         """
         Initialize the Tool Executor.
         
         Args:
             registry: Tool Registry
+            max_queue_depth: Maximum number of calls waiting for admission per tool
+            queue_timeout: Maximum time in seconds a call may wait for admission
+            max_batch_concurrency: Maximum number of batch calls running at once across all batches
+            cache_max_entries: Maximum number of cached results
+            cache_max_bytes: Maximum total size of cached results in bytes
+            cache_default_ttl: TTL in seconds for cacheable capabilities that do not declare one
+            single_flight: Whether to coalesce identical in-flight calls of idempotent capabilities
+            execution_log: Execution log sink; defaults to a SQLite sink at the default log path
+            circuit_breaker: Circuit breaker settings for tools that do not declare their own
+            validate_parameters: Whether to check call parameters against capability schemas before dispatch
+            max_concurrency: Maximum number of calls in flight across all tools
+            priority_weights: Share of `max_concurrency` each priority class receives when
+                calls queue; defaults to 8:1 for interactive over batch calls
+            max_admission_queue_depth: Maximum number of calls waiting for a global slot
+            adaptive_concurrency: Whether each tool's concurrency limit adapts to its latency,
+                with `concurrent_requests` as the ceiling, instead of being fixed
+            adapter_grace_period: Seconds an adapter replaced by a changed tool keeps serving
+                the calls it already started before it is shut down
         """
         self.registry = registry
+        self.scheduler = ExecutionScheduler(
+            max_queue_depth=max_queue_depth,
+            queue_timeout=queue_timeout,
+            adaptive_concurrency=adaptive_concurrency
+        )
+        self.admission = AdmissionQueue(
+            max_concurrency=max_concurrency,
+            weights=priority_weights,
+            max_queue_depth=max_admission_queue_depth,
+            queue_timeout=queue_timeout
+        )
+        self._batch_semaphore = asyncio.Semaphore(max_batch_concurrency)
+        self.result_cache = ResultCache(
+            max_entries=cache_max_entries,
+            max_bytes=cache_max_bytes,
+            default_ttl=cache_default_ttl
+        )
+        self.single_flight = SingleFlight()
+        self.single_flight_enabled = single_flight
+        self.circuit_breakers = CircuitBreakerRegistry(circuit_breaker)
+        self.validators = ValidatorCache()
+        self.validate_parameters = validate_parameters
+        self.execution_log = execution_log or ExecutionLogSink()
         self.adapters: Dict[str, ToolAdapter] = {}
+        self._adapter_locks: Dict[str, asyncio.Lock] = {}
+        self.adapter_grace_period = adapter_grace_period
+        self._retiring: Set["asyncio.Task[None]"] = set()
         self.adapter_classes: Dict[str, Type[ToolAdapter]] = {
             "rest_api": RestApiAdapter,
             "python_plugin": PythonPluginAdapter,
         }
+        
+        # Drop cached results, validators and adapters when a tool is re-registered or deleted
+        self.registry.add_listener(self._on_tool_changed)
     
     async def execute(
         self,
@@ -50,39 +148,95 @@ class ToolExecutor:
         capability_id: str,
         parameters: Dict[str, Any],
         context: Dict[str, Any],
-        user_id: Optional[str] = None
+        user_id: Optional[str] = None,
+        timeout: Optional[float] = None,
+        priority: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Execute a tool capability.
         
+        The call is cancelled when its deadline passes. The deadline is passed to
+        the adapter as `context["deadline"]`, a `time.monotonic()` timestamp.
+        
         Args:
             tool_id: Tool ID
             capability_id: Capability ID
             parameters: Input parameters
             context: Execution context
             user_id: User ID
+            timeout: Time budget in seconds; defaults to the `timeout` metadata
+                of the capability or the tool
+            priority: Priority class, `interactive` or `batch`; defaults to interactive
             
         Returns:
             Execution result
+            
+        Raises:
+            ToolValidationError: If the parameters do not match the capability's schema
+            ToolTimeoutError: If the call does not finish before its deadline
         """
         execution_id = str(uuid.uuid4())
         start_time = time.time()
+        timings = {"queue_time": 0.0}
         
         try:
-            # Get tool
-            tool_data = await self.registry.get_tool(tool_id)
-            if not tool_data:
-                raise ToolExecutionError(f"Tool not found: {tool_id}")
+            # Get tool adapter
+            adapter = await self._prepare_tool(tool_id)
+            capability = self._get_capability(adapter.manifest, capability_id)
+            self._validate(adapter.manifest, capability, parameters)
+            context = self._with_deadline(adapter.manifest, capability, context, timeout)
             
-            # Get adapter
-            adapter = await self._get_adapter(tool_id, tool_data)
+            # Serve cacheable capabilities from the result cache
+            cache_key = self._get_cache_key(adapter.manifest, capability, parameters)
+            if cache_key:
+                cached = self.result_cache.get(cache_key)
+                if cached is not None:
+                    await self._log_execution(
+                        execution_id=execution_id,
+                        tool_id=tool_id,
+                        capability_id=capability_id,
+                        user_id=user_id,
+                        parameters=parameters,
+                        result=cached,
+                        error=None,
+                        execution_time=time.time() - start_time,
+                        cached=True
+                    )
+                    return cached
             
-            # Execute capability
-            logger.info(f"Executing capability {capability_id} of tool {tool_id}")
-            result = await adapter.execute(capability_id, parameters, context)
+            # Coalesce identical in-flight calls of idempotent capabilities
+            flight_key = self._get_flight_key(tool_id, capability, parameters, context)
+            if flight_key:
+                result, coalesced = await self._until_deadline(
+                    self.single_flight.do(
+                        flight_key,
+                        lambda: self._dispatch(
+                            adapter, capability, capability_id, parameters, context, cache_key, timings,
+                            user_id, priority
+                        ),
+                        deadline=context.get("deadline")
+                    ),
+                    tool_id,
+                    capability_id,
+                    context
+                )
+                if coalesced:
+                    result = copy.deepcopy(result)
+            else:
+                coalesced = False
+                result = await self._until_deadline(
+                    self._dispatch(
+                        adapter, capability, capability_id, parameters, context, cache_key, timings,
+                        user_id, priority
+                    ),
+                    tool_id,
+                    capability_id,
+                    context
+                )
             
             # Log execution
-            execution_time = time.time() - start_time
+            queue_time = timings["queue_time"]
+            execution_time = time.time() - start_time - queue_time
             await self._log_execution(
                 execution_id=execution_id,
                 tool_id=tool_id,
@@ -91,13 +245,31 @@ class ToolExecutor:
                 parameters=parameters,
                 result=result,
                 error=None,
-                execution_time=execution_time
+                execution_time=execution_time,
+                queue_time=queue_time,
+                coalesced=coalesced
             )
             
             return result
+        except asyncio.CancelledError:
+            # The caller went away, e.g. a client disconnected
+            queue_time = timings["queue_time"]
+            await self._log_execution(
+                execution_id=execution_id,
+                tool_id=tool_id,
+                capability_id=capability_id,
+                user_id=user_id,
+                parameters=parameters,
+                result=None,
+                error="Cancelled",
+                execution_time=time.time() - start_time - queue_time,
+                queue_time=queue_time
+            )
+            raise
         except Exception as e:
             # Log execution error
-            execution_time = time.time() - start_time
+            queue_time = timings["queue_time"]
+            execution_time = time.time() - start_time - queue_time
             await self._log_execution(
                 execution_id=execution_id,
                 tool_id=tool_id,
@@ -106,16 +278,541 @@ class ToolExecutor:
                 parameters=parameters,
                 result=None,
                 error=str(e),
-                execution_time=execution_time
+                execution_time=execution_time,
+                queue_time=queue_time
             )
             
             logger.error(f"Error executing capability {capability_id} of tool {tool_id}: {str(e)}")
+            if isinstance(e, ToolExecutionError):
+                raise
+            raise ToolExecutionError(f"Execution error: {str(e)}")
+    
+    def _validate(
+        self,
+        manifest: ToolManifest,
+        capability: Optional[Capability],
+        parameters: Dict[str, Any]
+    ) -> None:
+        """
+        Check call parameters against the capability's schema.
+        
+        Args:
+            manifest: Tool manifest
+            capability: Capability
+            parameters: Input parameters
+            
+        Raises:
+            ToolValidationError: If the parameters do not match the schema
+        """
+        if self.validate_parameters and capability is not None:
+            self.validators.validate(manifest, capability, parameters)
+    
+    def _with_deadline(
+        self,
+        manifest: ToolManifest,
+        capability: Optional[Capability],
+        context: Dict[str, Any],
+        timeout: Optional[float]
+    ) -> Dict[str, Any]:
+        """
+        Add the call's deadline to a copy of its context.
+        
+        A deadline already present in the context, e.g. from an enclosing call,
+        is only ever shortened.
+        
+        Args:
+            manifest: Tool manifest
+            capability: Capability
+            context: Execution context
+            timeout: Explicit time budget in seconds
+            
+        Returns:
+            Execution context with `deadline` set, if the call has one
+        """
+        if timeout is None and capability:
+            timeout = capability.metadata.get("timeout")
+        if timeout is None:
+            timeout = manifest.metadata.get("timeout")
+        
+        deadline = context.get("deadline")
+        if timeout is not None:
+            own_deadline = time.monotonic() + float(timeout)
+            deadline = own_deadline if deadline is None else min(deadline, own_deadline)
+        
+        if deadline is None:
+            return context
+        
+        return {**context, "deadline": deadline}
+    
+    async def _until_deadline(
+        self,
+        awaitable: Awaitable[Any],
+        tool_id: str,
+        capability_id: str,
+        context: Dict[str, Any]
+    ) -> Any:
+        """
+        Await a call, cancelling it when its deadline passes.
+        
+        Args:
+            awaitable: Call to await
+            tool_id: Tool ID
+            capability_id: Capability ID
+            context: Execution context
+            
+        Returns:
+            Call result
+            
+        Raises:
+            ToolTimeoutError: If the deadline passes first
+        """
+        deadline = context.get("deadline")
+        if deadline is None:
+            return await awaitable
+        
+        try:
+            return await asyncio.wait_for(awaitable, timeout=max(0.0, deadline - time.monotonic()))
+        except asyncio.TimeoutError:
+            raise ToolTimeoutError(f"Capability {capability_id} of tool {tool_id} exceeded its deadline")
+    
+    async def _dispatch(
+        self,
+        adapter: ToolAdapter,
+        capability: Optional[Capability],
+        capability_id: str,
+        parameters: Dict[str, Any],
+        context: Dict[str, Any],
+        cache_key: Optional[str],
+        timings: Dict[str, float],
+        user_id: Optional[str] = None,
+        priority: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Run a capability on its adapter once admitted by the scheduler.
+        
+        Args:
+            adapter: Tool adapter
+            capability: Capability
+            capability_id: Capability ID
+            parameters: Input parameters
+            context: Execution context
+            cache_key: Result cache key, if the capability is cacheable
+            timings: Receives the time spent waiting for admission as `queue_time`
+            user_id: User ID
+            priority: Priority class
+            
+        Returns:
+            Execution result
+        """
+        tool_id = adapter.manifest.tool_id
+        
+        # Execute capability
+        async with self._admission(adapter, context, timings, user_id, priority):
+            logger.info(f"Executing capability {capability_id} of tool {tool_id}")
+            result = await adapter.execute(capability_id, parameters, context)
+        
+        if cache_key:
+            self.result_cache.set(
+                cache_key,
+                tool_id,
+                result,
+                ttl=capability.metadata.get("ttl_seconds")
+            )
+        
+        return result
+    
+    @contextlib.asynccontextmanager
+    async def _admission(
+        self,
+        adapter: ToolAdapter,
+        context: Dict[str, Any],
+        timings: Dict[str, float],
+        user_id: Optional[str] = None,
+        priority: Optional[str] = None,
+        measure_latency: bool = True
+    ) -> AsyncIterator[None]:
+        """
+        Admit a call through the tool's circuit breaker and scheduler, then the
+        global admission queue, and record its outcome.
+        
+        The global slot is taken last, so that calls held back by their tool's
+        limits do not occupy it while they wait.
+        
+        Args:
+            adapter: Tool adapter
+            context: Execution context
+            timings: Receives the time spent waiting for admission as `queue_time`
+            user_id: User ID, for fair queuing between users
+            priority: Priority class
+            measure_latency: Whether the call's latency reflects the tool's capacity
+                and may adjust its concurrency limit
+        """
+        tool_id = adapter.manifest.tool_id
+        
+        # Fail fast while the tool's backend is unhealthy
+        breaker = self.circuit_breakers.get_breaker(tool_id, adapter.manifest.metadata)
+        breaker.acquire()
+        
+        # Wait for the tool's rate limits and concurrency limit
+        scheduler = self.scheduler.get_scheduler(tool_id, adapter.manifest.rate_limits)
+        queue_start = time.time()
+        try:
+            await scheduler.acquire()
+        except BaseException:
+            breaker.record_cancelled()
+            timings["queue_time"] = time.time() - queue_start
+            raise
+        
+        # Share the global concurrency cap fairly between priority classes and users
+        try:
+            await self.admission.acquire(user_id, priority)
+        except BaseException:
+            scheduler.release()
+            breaker.record_cancelled()
+            raise
+        finally:
+            timings["queue_time"] = time.time() - queue_start
+        
+        call_start = time.monotonic()
+        # Only completed and timed out calls tell the concurrency limit about the tool's capacity
+        rtt = None
+        dropped = False
+        try:
+            yield
+        except CALLER_ERRORS:
+            # The call was at fault, e.g. an unknown capability or a 4xx response
+            breaker.record_cancelled()
+            raise
+        except Exception:
+            breaker.record_failure(time.monotonic() - call_start)
+            raise
+        except BaseException:
+            # Running out of time counts against the tool; a caller going away does not
+            deadline = context.get("deadline")
+            if deadline is not None and time.monotonic() >= deadline:
+                breaker.record_failure(time.monotonic() - call_start)
+                rtt = time.monotonic() - call_start
+                dropped = True
+            else:
+                breaker.record_cancelled()
+            raise
+        else:
+            rtt = time.monotonic() - call_start
+            breaker.record_success(rtt)
+        finally:
+            try:
+                self.admission.release(priority)
+            finally:
+                scheduler.release(rtt if measure_latency else None, dropped)
+    
+    async def execute_stream(
+        self,
+        tool_id: str,
+        capability_id: str,
+        parameters: Dict[str, Any],
+        context: Dict[str, Any],
+        user_id: Optional[str] = None,
+        timeout: Optional[float] = None,
+        priority: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Execute a tool capability, yielding its result in chunks as the adapter produces them.
+        
+        Streamed calls go through the same circuit breaker, rate limits and
+        deadline as `execute`, but are neither cached nor coalesced. The
+        deadline applies to the whole stream.
+        
+        Args:
+            tool_id: Tool ID
+            capability_id: Capability ID
+            parameters: Input parameters
+            context: Execution context
+            user_id: User ID
+            timeout: Time budget in seconds; defaults to the `timeout` metadata
+                of the capability or the tool
+            priority: Priority class, `interactive` or `batch`; defaults to interactive
+            
+        Returns:
+            Iterator over result chunks
+        """
+        execution_id = str(uuid.uuid4())
+        start_time = time.time()
+        timings = {"queue_time": 0.0}
+        chunks = 0
+        error = None
+        
+        try:
+            adapter = await self._prepare_tool(tool_id)
+            capability = self._get_capability(adapter.manifest, capability_id)
+            self._validate(adapter.manifest, capability, parameters)
+            context = self._with_deadline(adapter.manifest, capability, context, timeout)
+            
+            # A stream's duration depends on its consumer, not only on the tool
+            async with self._admission(adapter, context, timings, user_id, priority, measure_latency=False):
+                logger.info(f"Streaming capability {capability_id} of tool {tool_id}")
+                stream = adapter.execute_stream(capability_id, parameters, context)
+                try:
+                    while True:
+                        try:
+                            chunk = await self._until_deadline(stream.__anext__(), tool_id, capability_id, context)
+                        except StopAsyncIteration:
+                            break
+                        chunks += 1
+                        yield chunk
+                finally:
+                    await stream.aclose()
+        except (asyncio.CancelledError, GeneratorExit):
+            # The consumer went away, e.g. a client disconnected
+            error = "Cancelled"
+            raise
+        except Exception as e:
+            error = str(e)
+            logger.error(f"Error streaming capability {capability_id} of tool {tool_id}: {str(e)}")
+            if isinstance(e, ToolExecutionError):
+                raise
             raise ToolExecutionError(f"Execution error: {str(e)}")
+        finally:
+            queue_time = timings["queue_time"]
+            await self._log_execution(
+                execution_id=execution_id,
+                tool_id=tool_id,
+                capability_id=capability_id,
+                user_id=user_id,
+                parameters=parameters,
+                result=None if error else {"chunks": chunks},
+                error=error,
+                execution_time=time.time() - start_time - queue_time,
+                queue_time=queue_time
+            )
+    
+    async def execute_many(
+        self,
+        calls: List[ToolCall],
+        user_id: Optional[str] = None,
+        priority: Optional[str] = None
+    ) -> List[ToolCallResult]:
+        """
+        Execute several tool capabilities concurrently.
+        
+        Each distinct tool is resolved once before the calls fan out. Failed calls
+        are reported in their result instead of failing the whole batch.
+        
+        Args:
+            calls: Capability calls
+            user_id: User ID
+            priority: Priority class of the calls
+            
+        Returns:
+            Call results, in the same order as the calls
+        """
+        # Resolve each distinct tool once; failures are reported per call below
+        tool_ids = list(dict.fromkeys(call.tool_id for call in calls))
+        await asyncio.gather(
+            *[self._prepare_tool(tool_id) for tool_id in tool_ids],
+            return_exceptions=True
+        )
+        
+        async def run(call: ToolCall) -> ToolCallResult:
+            async with self._batch_semaphore:
+                try:
+                    result = await self.execute(
+                        tool_id=call.tool_id,
+                        capability_id=call.capability_id,
+                        parameters=call.parameters,
+                        context=call.context,
+                        user_id=user_id,
+                        timeout=call.timeout,
+                        priority=priority
+                    )
+                except Exception as e:
+                    return ToolCallResult(
+                        tool_id=call.tool_id,
+                        capability_id=call.capability_id,
+                        success=False,
+                        error=str(e),
+                        error_type=type(e).__name__
+                    )
+            
+            return ToolCallResult(
+                tool_id=call.tool_id,
+                capability_id=call.capability_id,
+                success=True,
+                result=result
+            )
+        
+        return list(await asyncio.gather(*[run(call) for call in calls]))
+    
+    async def execute_pipeline(
+        self,
+        pipeline: Pipeline,
+        user_id: Optional[str] = None,
+        priority: Optional[str] = None
+    ) -> AsyncIterator[PipelineStepResult]:
+        """
+        Execute a graph of capability calls, yielding each step's outcome as it finishes.
+        
+        A step runs once the steps it references or depends on have succeeded, so
+        independent branches run concurrently. When a step fails, the steps
+        depending on it are skipped; with `fail_fast`, all running steps are
+        cancelled and no further steps start.
+        
+        Args:
+            pipeline: Pipeline
+            user_id: User ID
+            priority: Priority class of the steps
+            
+        Returns:
+            Iterator over step results, in completion order; steps that never ran come last
+            
+        Raises:
+            PipelineError: If the pipeline is malformed
+        """
+        dependencies = get_dependencies(pipeline)
+        dependents = get_dependents(dependencies)
+        steps = {step.step_id: step for step in pipeline.steps}
+        remaining = {step_id: len(required) for step_id, required in dependencies.items()}
+        deadline = time.monotonic() + pipeline.timeout if pipeline.timeout else None
+        results: Dict[str, Any] = {}
+        finished = set()
+        running: Dict["asyncio.Task[Dict[str, Any]]", str] = {}
+        
+        def start(step_id: str) -> None:
+            task = asyncio.ensure_future(self._run_step(steps[step_id], results, deadline, user_id, priority))
+            running[task] = step_id
+        
+        for step_id, count in remaining.items():
+            if count == 0:
+                start(step_id)
+        
+        try:
+            while running:
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                failed = False
+                # Record failures first, so that no dependents start when short-circuiting
+                for task in sorted(done, key=lambda task: task.exception() is None):
+                    step_id = running.pop(task)
+                    finished.add(step_id)
+                    error = task.exception()
+                    if error is not None:
+                        failed = True
+                        yield self._step_result(steps[step_id], STATUS_FAILED, error=error)
+                        continue
+                    
+                    results[step_id] = task.result()
+                    yield self._step_result(steps[step_id], STATUS_SUCCEEDED, result=results[step_id])
+                    for dependent in dependents[step_id]:
+                        remaining[dependent] -= 1
+                        if remaining[dependent] == 0 and not (failed and pipeline.fail_fast):
+                            start(dependent)
+                
+                if failed and pipeline.fail_fast:
+                    # Short-circuit the rest of the graph
+                    cancelled = list(running.items())
+                    running.clear()
+                    for task, _ in cancelled:
+                        task.cancel()
+                    await asyncio.gather(*[task for task, _ in cancelled], return_exceptions=True)
+                    for _, step_id in cancelled:
+                        finished.add(step_id)
+                        yield self._step_result(steps[step_id], STATUS_CANCELLED)
+            
+            # Steps whose dependencies failed or were cancelled never ran
+            for step_id, step in steps.items():
+                if step_id not in finished:
+                    yield self._step_result(step, STATUS_SKIPPED)
+        finally:
+            for task in running:
+                task.cancel()
+    
+    async def _run_step(
+        self,
+        step: PipelineStep,
+        results: Dict[str, Any],
+        deadline: Optional[float],
+        user_id: Optional[str],
+        priority: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Execute a pipeline step with the results of the steps it references.
+        
+        Args:
+            step: Pipeline step
+            results: Results of finished steps keyed by step ID
+            deadline: Deadline of the whole pipeline, if any
+            user_id: User ID
+            priority: Priority class
+            
+        Returns:
+            Execution result
+        """
+        parameters = resolve_references(step.parameters, results)
+        context = dict(step.context)
+        if deadline is not None:
+            context["deadline"] = min(deadline, context.get("deadline", deadline))
+        
+        async with self._batch_semaphore:
+            return await self.execute(
+                tool_id=step.tool_id,
+                capability_id=step.capability_id,
+                parameters=parameters,
+                context=context,
+                user_id=user_id,
+                timeout=step.timeout,
+                priority=priority
+            )
+    
+    def _step_result(
+        self,
+        step: PipelineStep,
+        status: str,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[BaseException] = None
+    ) -> PipelineStepResult:
+        """
+        Build the reported outcome of a pipeline step.
+        
+        Args:
+            step: Pipeline step
+            status: Step status
+            result: Execution result
+            error: Execution error
+            
+        Returns:
+            Step result
+        """
+        return PipelineStepResult(
+            step_id=step.step_id,
+            tool_id=step.tool_id,
+            capability_id=step.capability_id,
+            status=status,
+            success=status == STATUS_SUCCEEDED,
+            result=result,
+            error=str(error) if error is not None else None,
+            error_type=type(error).__name__ if error is not None else None
+        )
+    
+    async def _prepare_tool(self, tool_id: str) -> ToolAdapter:
+        """
+        Load a tool and make sure its adapter is initialized.
+        
+        Args:
+            tool_id: Tool ID
+            
+        Returns:
+            Tool adapter
+        """
+        tool_data = await self.registry.get_tool(tool_id)
+        if not tool_data:
+            raise ToolExecutionError(f"Tool not found: {tool_id}")
+        
+        return await self._get_adapter(tool_id, tool_data)
     
     async def _get_adapter(self, tool_id: str, tool_data: Dict[str, Any]) -> ToolAdapter:
         """
         Get or create an adapter for a tool.
         
+        Concurrent callers for a cold tool wait on a single initialization.
+        
         Args:
             tool_id: Tool ID
             tool_data: Tool data
@@ -124,9 +821,35 @@ class ToolExecutor:
             Tool adapter
         """
         # Check if adapter already exists
-        if tool_id in self.adapters:
-            return self.adapters[tool_id]
+        adapter = self.adapters.get(tool_id)
+        if adapter is not None:
+            return adapter
         
+        lock = self._adapter_locks.setdefault(tool_id, asyncio.Lock())
+        async with lock:
+            # Another caller may have initialized the adapter while we waited
+            adapter = self.adapters.get(tool_id)
+            if adapter is not None:
+                return adapter
+            
+            adapter = await self._create_adapter(tool_id, tool_data)
+            
+            # Store adapter
+            self.adapters[tool_id] = adapter
+        
+        return adapter
+    
+    async def _create_adapter(self, tool_id: str, tool_data: Dict[str, Any]) -> ToolAdapter:
+        """
+        Create, initialize and validate an adapter for a tool.
+        
+        Args:
+            tool_id: Tool ID
+            tool_data: Tool data
+            
+        Returns:
+            Tool adapter
+        """
         # Get implementation type
         implementation = tool_data.get("implementation", {})
         implementation_type = implementation.get("implementation_type")
@@ -144,10 +867,11 @@ class ToolExecutor:
         # Create adapter
         adapter = adapter_class(manifest)
         
-        # Initialize adapter
-        config = implementation.get("config", {})
+        # Initialize adapter with its own copy of the shared, frozen configuration
+        config = thaw(implementation.get("config", {}))
         initialized = await adapter.initialize(config)
         if not initialized:
+            await adapter.shutdown()
             raise ToolExecutionError(f"Failed to initialize adapter for tool: {tool_id}")
         
         # Validate adapter
@@ -156,11 +880,45 @@ class ToolExecutor:
             await adapter.shutdown()
             raise ToolExecutionError(f"Adapter validation failed: {validation.errors}")
         
-        # Store adapter
-        self.adapters[tool_id] = adapter
+        # Compile parameter validators ahead of the first call
+        if self.validate_parameters:
+            self.validators.compile_manifest(manifest)
         
         return adapter
     
+    async def warm_up(self, tool_ids: Union[List[str], str] = "all") -> Dict[str, bool]:
+        """
+        Initialize tool adapters ahead of traffic.
+        
+        Adapters are initialized in parallel. Failures are logged and reported
+        but do not stop the remaining tools from warming up.
+        
+        Args:
+            tool_ids: Tool IDs to warm up, or "all" for every registered tool
+            
+        Returns:
+            Whether each tool's adapter is ready, keyed by tool ID
+        """
+        if tool_ids == "all":
+            tools = await self.registry.list_tools()
+            tool_ids = [tool["tool_id"] for tool in tools]
+        
+        results = await asyncio.gather(
+            *[self._prepare_tool(tool_id) for tool_id in tool_ids],
+            return_exceptions=True
+        )
+        
+        status = {}
+        for tool_id, result in zip(tool_ids, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Failed to warm up tool {tool_id}: {str(result)}")
+                status[tool_id] = False
+            else:
+                status[tool_id] = True
+        
+        logger.info(f"Warmed up {sum(status.values())} of {len(status)} tool adapters")
+        return status
+    
     async def _log_execution(
         self,
         execution_id: str,
@@ -170,7 +928,10 @@ class ToolExecutor:
         parameters: Dict[str, Any],
         result: Optional[Dict[str, Any]],
         error: Optional[str],
-        execution_time: float
+        execution_time: float,
+        queue_time: float = 0.0,
+        cached: bool = False,
+        coalesced: bool = False
     ) -> None:
         """
         Log tool execution.
@@ -183,22 +944,160 @@ class ToolExecutor:
             parameters: Input parameters
             result: Execution result
             error: Error message
-            execution_time: Execution time in seconds
-        """
-        # In a real implementation, this would log to a database
-        log_entry = {
-            "execution_id": execution_id,
-            "tool_id": tool_id,
-            "capability_id": capability_id,
-            "user_id": user_id,
-            "parameters": self._sanitize_parameters(parameters),
-            "result": result,
-            "error": error,
-            "execution_time": execution_time,
-            "timestamp": datetime.utcnow().isoformat()
-        }
+            execution_time: Execution time in seconds, excluding queue time
+            queue_time: Time spent waiting for rate limits and concurrency slots in seconds
+            cached: Whether the result was served from the result cache
+            coalesced: Whether the result was shared from an identical in-flight call
+        """
+        # Snapshotted and buffered; serialization and the database write happen in the background
+        self.execution_log.record(ExecutionRecord(
+            execution_id=execution_id,
+            tool_id=tool_id,
+            capability_id=capability_id,
+            user_id=user_id,
+            parameters=self._sanitize_parameters(parameters),
+            result=result,
+            error=error,
+            execution_time=execution_time,
+            queue_time=queue_time,
+            cached=cached,
+            coalesced=coalesced,
+            timestamp=time.time()
+        ))
+    
+    def _get_capability(self, manifest: ToolManifest, capability_id: str) -> Optional[Capability]:
+        """
+        Find a capability in a tool manifest.
+        
+        Args:
+            manifest: Tool manifest
+            capability_id: Capability ID
+            
+        Returns:
+            Capability or None if not found
+        """
+        for capability in manifest.capabilities:
+            if capability.capability_id == capability_id:
+                return capability
+        
+        return None
+    
+    def _get_cache_key(
+        self,
+        manifest: ToolManifest,
+        capability: Optional[Capability],
+        parameters: Dict[str, Any]
+    ) -> Optional[str]:
+        """
+        Get the result cache key for a call.
+        
+        Only capabilities that set `cacheable` in their metadata are cached. Their
+        results must depend on the parameters alone, not on the caller.
+        
+        Args:
+            manifest: Tool manifest
+            capability: Capability
+            parameters: Input parameters
+            
+        Returns:
+            Cache key or None if the call is not cacheable
+        """
+        if not capability or not capability.metadata.get("cacheable"):
+            return None
+        
+        return ResultCache.make_key(manifest.tool_id, manifest.version, capability.capability_id, parameters)
+    
+    def _get_flight_key(
+        self,
+        tool_id: str,
+        capability: Optional[Capability],
+        parameters: Dict[str, Any],
+        context: Dict[str, Any]
+    ) -> Optional[Tuple[str, ...]]:
+        """
+        Get the key under which identical in-flight calls are coalesced.
+        
+        Args:
+            tool_id: Tool ID
+            capability: Capability
+            parameters: Input parameters
+            context: Execution context
+            
+        Returns:
+            Coalescing key or None if the call must not be coalesced
+        """
+        if not self.single_flight_enabled or not capability or not self._is_idempotent(capability):
+            return None
+        
+        parameters_hash = canonical_hash(parameters)
+        auth_hash = canonical_hash(context.get("auth"))
+        if parameters_hash is None or auth_hash is None:
+            return None
         
-        logger.info(f"Tool execution: {log_entry}")
+        return (tool_id, capability.capability_id, parameters_hash, auth_hash)
+    
+    def _is_idempotent(self, capability: Capability) -> bool:
+        """
+        Check whether repeating a capability call has no additional effect.
+        
+        Capabilities may declare `idempotent` in their metadata. Otherwise cacheable
+        capabilities and REST capabilities using GET or HEAD are considered idempotent.
+        
+        Args:
+            capability: Capability
+            
+        Returns:
+            True if the capability is idempotent
+        """
+        idempotent = capability.metadata.get("idempotent")
+        if idempotent is not None:
+            return bool(idempotent)
+        
+        if capability.metadata.get("cacheable"):
+            return True
+        
+        return str(capability.metadata.get("method", "")).upper() in ("GET", "HEAD")
+    
+    def _on_tool_changed(self, tool_id: str) -> None:
+        """
+        Handle a tool being re-registered or deleted.
+        
+        Args:
+            tool_id: Tool ID
+        """
+        self.result_cache.invalidate_tool(tool_id)
+        self.validators.invalidate_tool(tool_id)
+        
+        # The next call creates a new adapter from the changed tool
+        adapter = self.adapters.pop(tool_id, None)
+        if adapter is not None:
+            self._retire_adapter(tool_id, adapter)
+    
+    def _retire_adapter(self, tool_id: str, adapter: ToolAdapter) -> None:
+        """
+        Shut down a replaced adapter once the calls it is serving had time to finish.
+        
+        Args:
+            tool_id: Tool ID
+            adapter: Replaced adapter
+        """
+        async def retire() -> None:
+            try:
+                await asyncio.sleep(self.adapter_grace_period)
+            finally:
+                try:
+                    await adapter.shutdown()
+                except Exception as e:
+                    logger.error(f"Error shutting down replaced adapter for tool {tool_id}: {str(e)}")
+        
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            logger.warning(f"Replaced adapter for tool {tool_id} was not shut down: no running event loop")
+            return
+        task = loop.create_task(retire())
+        self._retiring.add(task)
+        task.add_done_callback(self._retiring.discard)
     
     def _sanitize_parameters(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -213,6 +1112,31 @@ class ToolExecutor:
         # In a real implementation, this would remove sensitive data
         return parameters
     
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get execution metrics.
+        
+        Returns:
+            Execution metrics
+        """
+        adapter_metrics = {}
+        for tool_id, adapter in self.adapters.items():
+            metrics = adapter.get_metrics()
+            if metrics:
+                adapter_metrics[tool_id] = metrics
+        
+        return {
+            "scheduler": self.scheduler.get_stats(),
+            "admission": self.admission.get_stats(),
+            "cache": self.result_cache.get_stats(),
+            "single_flight": self.single_flight.get_stats(),
+            "circuit_breakers": self.circuit_breakers.get_stats(),
+            "validation": self.validators.get_stats(),
+            "execution_log": self.execution_log.get_stats(),
+            "adapters": adapter_metrics,
+            "http_pool": get_shared_http_pool().get_stats(),
+        }
+    
     async def shutdown(self) -> None:
         """
         Shutdown the Tool Executor and release resources.
@@ -224,4 +1148,13 @@ class ToolExecutor:
                 logger.error(f"Error shutting down adapter for tool {tool_id}: {str(e)}")
         
         self.adapters = {}
+        self._adapter_locks = {}
+        
+        # Replaced adapters shut down without waiting out their grace period
+        retiring = list(self._retiring)
+        for task in retiring:
+            task.cancel()
+        await asyncio.gather(*retiring, return_exceptions=True)
+        
+        await self.execution_log.close()
         logger.info("Tool Executor shut down") 
\ No newline at end of file
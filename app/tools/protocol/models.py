@@ -129,4 +129,85 @@ class ToolManifest(BaseModel):
     rate_limits: Optional[RateLimits] = Field(None, description="Rate limiting configuration")
     dependencies: List[Dependency] = Field(default_factory=list, description="Tool dependencies")
     platform_requirements: PlatformRequirements = Field(..., description="Platform requirements")
-    metadata: Dict[str, Any] = Field(default_factory=dict, description="Additional metadata") 
\ No newline at end of file
+    metadata: Dict[str, Any] = Field(default_factory=dict, description="Additional metadata") 
+
+class ToolImplementation(BaseModel):
+    """Tool implementation definition."""
+    
+    implementation_type: str = Field(..., description="Implementation type (rest_api, python_plugin)")
+    config: Dict[str, Any] = Field(default_factory=dict, description="Adapter configuration")
+
+
+class ToolRegistration(BaseModel):
+    """A tool to register in a batch."""
+    
+    manifest: ToolManifest = Field(..., description="Tool manifest")
+    implementation: ToolImplementation = Field(..., description="Tool implementation")
+
+
+class ToolRegistrationResult(BaseModel):
+    """Outcome of registering a single tool in a batch."""
+    
+    tool_id: str = Field(..., description="Tool ID")
+    status: str = Field(..., description="created, updated, unchanged or invalid")
+    errors: List[str] = Field(default_factory=list, description="Validation errors")
+    warnings: List[str] = Field(default_factory=list, description="Validation warnings")
+
+
+class ToolCall(BaseModel):
+    """A single capability call in a batch."""
+    
+    tool_id: str = Field(..., description="Tool ID")
+    capability_id: str = Field(..., description="Capability ID")
+    parameters: Dict[str, Any] = Field(default_factory=dict, description="Input parameters")
+    context: Dict[str, Any] = Field(default_factory=dict, description="Execution context")
+    timeout: Optional[float] = Field(None, gt=0, description="Time budget in seconds")
+
+
+class ToolCallResult(BaseModel):
+    """Outcome of a single capability call in a batch."""
+    
+    tool_id: str = Field(..., description="Tool ID")
+    capability_id: str = Field(..., description="Capability ID")
+    success: bool = Field(..., description="Whether the call succeeded")
+    result: Optional[Dict[str, Any]] = Field(None, description="Execution result")
+    error: Optional[str] = Field(None, description="Error message")
+    error_type: Optional[str] = Field(None, description="Error class name")
+
+
+class PipelineStep(BaseModel):
+    """A capability call in a pipeline."""
+    
+    step_id: str = Field(..., pattern=r"^[A-Za-z0-9_-]+$", description="Step ID, unique within the pipeline")
+    tool_id: str = Field(..., description="Tool ID")
+    capability_id: str = Field(..., description="Capability ID")
+    parameters: Dict[str, Any] = Field(
+        default_factory=dict,
+        description='Input parameters; {"$ref": "<step_id>.<path>"} values are replaced by earlier step results'
+    )
+    context: Dict[str, Any] = Field(default_factory=dict, description="Execution context")
+    timeout: Optional[float] = Field(None, gt=0, description="Time budget in seconds")
+    depends_on: List[str] = Field(default_factory=list, description="Steps to finish first, besides referenced ones")
+
+
+class Pipeline(BaseModel):
+    """A graph of capability calls."""
+    
+    steps: List[PipelineStep] = Field(..., min_length=1, description="Pipeline steps")
+    timeout: Optional[float] = Field(None, gt=0, description="Time budget of the whole pipeline in seconds")
+    fail_fast: bool = Field(True, description="Cancel all remaining steps when one fails")
+
+
+class PipelineStepResult(ToolCallResult):
+    """Outcome of a pipeline step."""
+    
+    step_id: str = Field(..., description="Step ID")
+    status: str = Field(..., description="succeeded, failed, cancelled or skipped")
+
+
+class ValidationResult(BaseModel):
+    """Result of validating a tool manifest or implementation."""
+    
+    is_valid: bool = Field(..., description="Whether validation succeeded")
+    errors: List[str] = Field(default_factory=list, description="Validation errors")
+    warnings: List[str] = Field(default_factory=list, description="Validation warnings")
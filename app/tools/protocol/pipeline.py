@@ -0,0 +1,145 @@
+"""
+Tool Integration Protocol - Pipelines
+
+This module resolves the dependency graph of a pipeline and the references between
+its steps.
+"""
+
+import logging
+from collections import deque
+from typing import Any, Dict, List, Set
+
+from app.tools.protocol.errors import PipelineError
+from app.tools.protocol.models import Pipeline
+
+logger = logging.getLogger(__name__)
+
+REF_KEY = "$ref"
+
+STATUS_SUCCEEDED = "succeeded"
+STATUS_FAILED = "failed"
+STATUS_CANCELLED = "cancelled"
+STATUS_SKIPPED = "skipped"
+
+
+def _is_reference(value: Any) -> bool:
+    """Check whether a value is a reference to a step result."""
+    return isinstance(value, dict) and len(value) == 1 and isinstance(value.get(REF_KEY), str)
+
+
+def find_references(value: Any) -> Set[str]:
+    """
+    Find the steps whose results a value references.
+
+    Args:
+        value: Parameters or part of them
+
+    Returns:
+        Referenced step IDs
+    """
+    if _is_reference(value):
+        return {value[REF_KEY].split(".", 1)[0]}
+    if isinstance(value, dict):
+        return set().union(*(find_references(item) for item in value.values()))
+    if isinstance(value, list):
+        return set().union(*(find_references(item) for item in value))
+    return set()
+
+
+def resolve_references(value: Any, results: Dict[str, Any]) -> Any:
+    """
+    Replace references in a value with the step results they point to.
+
+    A reference `{"$ref": "search.items.0.url"}` resolves to
+    `results["search"]["items"][0]["url"]`.
+
+    Args:
+        value: Parameters or part of them
+        results: Results of finished steps keyed by step ID
+
+    Returns:
+        Value with references replaced
+
+    Raises:
+        PipelineError: If a reference does not point to a value
+    """
+    if _is_reference(value):
+        reference = value[REF_KEY]
+        step_id, *path = reference.split(".")
+        resolved = results[step_id]
+        for segment in path:
+            try:
+                if isinstance(resolved, list):
+                    resolved = resolved[int(segment)]
+                else:
+                    resolved = resolved[segment]
+            except (KeyError, IndexError, ValueError, TypeError):
+                raise PipelineError(f"Reference {reference} does not match the result of step {step_id}")
+        return resolved
+    if isinstance(value, dict):
+        return {key: resolve_references(item, results) for key, item in value.items()}
+    if isinstance(value, list):
+        return [resolve_references(item, results) for item in value]
+    return value
+
+
+def get_dependencies(pipeline: Pipeline) -> Dict[str, Set[str]]:
+    """
+    Get the steps each step depends on, checking that they form a DAG.
+
+    Args:
+        pipeline: Pipeline
+
+    Returns:
+        Dependencies keyed by step ID, in pipeline order
+
+    Raises:
+        PipelineError: If step IDs repeat, a step depends on an unknown step,
+            or the dependencies form a cycle
+    """
+    dependencies: Dict[str, Set[str]] = {}
+    for step in pipeline.steps:
+        if step.step_id in dependencies:
+            raise PipelineError(f"Duplicate step ID: {step.step_id}")
+        dependencies[step.step_id] = find_references(step.parameters) | set(step.depends_on)
+
+    for step_id, required in dependencies.items():
+        unknown = required - dependencies.keys()
+        if unknown:
+            raise PipelineError(f"Step {step_id} depends on unknown steps: {', '.join(sorted(unknown))}")
+
+    # Kahn's algorithm: whatever cannot be ordered is part of a cycle
+    remaining = {step_id: len(required) for step_id, required in dependencies.items()}
+    dependents = get_dependents(dependencies)
+    ready = deque(step_id for step_id, count in remaining.items() if count == 0)
+    ordered = 0
+    while ready:
+        step_id = ready.popleft()
+        ordered += 1
+        for dependent in dependents[step_id]:
+            remaining[dependent] -= 1
+            if remaining[dependent] == 0:
+                ready.append(dependent)
+
+    if ordered < len(dependencies):
+        cyclic = sorted(step_id for step_id, count in remaining.items() if count > 0)
+        raise PipelineError(f"Pipeline steps form a cycle: {', '.join(cyclic)}")
+
+    return dependencies
+
+
+def get_dependents(dependencies: Dict[str, Set[str]]) -> Dict[str, List[str]]:
+    """
+    Invert a dependency graph.
+
+    Args:
+        dependencies: Dependencies keyed by step ID
+
+    Returns:
+        Steps depending on each step, keyed by step ID
+    """
+    dependents: Dict[str, List[str]] = {step_id: [] for step_id in dependencies}
+    for step_id, required in dependencies.items():
+        for dependency in required:
+            dependents[dependency].append(step_id)
+    return dependents
@@ -4,15 +4,29 @@ Tool Integration Protocol - Tool Registry
 This module implements the Tool Registry component of the Tool Integration Protocol.
 """
 
+import asyncio
+import hashlib
+import json
 import logging
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from app.tools.protocol.models import ToolManifest, ToolImplementation, ValidationResult
-from app.db.base import Database
+from app.tools.protocol.models import (
+    ToolImplementation,
+    ToolManifest,
+    ToolRegistrationResult,
+    ValidationResult,
+)
+from app.tools.protocol.validation import check_schema
+from app.db.base import TOOL_UNCHANGED, Database
+from app.db.frozen import freeze
+from app.db.search import DEFAULT_SEARCH_LIMIT, MODE_AND
 
 logger = logging.getLogger(__name__)
 
+# Outcome of registering a tool whose manifest failed validation
+TOOL_INVALID = "invalid"
+
 
 class ToolRegistry:
     """
@@ -22,7 +36,77 @@ class ToolRegistry:
     def __init__(self, db: Database):
         """Initialize the Tool Registry."""
         self.db = db
-        self._tools: Dict[str, Dict[str, Any]] = {}  # In-memory cache
+        self._tools: Dict[str, Dict[str, Any]] = {}  # In-memory cache of frozen tool data
+        self._listeners: List[Callable[[str], None]] = []
+        # Catalog version the cache is up to date with, once synced
+        self.catalog_version: Optional[int] = None
+        self._sync_task: Optional["asyncio.Task[None]"] = None
+    
+    def add_listener(self, listener: Callable[[str], None]) -> None:
+        """
+        Register a callback invoked with the tool ID whenever a tool is updated or deleted.
+        
+        Args:
+            listener: Callback
+        """
+        self._listeners.append(listener)
+    
+    def _notify(self, tool_id: str) -> None:
+        """Notify listeners that a tool changed."""
+        for listener in self._listeners:
+            try:
+                listener(tool_id)
+            except Exception as e:
+                logger.error(f"Error notifying tool change listener for {tool_id}: {str(e)}")
+    
+    async def sync(self) -> List[str]:
+        """
+        Drop cached tools that were changed through other database instances,
+        e.g. by other API workers, and notify listeners about them.
+        
+        Returns:
+            IDs of the tools that changed
+        """
+        version, changed = await self.db.get_changes(self.catalog_version or 0)
+        if self.catalog_version is None or changed is None:
+            # Nothing is known about what changed while out of sync
+            changed = list(self._tools)
+        self.catalog_version = version
+        
+        for tool_id in changed:
+            self._tools.pop(tool_id, None)
+            self._notify(tool_id)
+        
+        if changed:
+            logger.info(f"Catalog version {version}: reloading {len(changed)} changed tools")
+        return changed
+    
+    async def start_sync(self, interval: float = 0.25) -> None:
+        """
+        Sync with the catalog now and then every `interval` seconds in the background.
+        
+        Args:
+            interval: Seconds between polls of the catalog version
+        """
+        await self.sync()
+        if self._sync_task is None:
+            self._sync_task = asyncio.ensure_future(self._sync_periodically(interval))
+    
+    async def stop_sync(self) -> None:
+        """Stop syncing with the catalog in the background."""
+        task, self._sync_task = self._sync_task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+    
+    async def _sync_periodically(self, interval: float) -> None:
+        """Poll the catalog version until stopped."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.sync()
+            except Exception as e:
+                logger.error(f"Error syncing tool catalog: {str(e)}")
     
     async def register(self, manifest: ToolManifest, implementation: ToolImplementation) -> str:
         """
@@ -40,55 +124,129 @@ class ToolRegistry:
         if not validation_result.is_valid:
             raise ValueError(f"Invalid tool manifest: {validation_result.errors}")
         
-        # Check if tool already exists
-        existing_tool = await self.get_tool(manifest.tool_id)
-        if existing_tool:
-            # Update existing tool
-            await self._update_tool(manifest, implementation)
-            logger.info(f"Updated tool: {manifest.tool_id} (version {manifest.version})")
-        else:
-            # Register new tool
-            await self._create_tool(manifest, implementation)
+        # Create the tool or update it in place, atomically where the database supports it
+        created = await self.db.upsert_tool(self._make_record(manifest, implementation, datetime.utcnow()))
+        if created:
             logger.info(f"Registered new tool: {manifest.tool_id} (version {manifest.version})")
+        else:
+            logger.info(f"Updated tool: {manifest.tool_id} (version {manifest.version})")
         
-        # Update in-memory cache
-        self._tools[manifest.tool_id] = {
-            "manifest": manifest.dict(),
-            "implementation": implementation.dict()
-        }
+        # Reload from the database on next use, which knows the stored status and creation time
+        self._tools.pop(manifest.tool_id, None)
+        self._notify(manifest.tool_id)
         
         return manifest.tool_id
     
-    async def _create_tool(self, manifest: ToolManifest, implementation: ToolImplementation) -> None:
-        """Create a new tool in the database."""
-        tool_data = {
+    async def register_many(
+        self,
+        tools: List[Tuple[ToolManifest, ToolImplementation]]
+    ) -> List[ToolRegistrationResult]:
+        """
+        Register or update several tools at once.
+        
+        Tools whose manifest and implementation are unchanged since they were
+        last registered are skipped without being validated or written. The
+        others are validated together off the event loop and written in a
+        single transaction where the database supports it. Invalid manifests
+        are reported in their result and do not stop the remaining tools.
+        
+        Args:
+            tools: Manifest and implementation of each tool
+            
+        Returns:
+            Result of each tool, in order: `created`, `updated`, `unchanged` or `invalid`
+            
+        Raises:
+            RuntimeError: If the database does not report the outcome of every write
+        """
+        now = datetime.utcnow()
+        records = [self._make_record(manifest, implementation, now) for manifest, implementation in tools]
+        stored = await self.db.get_content_hashes([record["tool_id"] for record in records])
+        
+        results: List[Optional[ToolRegistrationResult]] = [None] * len(tools)
+        pending = []
+        for index, record in enumerate(records):
+            if record["tool_id"] in stored and stored[record["tool_id"]] == record["content_hash"]:
+                results[index] = ToolRegistrationResult(tool_id=record["tool_id"], status=TOOL_UNCHANGED)
+            else:
+                pending.append(index)
+        
+        # Validation is CPU-bound; run it on a worker thread so other requests are still served
+        validations = await asyncio.to_thread(
+            lambda: [self.validate_manifest(tools[index][0]) for index in pending]
+        )
+        writes = []
+        for index, validation in zip(pending, validations):
+            if validation.is_valid:
+                writes.append((index, validation))
+            else:
+                results[index] = ToolRegistrationResult(
+                    tool_id=records[index]["tool_id"],
+                    status=TOOL_INVALID,
+                    errors=validation.errors,
+                    warnings=validation.warnings
+                )
+        
+        outcomes = await self.db.upsert_many([records[index] for index, _ in writes]) if writes else []
+        if len(outcomes) != len(writes):
+            # The writes happened, but their outcomes are unknown
+            for index, _ in writes:
+                self._tools.pop(records[index]["tool_id"], None)
+                self._notify(records[index]["tool_id"])
+            raise RuntimeError(f"Database reported {len(outcomes)} outcomes for {len(writes)} written tools")
+        
+        for (index, validation), outcome in zip(writes, outcomes):
+            tool_id = records[index]["tool_id"]
+            results[index] = ToolRegistrationResult(tool_id=tool_id, status=outcome, warnings=validation.warnings)
+            if outcome != TOOL_UNCHANGED:
+                self._tools.pop(tool_id, None)
+                self._notify(tool_id)
+        
+        counts: Dict[str, int] = {}
+        for result in results:
+            counts[result.status] = counts.get(result.status, 0) + 1
+        logger.info(f"Registered {len(tools)} tools: {counts}")
+        
+        return results
+    
+    def _make_record(
+        self,
+        manifest: ToolManifest,
+        implementation: ToolImplementation,
+        now: datetime
+    ) -> Dict[str, Any]:
+        """Build the stored data of a newly registered tool, with the hash of its content."""
+        manifest_data = manifest.dict()
+        implementation_data = implementation.dict()
+        # Serialized the way the database stores it, with URLs as strings
+        content = json.dumps(
+            {"manifest": manifest_data, "implementation": implementation_data},
+            sort_keys=True,
+            separators=(",", ":"),
+            default=str
+        )
+        return {
             "tool_id": manifest.tool_id,
-            "manifest": manifest.dict(),
-            "implementation": implementation.dict(),
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow(),
+            "manifest": manifest_data,
+            "implementation": implementation_data,
+            "content_hash": hashlib.sha256(content.encode("utf-8")).hexdigest(),
+            "created_at": now,
+            "updated_at": now,
             "status": "active"
         }
-        await self.db.insert_tool(tool_data)
-    
-    async def _update_tool(self, manifest: ToolManifest, implementation: ToolImplementation) -> None:
-        """Update an existing tool in the database."""
-        tool_data = {
-            "manifest": manifest.dict(),
-            "implementation": implementation.dict(),
-            "updated_at": datetime.utcnow()
-        }
-        await self.db.update_tool(manifest.tool_id, tool_data)
     
     async def get_tool(self, tool_id: str) -> Optional[Dict[str, Any]]:
         """
         Get a tool by ID.
         
+        Tool data is a frozen snapshot shared by every caller; use
+        `app.db.frozen.thaw` for a mutable copy.
+        
         Args:
             tool_id: Tool ID
             
         Returns:
-            Tool data or None if not found
+            Frozen tool data or None if not found
         """
         # Check in-memory cache first
         if tool_id in self._tools:
@@ -98,7 +256,7 @@ class ToolRegistry:
         tool_data = await self.db.get_tool(tool_id)
         if tool_data:
             # Update cache
-            self._tools[tool_id] = tool_data
+            tool_data = self._tools[tool_id] = freeze(tool_data)
             return tool_data
         
         return None
@@ -113,7 +271,7 @@ class ToolRegistry:
         Returns:
             List of tools
         """
-        tools = await self.db.list_tools(filters or {})
+        tools = [freeze(tool) for tool in await self.db.list_tools(filters or {})]
         
         # Update cache
         for tool in tools:
@@ -121,6 +279,32 @@ class ToolRegistry:
         
         return tools
     
+    async def search_tools(
+        self,
+        query: Dict[str, List[str]],
+        mode: str = MODE_AND,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_SEARCH_LIMIT,
+        summary: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Search tools by category, tag, author, capability ID and status.
+        
+        Args:
+            query: Values to search for, keyed by field
+            mode: `and` to match tools having every value, `or` to match any
+            cursor: `next_cursor` of the previous page, or None for the first page
+            limit: Maximum number of tools per page
+            summary: Whether to return summaries instead of whole tools
+            
+        Returns:
+            Page with `items` and `next_cursor`
+            
+        Raises:
+            ValueError: If the query, mode, cursor or limit is invalid
+        """
+        return await self.db.search_tools(query, mode=mode, cursor=cursor, limit=limit, summary=summary)
+    
     async def delete_tool(self, tool_id: str) -> bool:
         """
         Delete a tool.
@@ -136,7 +320,10 @@ class ToolRegistry:
             del self._tools[tool_id]
         
         # Delete from database
-        return await self.db.delete_tool(tool_id)
+        deleted = await self.db.delete_tool(tool_id)
+        self._notify(tool_id)
+        
+        return deleted
     
     def validate_manifest(self, manifest: ToolManifest) -> ValidationResult:
         """
@@ -173,6 +360,12 @@ class ToolRegistry:
         for capability in manifest.capabilities:
             if not capability.parameters:
                 errors.append(f"Capability {capability.capability_id} must define parameters schema")
+            else:
+                schema_error = check_schema(capability.parameters)
+                if schema_error:
+                    errors.append(
+                        f"Capability {capability.capability_id} has an invalid parameters schema: {schema_error}"
+                    )
             if not capability.returns:
                 errors.append(f"Capability {capability.capability_id} must define returns schema")
         
@@ -187,7 +380,7 @@ class ToolRegistry:
         # Add warnings for best practices
         if not manifest.homepage:
             warnings.append("Tool homepage URL is recommended")
-        if not manifest.examples:
+        if not any(capability.examples for capability in manifest.capabilities):
             warnings.append("Usage examples are recommended")
         
         return ValidationResult(
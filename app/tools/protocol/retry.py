@@ -0,0 +1,156 @@
+"""
+Tool Integration Protocol - Retries
+
+This module provides the retry policy, retry budget and latency tracking used to
+retry and hedge calls to remote tools.
+"""
+
+import bisect
+import logging
+import random
+import time
+from collections import deque
+from typing import Deque, List, Optional
+
+from pydantic import BaseModel, Field
+
+logger = logging.getLogger(__name__)
+
+
+class RetryPolicy(BaseModel):
+    """Retry policy of a capability, set as `retry` in the capability metadata."""
+
+    max_attempts: int = Field(1, ge=1, description="Maximum attempts per call, including the first")
+    idempotent_methods: List[str] = Field(
+        default_factory=lambda: ["GET", "HEAD", "OPTIONS", "PUT", "DELETE"],
+        description="HTTP methods that may be retried after the request was sent"
+    )
+    retry_on_status: List[int] = Field(
+        default_factory=lambda: [502, 503, 504],
+        description="Response status codes that are retried"
+    )
+    backoff_base: float = Field(0.1, gt=0, description="Backoff before the first retry in seconds")
+    backoff_max: float = Field(2.0, gt=0, description="Maximum backoff in seconds")
+    hedge: bool = Field(False, description="Send a second GET request when the first is slow")
+    hedge_percentile: float = Field(0.95, gt=0, lt=1, description="Latency percentile after which to hedge")
+    hedge_min_delay: float = Field(0.01, ge=0, description="Minimum delay before hedging in seconds")
+
+    def is_idempotent(self, method: str) -> bool:
+        """Check whether requests with a method may be sent twice."""
+        return method.upper() in (m.upper() for m in self.idempotent_methods)
+
+    def backoff(self, retry: int) -> float:
+        """
+        Get the delay before a retry, with full jitter.
+
+        Args:
+            retry: Retry number, starting at 1
+
+        Returns:
+            Delay in seconds
+        """
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (retry - 1)))
+
+
+class RetryBudget:
+    """
+    Limits retries and hedges to a fraction of regular traffic.
+
+    Every request deposits `ratio` tokens and every retry or hedge withdraws one,
+    so a failing backend receives at most `1 + ratio` times its normal load. A
+    small reserve lets low-traffic tools retry at all.
+    """
+
+    def __init__(self, ratio: float = 0.1, reserve: float = 10.0, max_tokens: float = 100.0):
+        """
+        Initialize the retry budget.
+
+        Args:
+            ratio: Retries allowed per request
+            reserve: Tokens available before any traffic
+            max_tokens: Maximum number of tokens saved up
+        """
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = reserve
+
+        # Statistics
+        self.exhausted = 0
+
+    def deposit(self) -> None:
+        """Record a request."""
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        """
+        Take a token for a retry or hedge.
+
+        Returns:
+            True if the retry may proceed
+        """
+        if self.tokens < 1:
+            self.exhausted += 1
+            return False
+        self.tokens -= 1
+        return True
+
+
+class LatencyTracker:
+    """
+    Tracks recent latencies to estimate percentiles.
+    """
+
+    def __init__(self, size: int = 256, min_samples: int = 20):
+        """
+        Initialize the latency tracker.
+
+        Args:
+            size: Number of recent samples kept
+            min_samples: Samples required before percentiles are reported
+        """
+        self.size = size
+        self.min_samples = min_samples
+        self._samples: Deque[float] = deque()
+        self._sorted: List[float] = []
+
+    def record(self, latency: float) -> None:
+        """
+        Record a latency.
+
+        Args:
+            latency: Latency in seconds
+        """
+        if len(self._samples) >= self.size:
+            oldest = self._samples.popleft()
+            del self._sorted[bisect.bisect_left(self._sorted, oldest)]
+        self._samples.append(latency)
+        bisect.insort(self._sorted, latency)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """
+        Get a latency percentile.
+
+        Args:
+            p: Percentile between 0 and 1
+
+        Returns:
+            Latency in seconds, or None if there are too few samples
+        """
+        if len(self._sorted) < self.min_samples:
+            return None
+        return self._sorted[min(len(self._sorted) - 1, int(p * len(self._sorted)))]
+
+
+def remaining_time(deadline: Optional[float]) -> Optional[float]:
+    """
+    Get the time left before a deadline.
+
+    Args:
+        deadline: `time.monotonic()` deadline, or None
+
+    Returns:
+        Seconds left, or None without a deadline
+    """
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
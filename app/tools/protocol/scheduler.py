@@ -0,0 +1,351 @@
+"""
+Tool Integration Protocol - Execution Scheduler
+
+This module enforces the rate limits and concurrency limits declared in tool manifests.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from app.tools.protocol.adaptive import AdaptiveLimiter, GradientLimit
+from app.tools.protocol.errors import ToolQueueFullError, ToolQueueTimeoutError
+from app.tools.protocol.models import RateLimits
+
+logger = logging.getLogger(__name__)
+
+# Highest adaptive concurrency limit of tools that declare no `concurrent_requests`
+DEFAULT_MAX_CONCURRENCY = 1000
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter.
+
+    Tokens are handed out as reservations: a caller may borrow a token ahead of
+    time and is told how long to wait before using it. Waiters are therefore
+    served in arrival order without polling.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        Initialize the token bucket.
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum number of tokens held
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        """Add the tokens accrued since the last update."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def reserve(self, now: float) -> float:
+        """
+        Reserve a token.
+
+        Args:
+            now: Current monotonic time
+
+        Returns:
+            Seconds to wait before the reserved token may be used
+        """
+        self._refill(now)
+        self.tokens -= 1
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+
+    def refund(self) -> None:
+        """Return a reserved token that was not used."""
+        self.tokens = min(self.capacity, self.tokens + 1)
+
+
+class ToolScheduler:
+    """
+    Admission control for a single tool.
+
+    Calls first reserve a token from every rate limit bucket, then wait for a
+    concurrency slot. Time spent in both steps counts as queue time.
+
+    The concurrency limit adapts to the tool's latency, with the manifest's
+    `concurrent_requests` as its ceiling. Without adaptation, `concurrent_requests`
+    is a fixed limit and tools without one are not limited.
+    """
+
+    def __init__(
+        self,
+        tool_id: str,
+        rate_limits: Optional[RateLimits],
+        max_queue_depth: int,
+        queue_timeout: Optional[float],
+        adaptive: bool = True
+    ):
+        """
+        Initialize the tool scheduler.
+
+        Args:
+            tool_id: Tool ID
+            rate_limits: Rate limiting configuration from the tool manifest
+            max_queue_depth: Maximum number of calls waiting for admission
+            queue_timeout: Maximum time in seconds a call may wait for admission
+            adaptive: Whether the concurrency limit adapts to the tool's latency
+        """
+        self.tool_id = tool_id
+        self.rate_limits = rate_limits
+        self.max_queue_depth = max_queue_depth
+        self.queue_timeout = queue_timeout
+        self.buckets = self._build_buckets(rate_limits)
+
+        concurrent_requests = rate_limits.concurrent_requests if rate_limits else None
+        self.limiter = None
+        self.semaphore = None
+        if adaptive:
+            max_limit = concurrent_requests or DEFAULT_MAX_CONCURRENCY
+            self.limiter = AdaptiveLimiter(GradientLimit(max_limit=max_limit))
+        elif concurrent_requests:
+            self.semaphore = asyncio.Semaphore(concurrent_requests)
+
+        # Statistics
+        self.queued = 0
+        self.in_flight = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.queue_time_total = 0.0
+        self.queue_time_max = 0.0
+
+    @staticmethod
+    def _build_buckets(rate_limits: Optional[RateLimits]) -> List[TokenBucket]:
+        """
+        Build token buckets from rate limiting configuration.
+
+        Args:
+            rate_limits: Rate limiting configuration
+
+        Returns:
+            Token buckets, one per configured window
+        """
+        if not rate_limits:
+            return []
+
+        buckets = []
+        windows = [
+            (rate_limits.requests_per_minute, 60, rate_limits.burst),
+            (rate_limits.requests_per_hour, 3600, None),
+            (rate_limits.requests_per_day, 86400, None),
+        ]
+        for limit, period, burst in windows:
+            if not limit or limit <= 0:
+                continue
+            buckets.append(TokenBucket(rate=limit / period, capacity=burst or limit))
+
+        return buckets
+
+    async def acquire(self) -> float:
+        """
+        Wait until a call may be executed.
+
+        Returns:
+            Time spent waiting in seconds
+
+        Raises:
+            ToolQueueFullError: If too many calls are already waiting
+            ToolQueueTimeoutError: If admission would take longer than the queue timeout
+        """
+        if self.queued >= self.max_queue_depth:
+            self.rejected += 1
+            raise ToolQueueFullError(f"Execution queue full for tool: {self.tool_id}")
+
+        start = time.monotonic()
+        self.queued += 1
+        try:
+            await self._wait_for_tokens(start)
+            if self.limiter is not None or self.semaphore is not None:
+                await self._wait_for_slot(start)
+        finally:
+            self.queued -= 1
+
+        queue_time = time.monotonic() - start
+        self.in_flight += 1
+        self.admitted += 1
+        self.queue_time_total += queue_time
+        self.queue_time_max = max(self.queue_time_max, queue_time)
+
+        return queue_time
+
+    def release(self, rtt: Optional[float] = None, dropped: bool = False) -> None:
+        """
+        Release the concurrency slot held by a call.
+
+        Args:
+            rtt: Latency of the call in seconds, or None if it says nothing about
+                the tool's capacity, e.g. because the call failed or was cancelled
+            dropped: Whether the call ran out of time
+        """
+        self.in_flight -= 1
+        if self.limiter is not None:
+            self.limiter.release(rtt, dropped)
+        elif self.semaphore is not None:
+            self.semaphore.release()
+
+    def _remaining(self, start: float) -> Optional[float]:
+        """Get the time left before the queue timeout expires."""
+        if self.queue_timeout is None:
+            return None
+        return self.queue_timeout - (time.monotonic() - start)
+
+    async def _wait_for_tokens(self, start: float) -> None:
+        """Reserve a token from every bucket and wait until all are usable."""
+        if not self.buckets:
+            return
+
+        now = time.monotonic()
+        delay = max(bucket.reserve(now) for bucket in self.buckets)
+        if delay <= 0:
+            return
+
+        remaining = self._remaining(start)
+        if remaining is not None and delay > remaining:
+            self._refund()
+            self.timed_out += 1
+            raise ToolQueueTimeoutError(
+                f"Rate limit for tool {self.tool_id} would delay execution by {delay:.2f}s"
+            )
+
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self._refund()
+            raise
+
+    async def _wait_for_slot(self, start: float) -> None:
+        """Wait for a concurrency slot."""
+        slots = self.limiter if self.limiter is not None else self.semaphore
+        if not slots.locked():
+            await slots.acquire()
+            return
+
+        try:
+            if self.limiter is not None:
+                await self.limiter.acquire(timeout=self._remaining(start))
+            else:
+                await asyncio.wait_for(self.semaphore.acquire(), timeout=self._remaining(start))
+        except asyncio.TimeoutError:
+            self._refund()
+            self.timed_out += 1
+            raise ToolQueueTimeoutError(
+                f"Timed out waiting for a concurrency slot for tool: {self.tool_id}"
+            )
+        except asyncio.CancelledError:
+            self._refund()
+            raise
+
+    def _refund(self) -> None:
+        """Return reserved tokens to every bucket."""
+        for bucket in self.buckets:
+            bucket.refund()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get scheduler statistics.
+
+        Returns:
+            Scheduler statistics
+        """
+        return {
+            "queued": self.queued,
+            "in_flight": self.in_flight,
+            "concurrency_limit": self.get_concurrency_limit(),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "queue_time_total": self.queue_time_total,
+            "queue_time_avg": self.queue_time_total / self.admitted if self.admitted else 0.0,
+            "queue_time_max": self.queue_time_max,
+            "adaptive": self.limiter.get_stats() if self.limiter is not None else None,
+        }
+
+    def get_concurrency_limit(self) -> Optional[int]:
+        """
+        Get the current concurrency limit.
+
+        Returns:
+            Maximum number of calls in flight, or None if unlimited
+        """
+        if self.limiter is not None:
+            return self.limiter.limit.current
+        return self.rate_limits.concurrent_requests if self.rate_limits else None
+
+
+class ExecutionScheduler:
+    """
+    Execution Scheduler keeps one tool scheduler per tool.
+    """
+
+    def __init__(
+        self,
+        max_queue_depth: int = 100,
+        queue_timeout: Optional[float] = 30.0,
+        adaptive_concurrency: bool = True
+    ):
+        """
+        Initialize the Execution Scheduler.
+
+        Args:
+            max_queue_depth: Maximum number of calls waiting for admission per tool
+            queue_timeout: Maximum time in seconds a call may wait for admission
+            adaptive_concurrency: Whether concurrency limits adapt to each tool's latency
+        """
+        self.max_queue_depth = max_queue_depth
+        self.queue_timeout = queue_timeout
+        self.adaptive_concurrency = adaptive_concurrency
+        self._schedulers: Dict[str, ToolScheduler] = {}
+
+    def get_scheduler(self, tool_id: str, rate_limits: Optional[RateLimits]) -> ToolScheduler:
+        """
+        Get the scheduler for a tool, rebuilding it when its rate limits change.
+
+        Args:
+            tool_id: Tool ID
+            rate_limits: Rate limiting configuration from the tool manifest
+
+        Returns:
+            Tool scheduler
+        """
+        scheduler = self._schedulers.get(tool_id)
+        if scheduler is None or scheduler.rate_limits != rate_limits:
+            scheduler = ToolScheduler(
+                tool_id=tool_id,
+                rate_limits=rate_limits,
+                max_queue_depth=self.max_queue_depth,
+                queue_timeout=self.queue_timeout,
+                adaptive=self.adaptive_concurrency
+            )
+            self._schedulers[tool_id] = scheduler
+
+        return scheduler
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get statistics for every tool scheduler.
+
+        Returns:
+            Scheduler statistics keyed by tool ID
+        """
+        return {tool_id: scheduler.get_stats() for tool_id, scheduler in self._schedulers.items()}
+
+    def get_concurrency_limits(self) -> Dict[str, Optional[int]]:
+        """
+        Get the current concurrency limit of every tool.
+
+        Returns:
+            Concurrency limits keyed by tool ID; None means unlimited
+        """
+        return {tool_id: scheduler.get_concurrency_limit() for tool_id, scheduler in self._schedulers.items()}
@@ -0,0 +1,126 @@
+"""
+Tool Integration Protocol - Single Flight
+
+This module coalesces concurrent identical calls so that only one of them runs.
+"""
+
+import asyncio
+import functools
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    """A call shared by one or more waiters."""
+
+    __slots__ = ("task", "deadline", "waiters")
+
+    def __init__(self, task: "asyncio.Future[Any]", deadline: Optional[float]):
+        self.task = task
+        # Deadline the call runs under: the one of the waiter that started it
+        self.deadline = deadline
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time and shares its outcome with every waiter.
+
+    The shared call runs in its own task, under the deadline of the waiter that
+    started it. Cancelling a waiter only detaches that waiter; the call itself is
+    cancelled once no waiters are left. A waiter with a later deadline whose
+    shared call fails after the starter's deadline passed runs the call again on
+    its own, since the failure may only be due to the starter's shorter deadline.
+    """
+
+    def __init__(self):
+        """Initialize the single flight group."""
+        self._calls: Dict[Hashable, _Call] = {}
+
+        # Statistics
+        self.leaders = 0
+        self.followers = 0
+        self.retries = 0
+
+    async def do(
+        self,
+        key: Hashable,
+        func: Callable[[], Awaitable[Any]],
+        deadline: Optional[float] = None
+    ) -> Tuple[Any, bool]:
+        """
+        Run a call, or join the identical call already in flight.
+
+        Args:
+            key: Key identifying identical calls
+            func: Function starting the call
+            deadline: `time.monotonic()` timestamp by which the caller needs the
+                result, or None for no deadline
+
+        Returns:
+            Tuple of the call result and whether it was shared with an earlier caller
+        """
+        call = self._calls.get(key)
+        shared = call is not None
+        if call is None:
+            call = _Call(asyncio.ensure_future(func()), deadline)
+            call.task.add_done_callback(functools.partial(self._on_done, key, call))
+            self._calls[key] = call
+            self.leaders += 1
+        else:
+            self.followers += 1
+
+        call.waiters += 1
+        try:
+            result = await asyncio.shield(call.task)
+        except Exception:
+            if not (shared and self._outlived(call, deadline)):
+                raise
+            # The shared call ran out of its starter's time, which is shorter than ours
+            self.retries += 1
+            logger.debug(f"Retrying call {key!r} after its shared call's deadline passed")
+            return await func(), False
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Nobody is interested anymore; later callers must start afresh
+                self._forget(key, call)
+                call.task.cancel()
+
+        return result, shared
+
+    @staticmethod
+    def _outlived(call: _Call, deadline: Optional[float]) -> bool:
+        """Check whether a waiter still has time after the shared call's deadline passed."""
+        if call.deadline is None or time.monotonic() < call.deadline:
+            return False
+        return deadline is None or deadline > call.deadline
+
+    def _forget(self, key: Hashable, call: _Call) -> None:
+        """Stop routing new callers to a call."""
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def _on_done(self, key: Hashable, call: _Call, task: "asyncio.Future[Any]") -> None:
+        """Clean up after a call completes."""
+        self._forget(key, call)
+        if not task.cancelled():
+            # Mark the exception as retrieved even if every waiter went away
+            task.exception()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get single flight statistics.
+
+        Returns:
+            Single flight statistics
+        """
+        return {
+            "in_flight": len(self._calls),
+            "leaders": self.leaders,
+            "followers": self.followers,
+            "retries": self.retries,
+        }
@@ -0,0 +1,483 @@
+"""
+Tool Integration Protocol - Parameter Validation
+
+This module validates call parameters against capability parameter schemas. Schemas
+are compiled once into plain Python checks; schemas using JSON Schema features the
+compiler does not cover are validated with `jsonschema` instead.
+"""
+
+import logging
+import re
+import reprlib
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from jsonschema import SchemaError
+from jsonschema.validators import validator_for
+
+from app.tools.protocol.errors import ToolValidationError
+from app.tools.protocol.models import Capability, ToolManifest
+
+logger = logging.getLogger(__name__)
+
+# Location of a value: None for the parameters themselves, else (parent path, key or index)
+Path = Optional[Tuple[Any, Any]]
+
+# Appends the errors of a value at a path to a list
+Check = Callable[[Any, Path, List[str]], None]
+
+_TYPE_CHECKS: Dict[str, Callable[[Any], bool]] = {
+    "object": lambda value: isinstance(value, dict),
+    "array": lambda value: isinstance(value, list),
+    "string": lambda value: isinstance(value, str),
+    "boolean": lambda value: isinstance(value, bool),
+    "null": lambda value: value is None,
+    "integer": lambda value: (
+        (isinstance(value, int) and not isinstance(value, bool))
+        or (isinstance(value, float) and value.is_integer())
+    ),
+    "number": lambda value: isinstance(value, (int, float)) and not isinstance(value, bool),
+}
+
+# Keywords without effect on validation
+_ANNOTATIONS = frozenset({
+    "$schema", "$id", "$comment", "title", "description", "default", "examples",
+    "format", "readOnly", "writeOnly", "deprecated",
+})
+
+# Keywords the compiler implements
+_COMPILED_KEYWORDS = frozenset({
+    "type", "properties", "required", "additionalProperties", "items", "enum", "const",
+    "minimum", "maximum", "exclusiveMinimum", "exclusiveMaximum", "minLength", "maxLength",
+    "pattern", "minItems", "maxItems",
+}) | _ANNOTATIONS
+
+_describe = reprlib.Repr()
+_describe.maxstring = 40
+_describe.maxother = 40
+
+
+def _format_path(path: Path) -> str:
+    """Format the location of a value, e.g. `parameters.items[0]`."""
+    parts = []
+    while path is not None:
+        path, key = path
+        parts.append(f"[{key}]" if isinstance(key, int) else f".{key}")
+    return "parameters" + "".join(reversed(parts))
+
+
+def _is_number(value: Any) -> bool:
+    """Check whether a value is a JSON number."""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _equal(a: Any, b: Any) -> bool:
+    """Compare JSON values, telling booleans apart from numbers."""
+    if isinstance(a, bool) or isinstance(b, bool):
+        return isinstance(a, bool) and isinstance(b, bool) and a == b
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_equal(a[key], b[key]) for key in a)
+    if isinstance(a, list) and isinstance(b, list):
+        return len(a) == len(b) and all(_equal(x, y) for x, y in zip(a, b))
+    return a == b
+
+
+def _is_compilable(schema: Any) -> bool:
+    """Check whether the compiler covers every keyword of a schema and its subschemas."""
+    if isinstance(schema, bool):
+        return True
+    if not isinstance(schema, dict) or not _COMPILED_KEYWORDS.issuperset(schema):
+        return False
+
+    # Older drafts give `integer` and `exclusiveMinimum` different meanings
+    if "draft-03" in str(schema.get("$schema", "")) or "draft-04" in str(schema.get("$schema", "")):
+        return False
+
+    types = schema.get("type")
+    if types is not None:
+        names = [types] if isinstance(types, str) else types
+        if not isinstance(names, list) or not all(name in _TYPE_CHECKS for name in names):
+            return False
+
+    for keyword in ("exclusiveMinimum", "exclusiveMaximum", "minimum", "maximum"):
+        if keyword in schema and not _is_number(schema[keyword]):
+            return False
+
+    properties = schema.get("properties", {})
+    if not isinstance(properties, dict):
+        return False
+    subschemas = list(properties.values())
+    for keyword in ("additionalProperties", "items"):
+        if keyword in schema:
+            subschemas.append(schema[keyword])
+
+    return all(_is_compilable(subschema) for subschema in subschemas)
+
+
+def _compile(schema: Any) -> Optional[Check]:
+    """
+    Compile a schema the compiler covers into a check.
+
+    Args:
+        schema: JSON schema
+
+    Returns:
+        Check, or None if the schema accepts every value
+    """
+    if schema is True:
+        return None
+    if schema is False:
+        def reject(value: Any, path: Path, errors: List[str]) -> None:
+            errors.append(f"{_format_path(path)}: no value is allowed")
+        return reject
+
+    checks: List[Check] = []
+
+    types = schema.get("type")
+    if types is not None:
+        names = [types] if isinstance(types, str) else types
+        type_checks = [_TYPE_CHECKS[name] for name in names]
+        expected = " or ".join(names)
+
+        if len(type_checks) == 1:
+            type_check = type_checks[0]
+
+            def check_type(value: Any, path: Path, errors: List[str]) -> None:
+                if not type_check(value):
+                    errors.append(f"{_format_path(path)}: {_describe.repr(value)} is not of type {expected}")
+        else:
+            def check_type(value: Any, path: Path, errors: List[str]) -> None:
+                for type_check in type_checks:
+                    if type_check(value):
+                        return
+                errors.append(f"{_format_path(path)}: {_describe.repr(value)} is not of type {expected}")
+        checks.append(check_type)
+
+    checks.extend(_compile_object(schema))
+    checks.extend(_compile_array(schema))
+    checks.extend(_compile_string(schema))
+    checks.extend(_compile_number(schema))
+
+    if "enum" in schema:
+        options = schema["enum"]
+        strings = frozenset(option for option in options if isinstance(option, str))
+
+        def check_enum(value: Any, path: Path, errors: List[str]) -> None:
+            if value.__class__ is str and value in strings:
+                return
+            if not any(_equal(value, option) for option in options):
+                errors.append(
+                    f"{_format_path(path)}: {_describe.repr(value)} is not one of {_describe.repr(options)}"
+                )
+        checks.append(check_enum)
+
+    if "const" in schema:
+        constant = schema["const"]
+
+        def check_const(value: Any, path: Path, errors: List[str]) -> None:
+            if not _equal(value, constant):
+                errors.append(f"{_format_path(path)}: {_describe.repr(constant)} was expected")
+        checks.append(check_const)
+
+    if not checks:
+        return None
+    if len(checks) == 1:
+        return checks[0]
+
+    def check_all(value: Any, path: Path, errors: List[str]) -> None:
+        for check in checks:
+            check(value, path, errors)
+    return check_all
+
+
+def _compile_object(schema: Dict[str, Any]) -> List[Check]:
+    """Compile the object keywords of a schema."""
+    checks: List[Check] = []
+
+    required = schema.get("required", [])
+    if required:
+        def check_required(value: Any, path: Path, errors: List[str]) -> None:
+            if isinstance(value, dict):
+                for name in required:
+                    if name not in value:
+                        errors.append(f"{_format_path(path)}: {name!r} is a required property")
+        checks.append(check_required)
+
+    declared = schema.get("properties", {})
+    properties: List[Tuple[str, Check]] = [
+        (name, check) for name, check in ((name, _compile(sub)) for name, sub in declared.items())
+        if check is not None
+    ]
+    if properties:
+        def check_properties(value: Any, path: Path, errors: List[str]) -> None:
+            if isinstance(value, dict):
+                for name, check in properties:
+                    if name in value:
+                        check(value[name], (path, name), errors)
+        checks.append(check_properties)
+
+    additional = schema.get("additionalProperties", True)
+    if additional is False:
+        def check_no_additional(value: Any, path: Path, errors: List[str]) -> None:
+            if isinstance(value, dict):
+                extra = [name for name in value if name not in declared]
+                if extra:
+                    errors.append(f"{_format_path(path)}: additional properties are not allowed ({', '.join(map(str, extra))})")
+        checks.append(check_no_additional)
+    elif additional is not True:
+        additional_check = _compile(additional)
+        if additional_check is not None:
+            def check_additional(value: Any, path: Path, errors: List[str]) -> None:
+                if isinstance(value, dict):
+                    for name, item in value.items():
+                        if name not in declared:
+                            additional_check(item, (path, name), errors)
+            checks.append(check_additional)
+
+    return checks
+
+
+def _compile_array(schema: Dict[str, Any]) -> List[Check]:
+    """Compile the array keywords of a schema."""
+    checks: List[Check] = []
+
+    items = _compile(schema["items"]) if "items" in schema else None
+    if items is not None:
+        def check_items(value: Any, path: Path, errors: List[str]) -> None:
+            if isinstance(value, list):
+                for index, item in enumerate(value):
+                    items(item, (path, index), errors)
+        checks.append(check_items)
+
+    min_items = schema.get("minItems")
+    max_items = schema.get("maxItems")
+    if min_items is not None or max_items is not None:
+        def check_length(value: Any, path: Path, errors: List[str]) -> None:
+            if isinstance(value, list):
+                if min_items is not None and len(value) < min_items:
+                    errors.append(f"{_format_path(path)}: expected at least {min_items} items")
+                if max_items is not None and len(value) > max_items:
+                    errors.append(f"{_format_path(path)}: expected at most {max_items} items")
+        checks.append(check_length)
+
+    return checks
+
+
+def _compile_string(schema: Dict[str, Any]) -> List[Check]:
+    """Compile the string keywords of a schema."""
+    checks: List[Check] = []
+
+    min_length = schema.get("minLength")
+    max_length = schema.get("maxLength")
+    if min_length is not None or max_length is not None:
+        def check_length(value: Any, path: Path, errors: List[str]) -> None:
+            if isinstance(value, str):
+                if min_length is not None and len(value) < min_length:
+                    errors.append(f"{_format_path(path)}: {_describe.repr(value)} is shorter than {min_length} characters")
+                if max_length is not None and len(value) > max_length:
+                    errors.append(f"{_format_path(path)}: {_describe.repr(value)} is longer than {max_length} characters")
+        checks.append(check_length)
+
+    if "pattern" in schema:
+        pattern = re.compile(schema["pattern"])
+
+        def check_pattern(value: Any, path: Path, errors: List[str]) -> None:
+            if isinstance(value, str) and not pattern.search(value):
+                errors.append(f"{_format_path(path)}: {_describe.repr(value)} does not match {pattern.pattern!r}")
+        checks.append(check_pattern)
+
+    return checks
+
+
+def _compile_number(schema: Dict[str, Any]) -> List[Check]:
+    """Compile the numeric keywords of a schema."""
+    bounds = [
+        (schema[keyword], compare, message)
+        for keyword, compare, message in (
+            ("minimum", lambda value, bound: value >= bound, "less than"),
+            ("maximum", lambda value, bound: value <= bound, "greater than"),
+            ("exclusiveMinimum", lambda value, bound: value > bound, "less than or equal to"),
+            ("exclusiveMaximum", lambda value, bound: value < bound, "greater than or equal to"),
+        )
+        if keyword in schema
+    ]
+    if not bounds:
+        return []
+
+    def check_bounds(value: Any, path: Path, errors: List[str]) -> None:
+        if _is_number(value):
+            for bound, compare, message in bounds:
+                if not compare(value, bound):
+                    errors.append(f"{_format_path(path)}: {value} is {message} {bound}")
+    return [check_bounds]
+
+
+def check_schema(schema: Dict[str, Any]) -> Optional[str]:
+    """
+    Check that a parameters schema is a valid JSON schema.
+
+    Args:
+        schema: JSON schema
+
+    Returns:
+        Error message, or None if the schema is valid
+    """
+    try:
+        validator_for(schema).check_schema(schema)
+    except SchemaError as e:
+        return e.message
+    return None
+
+
+class ParameterValidator:
+    """
+    Validator compiled from a capability's parameters schema.
+    """
+
+    def __init__(self, schema: Dict[str, Any]):
+        """
+        Compile a validator.
+
+        Args:
+            schema: JSON schema
+
+        Raises:
+            SchemaError: If the schema is invalid
+        """
+        validator_class = validator_for(schema)
+        validator_class.check_schema(schema)
+
+        self.compiled = _is_compilable(schema)
+        if self.compiled:
+            self._check = _compile(schema)
+        else:
+            self._validator = validator_class(schema)
+
+    def validate(self, parameters: Dict[str, Any]) -> List[str]:
+        """
+        Validate parameters.
+
+        Args:
+            parameters: Input parameters
+
+        Returns:
+            Error messages, empty if the parameters are valid
+        """
+        if self.compiled:
+            errors: List[str] = []
+            if self._check is not None:
+                self._check(parameters, None, errors)
+            return errors
+
+        if self._validator.is_valid(parameters):
+            return []
+        return [
+            f"parameters{''.join(f'[{p}]' if isinstance(p, int) else f'.{p}' for p in error.absolute_path)}: "
+            f"{error.message}"
+            for error in self._validator.iter_errors(parameters)
+        ]
+
+
+class ValidatorCache:
+    """
+    Compiled parameter validators keyed by tool, version and capability.
+    """
+
+    def __init__(self):
+        """Initialize the validator cache."""
+        # None marks capabilities whose schema could not be compiled
+        self._validators: Dict[Tuple[str, str, str], Optional[ParameterValidator]] = {}
+
+        # Statistics
+        self.validations = 0
+        self.failures = 0
+
+    def compile_manifest(self, manifest: ToolManifest) -> None:
+        """
+        Compile the validators of every capability of a tool.
+
+        Args:
+            manifest: Tool manifest
+        """
+        for capability in manifest.capabilities:
+            self.get_validator(manifest, capability)
+
+    def get_validator(self, manifest: ToolManifest, capability: Capability) -> Optional[ParameterValidator]:
+        """
+        Get the validator of a capability, compiling it on first use.
+
+        Args:
+            manifest: Tool manifest
+            capability: Capability
+
+        Returns:
+            Validator, or None if the capability's schema is invalid
+        """
+        key = (manifest.tool_id, manifest.version, capability.capability_id)
+        try:
+            return self._validators[key]
+        except KeyError:
+            pass
+
+        try:
+            validator = ParameterValidator(capability.parameters)
+        except SchemaError as e:
+            # Tools registered before schemas were checked keep working, unvalidated
+            logger.warning(
+                f"Not validating parameters of capability {capability.capability_id} "
+                f"of tool {manifest.tool_id}: invalid schema: {e.message}"
+            )
+            validator = None
+
+        self._validators[key] = validator
+        return validator
+
+    def validate(self, manifest: ToolManifest, capability: Capability, parameters: Dict[str, Any]) -> None:
+        """
+        Validate call parameters.
+
+        Args:
+            manifest: Tool manifest
+            capability: Capability
+            parameters: Input parameters
+
+        Raises:
+            ToolValidationError: If the parameters do not match the capability's schema
+        """
+        validator = self.get_validator(manifest, capability)
+        if validator is None:
+            return
+
+        self.validations += 1
+        errors = validator.validate(parameters)
+        if errors:
+            self.failures += 1
+            raise ToolValidationError(
+                f"Invalid parameters for capability {capability.capability_id} of tool {manifest.tool_id}",
+                errors
+            )
+
+    def invalidate_tool(self, tool_id: str) -> None:
+        """
+        Drop the validators of a tool.
+
+        Args:
+            tool_id: Tool ID
+        """
+        for key in [key for key in self._validators if key[0] == tool_id]:
+            del self._validators[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get validation statistics.
+
+        Returns:
+            Validation statistics
+        """
+        compiled = [validator for validator in self._validators.values() if validator is not None]
+        return {
+            "validators": len(compiled),
+            "fallback_validators": sum(1 for validator in compiled if not validator.compiled),
+            "invalid_schemas": len(self._validators) - len(compiled),
+            "validations": self.validations,
+            "failures": self.failures,
+        }
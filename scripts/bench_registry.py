@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+"""
+Benchmark tool record reads on the execute path.
+
+Measures the per-call cost of `ToolExecutor.execute` for a tool with a large
+manifest, with the tool stored in the frozen `MemoryDatabase` and in a database
+that deep-copies every read (as `MemoryDatabase` used to). Calls either hit the
+registry cache or find it empty, as after the catalog changed.
+
+Usage:
+    python scripts/bench_registry.py [--number N] [--capabilities N]
+"""
+
+import argparse
+import asyncio
+import copy
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.db.frozen import FrozenDict, thaw  # noqa: E402
+from app.db.memory import MemoryDatabase  # noqa: E402
+from app.tools.protocol.adapters.base import ToolAdapter  # noqa: E402
+from app.tools.protocol.execution_log import ExecutionLogSink  # noqa: E402
+from app.tools.protocol.executor import ToolExecutor  # noqa: E402
+from app.tools.protocol.models import ToolImplementation, ToolManifest, ValidationResult  # noqa: E402
+from app.tools.protocol.registry import ToolRegistry  # noqa: E402
+
+
+class CopyingDatabase(MemoryDatabase):
+    """Memory database that keeps plain dicts and returns a deep copy on every read."""
+
+    def __init__(self):
+        super().__init__()
+        self.plain: Dict[str, Dict[str, Any]] = {}
+
+    def _store(self, tool_id: str, tool_data: FrozenDict) -> None:
+        super()._store(tool_id, tool_data)
+        self.plain[tool_id] = thaw(tool_data)
+
+    async def get_tool(self, tool_id: str) -> Optional[Dict[str, Any]]:
+        return copy.deepcopy(self.plain.get(tool_id))
+
+
+class EchoAdapter(ToolAdapter):
+    """Adapter that returns immediately."""
+
+    async def initialize(self, config: Dict[str, Any]) -> bool:
+        return True
+
+    async def validate(self) -> ValidationResult:
+        return ValidationResult(is_valid=True)
+
+    async def execute(
+        self,
+        capability_id: str,
+        parameters: Dict[str, Any],
+        context: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        return parameters
+
+    async def shutdown(self) -> None:
+        pass
+
+
+def make_manifest(capabilities: int) -> ToolManifest:
+    """Build a manifest with many capabilities and detailed schemas."""
+    return ToolManifest(
+        tool_id="large",
+        name="Large",
+        version="1.0.0",
+        description="Tool with a large manifest",
+        author="Benchmarks",
+        license="MIT",
+        categories=["benchmark"],
+        capabilities=[
+            {
+                "capability_id": f"capability-{index}",
+                "name": f"Capability {index}",
+                "description": "Capability with a detailed schema " * 4,
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        f"field_{field}": {"type": "string", "description": "A field", "maxLength": 100}
+                        for field in range(20)
+                    },
+                },
+                "returns": {"type": "object"},
+                "metadata": {"endpoint": f"/capability/{index}", "method": "POST"},
+            }
+            for index in range(capabilities)
+        ],
+        authentication={"type": "none", "required": False},
+        platform_requirements={"min_lyraios_version": "0.1.0"},
+    )
+
+
+async def measure(db: MemoryDatabase, manifest: ToolManifest, number: int, cached: bool) -> float:
+    """Get the average time of an execute call in seconds."""
+    registry = ToolRegistry(db)
+    await registry.register(manifest, ToolImplementation(implementation_type="echo", config={}))
+    executor = ToolExecutor(registry, execution_log=ExecutionLogSink(":memory:"), validate_parameters=False)
+    executor.adapter_classes["echo"] = EchoAdapter
+    capability_id = manifest.capabilities[-1].capability_id
+    await executor.execute("large", capability_id, {"field_0": "value"}, {})
+
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(number):
+            if not cached:
+                registry._tools.clear()
+            await executor.execute("large", capability_id, {"field_0": "value"}, {})
+        best = min(best, (time.perf_counter() - start) / number)
+    await executor.shutdown()
+    return best
+
+
+async def bench(number: int, capabilities: int) -> None:
+    """Print the execute cost per call for every database and cache state."""
+    manifest = make_manifest(capabilities)
+    print(f"{'registry cache':<16} {'deep copy':>12} {'frozen':>12}")
+    for cached in (True, False):
+        copying = await measure(CopyingDatabase(), manifest, number, cached)
+        frozen = await measure(MemoryDatabase(), manifest, number, cached)
+        label = "hit" if cached else "miss"
+        print(f"{label:<16} {copying * 1e6:>10.1f}us {frozen * 1e6:>10.1f}us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=200, help="Calls per measurement")
+    parser.add_argument("--capabilities", type=int, default=200, help="Capabilities in the manifest")
+    args = parser.parse_args()
+    asyncio.run(bench(args.number, args.capabilities))
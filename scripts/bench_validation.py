@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+"""
+Benchmark parameter validation.
+
+Compares the compiled validators of the Tool Execution Environment with plain
+`jsonschema` validation, per call, for typical capability schemas.
+
+Usage:
+    python scripts/bench_validation.py [--number N]
+"""
+
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+from jsonschema.validators import validator_for
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.tools.protocol.validation import ParameterValidator  # noqa: E402
+
+SCHEMAS = {
+    "flat": (
+        {
+            "type": "object",
+            "properties": {
+                "query": {"type": "string", "minLength": 1},
+                "limit": {"type": "integer", "minimum": 1, "maximum": 100},
+                "language": {"enum": ["en", "de", "fr"]},
+            },
+            "required": ["query"],
+        },
+        {"query": "weather in berlin", "limit": 10, "language": "en"},
+    ),
+    "nested": (
+        {
+            "type": "object",
+            "properties": {
+                "user": {
+                    "type": "object",
+                    "properties": {
+                        "id": {"type": "string", "pattern": "^[a-f0-9]{8}$"},
+                        "roles": {"type": "array", "items": {"type": "string"}, "maxItems": 5},
+                    },
+                    "required": ["id"],
+                },
+                "amount": {"type": "number", "exclusiveMinimum": 0},
+                "dry_run": {"type": "boolean"},
+            },
+            "required": ["user", "amount"],
+            "additionalProperties": False,
+        },
+        {"user": {"id": "deadbeef", "roles": ["admin", "billing"]}, "amount": 12.5, "dry_run": True},
+    ),
+}
+
+
+def bench(number: int) -> None:
+    """Print the validation cost per call for every schema."""
+    print(f"{'schema':<10} {'compiled':>12} {'jsonschema':>12}")
+    for name, (schema, parameters) in SCHEMAS.items():
+        compiled = ParameterValidator(schema)
+        assert compiled.compiled and compiled.validate(parameters) == []
+        reference = validator_for(schema)(schema)
+
+        compiled_time = min(timeit.repeat(lambda: compiled.validate(parameters), number=number, repeat=5))
+        reference_time = min(timeit.repeat(lambda: reference.is_valid(parameters), number=number, repeat=5))
+        print(f"{name:<10} {compiled_time / number * 1e6:>10.2f}us {reference_time / number * 1e6:>10.2f}us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=20000, help="Calls per measurement")
+    bench(parser.parse_args().number)
@@ -0,0 +1,818 @@
+"""Tests for the Tool Integration Protocol adapters"""
+
+import asyncio
+import functools
+import json
+import os
+import textwrap
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+import pytest
+
+from app.tools.protocol.adapters import http_pool, rest_api
+from app.tools.protocol.adapters.python_plugin import PythonPluginAdapter
+from app.tools.protocol.adapters.rest_api import RestApiAdapter
+from app.tools.protocol.errors import ToolRequestError, ToolTimeoutError
+from app.tools.protocol.models import ToolManifest
+
+PLUGIN_SOURCE = textwrap.dedent('''
+    import os
+    import threading
+    import time
+
+    initialized = False
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def initialize():
+        global initialized
+        initialized = True
+
+    def worker(parameters, context):
+        return {"pid": os.getpid(), "initialized": initialized}
+
+    def blocking(parameters, context):
+        time.sleep(parameters.get("delay", 0.05))
+        return {"ok": True}
+
+    def serial(parameters, context):
+        time.sleep(parameters.get("delay", 0.05))
+        return {"ok": True}
+
+    def tracked(parameters, context):
+        global running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(parameters.get("delay", 0.05))
+        with lock:
+            running -= 1
+        return {"peak": peak}
+
+    def inline(parameters, context):
+        if "fail" in parameters:
+            raise ValueError(parameters["fail"])
+        return parameters.get("value")
+
+    async def coroutine(parameters, context):
+        return {"value": parameters.get("value")}
+
+    def countdown(parameters, context):
+        for value in range(parameters["start"], 0, -1):
+            yield value
+
+    async def tokens(parameters, context):
+        for token in parameters["text"].split():
+            yield {"token": token}
+''')
+
+
+def make_plugin_manifest(
+    capabilities: List[Dict[str, Any]],
+    tool_id: str = "plugin",
+    authentication: Optional[Dict[str, Any]] = None
+) -> ToolManifest:
+    """Build a manifest for a Python plugin."""
+    return ToolManifest(
+        tool_id=tool_id,
+        name="Plugin",
+        version="1.0.0",
+        description="Test plugin",
+        author="Tests",
+        license="MIT",
+        capabilities=[
+            {
+                "capability_id": capability["capability_id"],
+                "name": capability["capability_id"],
+                "description": capability["capability_id"],
+                "parameters": {"type": "object"},
+                "returns": {"type": "object"},
+                "metadata": capability.get("metadata", {}),
+            }
+            for capability in capabilities
+        ],
+        authentication=authentication or {"type": "none", "required": False},
+        platform_requirements={"min_lyraios_version": "0.1.0"},
+    )
+
+
+async def make_rest_adapter(
+    monkeypatch,
+    handler: Callable[[httpx.Request], Any],
+    capabilities: List[Dict[str, Any]],
+    base_url: str = "http://backend.test",
+    tool_id: str = "rest",
+    config: Optional[Dict[str, Any]] = None,
+    authentication: Optional[Dict[str, Any]] = None
+) -> RestApiAdapter:
+    """Initialize a REST adapter whose requests are answered by a handler."""
+    async def respond(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/":
+            return httpx.Response(200)
+        response = handler(request)
+        if not isinstance(response, httpx.Response):
+            response = await response
+        return response
+
+    monkeypatch.setattr(
+        http_pool.httpx,
+        "AsyncClient",
+        functools.partial(httpx.AsyncClient, transport=httpx.MockTransport(respond))
+    )
+    monkeypatch.setattr(http_pool, "_shared_pool", http_pool.HttpClientPool())
+    adapter = RestApiAdapter(make_plugin_manifest(capabilities, tool_id=tool_id, authentication=authentication))
+    assert await adapter.initialize({"base_url": base_url, **(config or {})})
+    return adapter
+
+
+async def make_plugin_adapter(
+    tmp_path,
+    capabilities: List[Dict[str, Any]],
+    config: Optional[Dict[str, Any]] = None
+) -> PythonPluginAdapter:
+    """Write the test plugin and initialize an adapter for it."""
+    plugin_path = tmp_path / "test_plugin.py"
+    plugin_path.write_text(PLUGIN_SOURCE)
+
+    adapter = PythonPluginAdapter(make_plugin_manifest(capabilities))
+    assert await adapter.initialize({
+        "plugin_path": str(plugin_path),
+        "sandbox_enabled": False,
+        **(config or {}),
+    })
+    return adapter
+
+
+@pytest.mark.asyncio
+async def test_blocking_plugin_does_not_stall_event_loop(tmp_path):
+    adapter = await make_plugin_adapter(
+        tmp_path,
+        [{"capability_id": "blocking", "metadata": {"concurrency": "thread_safe"}}],
+        {"thread_pool": "dedicated", "max_workers": 4}
+    )
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.005)
+            ticks += 1
+
+    ticker_task = asyncio.ensure_future(ticker())
+    start = time.monotonic()
+    await asyncio.gather(*[adapter.execute("blocking", {"delay": 0.1}, {}) for _ in range(4)])
+    elapsed = time.monotonic() - start
+    ticker_task.cancel()
+    await adapter.shutdown()
+
+    assert elapsed < 0.3
+    assert ticks > 5
+
+
+@pytest.mark.asyncio
+async def test_serial_capabilities_run_one_at_a_time(tmp_path):
+    adapter = await make_plugin_adapter(
+        tmp_path,
+        [{"capability_id": "serial"}],
+        {"thread_pool": "dedicated", "max_workers": 4}
+    )
+
+    start = time.monotonic()
+    await asyncio.gather(*[adapter.execute("serial", {"delay": 0.05}, {}) for _ in range(3)])
+    elapsed = time.monotonic() - start
+
+    assert elapsed >= 0.15
+    metrics = adapter.get_metrics()
+    assert metrics["thread_pool"]["completed"] == 3
+    assert metrics["thread_pool"]["queued"] == 0
+    assert metrics["serial_waiting"] == 0
+    await adapter.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_serial_call_keeps_the_lock_until_a_cancelled_function_returns(tmp_path):
+    adapter = await make_plugin_adapter(
+        tmp_path,
+        [{"capability_id": "tracked"}],
+        {"thread_pool": "dedicated", "max_workers": 4}
+    )
+
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(adapter.execute("tracked", {"delay": 0.2}, {}), timeout=0.05)
+    result = await adapter.execute("tracked", {"delay": 0.01}, {})
+
+    assert result == {"peak": 1}
+    await adapter.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_async_capabilities_run_on_event_loop(tmp_path):
+    adapter = await make_plugin_adapter(
+        tmp_path,
+        [
+            {"capability_id": "inline", "metadata": {"concurrency": "async"}},
+            {"capability_id": "coroutine"},
+        ]
+    )
+
+    assert await adapter.execute("inline", {"value": 3}, {}) == {"result": 3}
+    assert await adapter.execute("coroutine", {"value": 3}, {}) == {"value": 3}
+    await adapter.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_invalid_concurrency_mode_fails_validation(tmp_path):
+    adapter = await make_plugin_adapter(
+        tmp_path,
+        [{"capability_id": "blocking", "metadata": {"concurrency": "parallel"}}]
+    )
+
+    validation = await adapter.validate()
+
+    assert not validation.is_valid
+    await adapter.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_process_mode_runs_plugin_in_recycled_workers(tmp_path):
+    adapter = await make_plugin_adapter(
+        tmp_path,
+        [{"capability_id": "worker"}, {"capability_id": "inline"}],
+        {"execution_mode": "process", "processes": 1, "max_calls_per_worker": 2}
+    )
+
+    results = [await adapter.execute("worker", {}, {}) for _ in range(3)]
+    metrics = adapter.get_metrics()
+    await adapter.shutdown()
+
+    assert all(result["initialized"] for result in results)
+    assert all(result["pid"] != os.getpid() for result in results)
+    assert results[0]["pid"] == results[1]["pid"] != results[2]["pid"]
+    assert metrics["process_pool"]["calls"] == 3
+    assert metrics["process_pool"]["recycled"] == 1
+
+
+@pytest.mark.asyncio
+async def test_process_mode_reports_plugin_errors(tmp_path):
+    adapter = await make_plugin_adapter(
+        tmp_path,
+        [{"capability_id": "inline"}],
+        {"execution_mode": "process", "processes": 1}
+    )
+
+    with pytest.raises(RuntimeError, match="boom"):
+        await adapter.execute("inline", {"value": "x", "fail": "boom"}, {})
+    assert await adapter.execute("inline", {"value": 3}, {}) == {"result": 3}
+    await adapter.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_process_mode_serves_calls_after_a_hung_call_is_cancelled(tmp_path):
+    adapter = await make_plugin_adapter(
+        tmp_path,
+        [{"capability_id": "worker"}, {"capability_id": "blocking"}],
+        {"execution_mode": "process", "processes": 1}
+    )
+    first = await adapter.execute("worker", {}, {})
+
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(adapter.execute("blocking", {"delay": 30}, {}), 0.2)
+    second = await asyncio.wait_for(adapter.execute("worker", {}, {}), 10)
+    await adapter.shutdown()
+
+    assert second["pid"] != first["pid"]
+
+
+@pytest.mark.asyncio
+async def test_process_mode_waits_for_an_idle_worker_until_the_deadline(tmp_path):
+    adapter = await make_plugin_adapter(
+        tmp_path,
+        [{"capability_id": "worker"}, {"capability_id": "blocking"}],
+        {"execution_mode": "process", "processes": 1}
+    )
+    busy = asyncio.ensure_future(adapter.execute("blocking", {"delay": 1}, {}))
+    await asyncio.sleep(0.1)
+
+    start = time.monotonic()
+    with pytest.raises(ToolTimeoutError):
+        await adapter.execute("worker", {}, {"deadline": time.monotonic() + 0.2})
+    assert time.monotonic() - start < 0.8
+    assert await busy == {"ok": True}
+    await adapter.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_process_mode_keeps_workers_after_unpicklable_requests(tmp_path):
+    adapter = await make_plugin_adapter(
+        tmp_path,
+        [{"capability_id": "worker"}],
+        {"execution_mode": "process", "processes": 1}
+    )
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            await adapter.execute("worker", {}, {"lock": threading.Lock()})
+    result = await asyncio.wait_for(adapter.execute("worker", {}, {}), 10)
+    await adapter.shutdown()
+
+    assert result["initialized"]
+
+
+@pytest.mark.asyncio
+async def test_process_mode_fails_fast_once_no_worker_can_be_started(tmp_path):
+    adapter = await make_plugin_adapter(
+        tmp_path,
+        [{"capability_id": "worker"}],
+        {"execution_mode": "process", "processes": 1, "max_calls_per_worker": 1}
+    )
+    (tmp_path / "test_plugin.py").write_text("raise ImportError('broken plugin')\n")
+
+    # The worker is recycled after this call, and its replacement fails to start
+    await adapter.execute("worker", {}, {})
+    for _ in range(2):
+        with pytest.raises(RuntimeError, match="No plugin workers"):
+            await asyncio.wait_for(adapter.execute("worker", {}, {}), 10)
+    await adapter.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_generator_plugins_stream_chunks(tmp_path):
+    adapter = await make_plugin_adapter(
+        tmp_path,
+        [{"capability_id": "countdown"}, {"capability_id": "tokens"}, {"capability_id": "coroutine"}]
+    )
+
+    assert [chunk async for chunk in adapter.execute_stream("countdown", {"start": 3}, {})] == [
+        {"result": 3}, {"result": 2}, {"result": 1}
+    ]
+    assert [chunk async for chunk in adapter.execute_stream("tokens", {"text": "a b"}, {})] == [
+        {"token": "a"}, {"token": "b"}
+    ]
+    assert [chunk async for chunk in adapter.execute_stream("coroutine", {"value": 1}, {})] == [{"value": 1}]
+    assert await adapter.execute("tokens", {"text": "a b"}, {}) == {"chunks": [{"token": "a"}, {"token": "b"}]}
+    await adapter.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_rest_adapter_retries_transient_errors(monkeypatch):
+    statuses = [502, 503, 200]
+
+    def handler(request):
+        return httpx.Response(statuses.pop(0), json={"ok": True})
+
+    adapter = await make_rest_adapter(monkeypatch, handler, [{
+        "capability_id": "lookup",
+        "metadata": {
+            "endpoint": "/lookup",
+            "method": "GET",
+            "retry": {"max_attempts": 3, "backoff_base": 0.001},
+        },
+    }])
+
+    assert await adapter.execute("lookup", {}, {}) == {"ok": True}
+    assert adapter.get_metrics()["retries"] == 2
+    await adapter.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_rest_adapter_does_not_retry_non_idempotent_methods(monkeypatch):
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(502)
+
+    adapter = await make_rest_adapter(monkeypatch, handler, [{
+        "capability_id": "create",
+        "metadata": {
+            "endpoint": "/create",
+            "method": "POST",
+            "retry": {"max_attempts": 3, "backoff_base": 0.001},
+        },
+    }])
+
+    with pytest.raises(RuntimeError):
+        await adapter.execute("create", {}, {})
+    assert len(requests) == 1
+    assert adapter.get_metrics()["retries"] == 0
+    await adapter.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_rest_adapter_hedges_slow_requests(monkeypatch):
+    requests = 0
+
+    async def handler(request):
+        nonlocal requests
+        requests += 1
+        await asyncio.sleep(1.0 if requests == 1 else 0.01)
+        return httpx.Response(200, json={"request": requests})
+
+    adapter = await make_rest_adapter(monkeypatch, handler, [{
+        "capability_id": "lookup",
+        "metadata": {"endpoint": "/lookup", "method": "GET", "retry": {"hedge": True}},
+    }])
+    tracker = adapter._latency.setdefault("lookup", rest_api.LatencyTracker())
+    for _ in range(tracker.min_samples):
+        tracker.record(0.02)
+
+    start = time.monotonic()
+    result = await adapter.execute("lookup", {}, {})
+
+    assert time.monotonic() - start < 0.5
+    assert result == {"request": 2}
+    metrics = adapter.get_metrics()
+    assert metrics["hedges"] == 1
+    assert metrics["hedge_wins"] == 1
+    await adapter.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_rest_adapters_share_clients_per_origin(monkeypatch):
+    seen = []
+
+    def handler(request):
+        if request.url.path.endswith("/lookup"):
+            seen.append((str(request.url), request.headers.get("x-tool")))
+        return httpx.Response(200, json={})
+
+    capabilities = [{"capability_id": "lookup", "metadata": {"endpoint": "/lookup", "method": "GET"}}]
+    first = await make_rest_adapter(monkeypatch, handler, capabilities, base_url="http://backend.test/v1")
+    pool = http_pool.get_shared_http_pool()
+    second = RestApiAdapter(make_plugin_manifest(capabilities, tool_id="other"))
+    assert await second.initialize({"base_url": "http://backend.test/v2", "headers": {"X-Tool": "other"}})
+
+    await first.execute("lookup", {}, {})
+    await second.execute("lookup", {}, {})
+
+    assert first.client is second.client
+    assert seen == [("http://backend.test/v1/lookup", None), ("http://backend.test/v2/lookup", "other")]
+    assert pool.get_stats()["origins"]["http://backend.test"]["users"] == 2
+
+    await first.shutdown()
+    assert not second.client.is_closed
+    client = second.client
+    await second.shutdown()
+    assert client.is_closed
+    assert pool.get_stats()["origins"] == {}
+
+
+LOOKUP_CAPABILITY = {"capability_id": "lookup", "metadata": {"endpoint": "/lookup", "method": "GET"}}
+
+
+@pytest.mark.asyncio
+async def test_rest_adapter_serves_fresh_responses_from_http_cache(monkeypatch):
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"value": 1}, headers={"Cache-Control": "max-age=60"})
+
+    adapter = await make_rest_adapter(monkeypatch, handler, [LOOKUP_CAPABILITY])
+
+    assert await adapter.execute("lookup", {"q": "a"}, {}) == {"value": 1}
+    assert await adapter.execute("lookup", {"q": "a"}, {}) == {"value": 1}
+    assert await adapter.execute("lookup", {"q": "b"}, {}) == {"value": 1}
+
+    assert len(requests) == 2
+    assert adapter.get_metrics()["http_cache"]["hits"] == 1
+    await adapter.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_rest_adapter_revalidates_stale_responses_with_etag(monkeypatch):
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304, headers={"ETag": '"v1"'})
+        return httpx.Response(200, json={"value": 1}, headers={"ETag": '"v1"', "Cache-Control": "no-cache"})
+
+    adapter = await make_rest_adapter(monkeypatch, handler, [LOOKUP_CAPABILITY])
+
+    assert await adapter.execute("lookup", {}, {}) == {"value": 1}
+    assert await adapter.execute("lookup", {}, {}) == {"value": 1}
+
+    assert len(requests) == 2
+    assert requests[1].headers["if-none-match"] == '"v1"'
+    assert adapter.get_metrics()["http_cache"]["revalidations"] == 1
+    await adapter.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_rest_adapter_revalidation_keeps_cache_size_accounting(monkeypatch):
+    def handler(request):
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304, headers={"ETag": '"v1"', "Cache-Control": "no-cache, must-revalidate"})
+        return httpx.Response(200, json={"value": 1}, headers={"ETag": '"v1"', "Cache-Control": "no-cache"})
+
+    adapter = await make_rest_adapter(monkeypatch, handler, [LOOKUP_CAPABILITY])
+
+    for _ in range(3):
+        assert await adapter.execute("lookup", {}, {}) == {"value": 1}
+
+    cache = adapter.http_cache
+    assert cache.get_stats()["revalidations"] == 2
+    assert cache.get_stats()["bytes"] == sum(entry.size() for entry in cache._entries.values())
+    await adapter.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_rest_adapter_serves_stale_while_revalidating(monkeypatch):
+    versions = iter([1, 2])
+
+    def handler(request):
+        return httpx.Response(
+            200,
+            json={"value": next(versions)},
+            headers={"Cache-Control": "max-age=0, stale-while-revalidate=60"}
+        )
+
+    adapter = await make_rest_adapter(monkeypatch, handler, [{
+        "capability_id": "lookup",
+        "metadata": {"endpoint": "/lookup", "method": "GET", "stale_while_revalidate": True},
+    }])
+
+    assert await adapter.execute("lookup", {}, {}) == {"value": 1}
+    assert await adapter.execute("lookup", {}, {}) == {"value": 1}
+    await asyncio.sleep(0.05)
+    assert await adapter.execute("lookup", {}, {}) == {"value": 2}
+
+    assert adapter.get_metrics()["http_cache"]["stale_hits"] == 2
+    await adapter.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_rest_adapter_http_cache_disk_tier(monkeypatch, tmp_path):
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"value": 1}, headers={"Cache-Control": "max-age=60"})
+
+    config = {"http_cache": {"disk_path": str(tmp_path / "http_cache")}}
+    first = await make_rest_adapter(monkeypatch, handler, [LOOKUP_CAPABILITY], config=config)
+    assert await first.execute("lookup", {}, {}) == {"value": 1}
+    await first.shutdown()
+
+    second = await make_rest_adapter(monkeypatch, handler, [LOOKUP_CAPABILITY], config=config)
+    assert await second.execute("lookup", {}, {}) == {"value": 1}
+
+    assert len(requests) == 1
+    assert second.get_metrics()["http_cache"]["disk_hits"] == 1
+    await second.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_rest_adapter_streams_ndjson(monkeypatch):
+    def handler(request):
+        return httpx.Response(200, content=b'{"n": 1}\n\n{"n": 2}\n3\n')
+
+    adapter = await make_rest_adapter(
+        monkeypatch,
+        handler,
+        [{"capability_id": "feed", "metadata": {"endpoint": "/feed", "method": "GET", "stream": "ndjson"}}]
+    )
+
+    assert [chunk async for chunk in adapter.execute_stream("feed", {}, {})] == [
+        {"n": 1}, {"n": 2}, {"result": 3}
+    ]
+    assert await adapter.execute("feed", {}, {}) == {"chunks": [{"n": 1}, {"n": 2}, {"result": 3}]}
+    await adapter.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_rest_adapter_prepares_each_request_once(monkeypatch):
+    def handler(request):
+        if request.url.path == "/feed":
+            return httpx.Response(200, content=b'{"n": 1}\n')
+        return httpx.Response(200, json={"ok": True})
+
+    adapter = await make_rest_adapter(
+        monkeypatch,
+        handler,
+        [
+            {"capability_id": "feed", "metadata": {"endpoint": "/feed", "method": "GET", "stream": "ndjson"}},
+            LOOKUP_CAPABILITY,
+        ],
+        config={"http_cache": False}
+    )
+    prepared = []
+    prepare_request = adapter._prepare_request
+
+    async def counting(capability_id, parameters, context):
+        prepared.append(capability_id)
+        return await prepare_request(capability_id, parameters, context)
+
+    monkeypatch.setattr(adapter, "_prepare_request", counting)
+
+    assert await adapter.execute("feed", {}, {}) == {"chunks": [{"n": 1}]}
+    assert [chunk async for chunk in adapter.execute_stream("lookup", {}, {})] == [{"ok": True}]
+    assert prepared == ["feed", "lookup"]
+    await adapter.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_rest_adapter_streams_sse(monkeypatch):
+    def handler(request):
+        body = b': comment\ndata: {"n": 1}\n\nevent: update\ndata: line one\ndata: line two\n\n'
+        return httpx.Response(200, content=body, headers={"Content-Type": "text/event-stream"})
+
+    adapter = await make_rest_adapter(
+        monkeypatch,
+        handler,
+        [{"capability_id": "events", "metadata": {"endpoint": "/events", "method": "POST", "stream": "sse"}}]
+    )
+
+    chunks = [chunk async for chunk in adapter.execute_stream("events", {}, {})]
+
+    assert chunks[0] == {"n": 1}
+    assert chunks[1] == {"data": "line one\nline two"}
+    await adapter.shutdown()
+
+
+BATCH_CAPABILITY = {
+    "capability_id": "lookup",
+    "metadata": {"batch_endpoint": "/lookup/batch", "max_batch_size": 3, "batch_window_ms": 20},
+}
+
+
+@pytest.mark.asyncio
+async def test_rest_adapter_batches_concurrent_calls(monkeypatch):
+    batches = []
+
+    def handler(request):
+        items = json.loads(request.content)["requests"]
+        batches.append(items)
+        results = []
+        for item in items:
+            if item["id"] == 2:
+                results.append({"error": {"message": "not found"}, "status": 404})
+            elif item["id"] == 3:
+                results.append({"error": "too slow", "status": 504})
+            else:
+                results.append({"result": {"id": item["id"]}})
+        return httpx.Response(200, json={"results": results})
+
+    adapter = await make_rest_adapter(monkeypatch, handler, [BATCH_CAPABILITY])
+
+    results = await asyncio.gather(
+        *[adapter.execute("lookup", {"id": i}, {}) for i in range(5)],
+        return_exceptions=True
+    )
+
+    assert [len(batch) for batch in batches] == [3, 2]
+    assert results[0] == {"id": 0} and results[1] == {"id": 1} and results[4] == {"id": 4}
+    assert isinstance(results[2], ToolRequestError) and "404 not found" in str(results[2])
+    assert isinstance(results[3], ToolTimeoutError)
+    assert adapter.get_metrics()["batching"]["lookup"]["batches"] == 2
+    await adapter.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_rest_adapter_batch_failure_reaches_every_caller(monkeypatch):
+    def handler(request):
+        return httpx.Response(500)
+
+    adapter = await make_rest_adapter(monkeypatch, handler, [BATCH_CAPABILITY])
+
+    results = await asyncio.gather(
+        *[adapter.execute("lookup", {"id": i}, {}) for i in range(2)],
+        return_exceptions=True
+    )
+
+    assert all(isinstance(result, RuntimeError) and "HTTP error" in str(result) for result in results)
+    assert not any(isinstance(result, ToolRequestError) for result in results)
+    await adapter.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_rest_adapter_drops_cancelled_calls_from_batch(monkeypatch):
+    batches = []
+
+    def handler(request):
+        items = json.loads(request.content)["requests"]
+        batches.append(items)
+        return httpx.Response(200, json={"results": [{"result": item} for item in items]})
+
+    adapter = await make_rest_adapter(monkeypatch, handler, [BATCH_CAPABILITY])
+
+    cancelled = asyncio.ensure_future(adapter.execute("lookup", {"id": 0}, {}))
+    kept = asyncio.ensure_future(adapter.execute("lookup", {"id": 1}, {}))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+
+    assert await kept == {"id": 1}
+    assert batches == [[{"id": 1}]]
+    await adapter.shutdown()
+
+
+OAUTH_AUTHENTICATION = {
+    "type": "oauth2",
+    "required": True,
+    "config": {
+        "token_url": "http://auth.test/token",
+        "client_id": "client",
+        "client_secret": "secret",
+        "refresh_ahead_seconds": 0.15,
+    },
+}
+
+
+class TokenServer:
+    """Token endpoint and a backend that accepts issued tokens until they are revoked."""
+
+    def __init__(self, expires_in: float = 3600):
+        self.expires_in = expires_in
+        self.issued = []
+        self.revoked = set()
+        self.seen = []
+
+    async def __call__(self, request):
+        if request.url.path == "/token":
+            self.issued.append(request)
+            await asyncio.sleep(0.01)
+            return httpx.Response(200, json={
+                "access_token": f"t{len(self.issued)}", "token_type": "bearer", "expires_in": self.expires_in
+            })
+
+        token = request.headers.get("authorization", "").replace("Bearer ", "")
+        self.seen.append(token)
+        if token in self.revoked or not token.startswith("t"):
+            return httpx.Response(401)
+        return httpx.Response(200, json={"ok": True})
+
+
+@pytest.mark.asyncio
+async def test_rest_adapter_fetches_and_caches_oauth_tokens(monkeypatch):
+    server = TokenServer()
+    adapter = await make_rest_adapter(
+        monkeypatch, server, [LOOKUP_CAPABILITY], authentication=OAUTH_AUTHENTICATION,
+        config={"http_cache": False}
+    )
+
+    results = await asyncio.gather(*[adapter.execute("lookup", {}, {}) for _ in range(10)])
+
+    assert results == [{"ok": True}] * 10
+    assert len(server.issued) == 1
+    assert server.issued[0].headers["authorization"].startswith("Basic ")
+    assert b"grant_type=client_credentials" in server.issued[0].content
+    assert set(server.seen) == {"t1"}
+
+    # A rejected token is dropped, and a burst of calls shares one token request
+    server.revoked.add("t1")
+    with pytest.raises(RuntimeError, match="401"):
+        await adapter.execute("lookup", {}, {})
+    await asyncio.gather(*[adapter.execute("lookup", {}, {}) for _ in range(5)])
+    assert len(server.issued) == 2
+    assert server.seen[-5:] == ["t2"] * 5
+    await adapter.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_rest_adapter_refreshes_oauth_tokens_ahead_of_expiry(monkeypatch):
+    server = TokenServer(expires_in=0.5)
+    adapter = await make_rest_adapter(
+        monkeypatch, server, [LOOKUP_CAPABILITY], authentication=OAUTH_AUTHENTICATION,
+        config={"http_cache": False}
+    )
+
+    # Within `refresh_ahead_seconds` of expiry the current token is still used
+    await asyncio.sleep(0.4)
+    assert await adapter.execute("lookup", {}, {}) == {"ok": True}
+    assert server.seen == ["t1"]
+
+    # ... while the next one is fetched in the background
+    await asyncio.sleep(0.05)
+    assert len(server.issued) == 2
+    assert await adapter.execute("lookup", {}, {}) == {"ok": True}
+    assert server.seen[-1] == "t2"
+    assert adapter.get_metrics()["oauth"]["background_refreshes"] == 1
+    await adapter.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_rest_adapter_releases_pooled_clients_when_initialization_fails(monkeypatch):
+    monkeypatch.setattr(
+        http_pool.httpx,
+        "AsyncClient",
+        functools.partial(httpx.AsyncClient, transport=httpx.MockTransport(lambda request: httpx.Response(500)))
+    )
+    pool = http_pool.HttpClientPool()
+    monkeypatch.setattr(http_pool, "_shared_pool", pool)
+    incomplete = {**OAUTH_AUTHENTICATION, "config": {"token_url": "http://auth.test/token"}}
+
+    # The token endpoint fails, after both clients were borrowed
+    adapter = RestApiAdapter(make_plugin_manifest([LOOKUP_CAPABILITY], authentication=OAUTH_AUTHENTICATION))
+    assert not await adapter.initialize({"base_url": "http://backend.test"})
+    assert pool.get_stats()["origins"] == {}
+
+    # An incomplete OAuth2 configuration fails before any client is borrowed
+    adapter = RestApiAdapter(make_plugin_manifest([LOOKUP_CAPABILITY], authentication=incomplete))
+    assert not await adapter.initialize({"base_url": "http://backend.test"})
+    assert pool.get_stats()["origins"] == {}
@@ -0,0 +1,469 @@
+"""Tests for the tool databases"""
+
+import asyncio
+import json
+from datetime import datetime
+
+import pytest
+
+from app.db.frozen import FrozenDict, freeze, thaw
+from app.db.memory import MemoryDatabase
+from app.db.sqlite_tools import SQLiteToolDatabase
+from app.tools.protocol.executor import ToolExecutor
+from app.tools.protocol.execution_log import ExecutionLogSink
+from app.tools.protocol.models import ToolImplementation, ToolManifest
+from app.tools.protocol.registry import ToolRegistry
+
+
+def make_tool(tool_id: str, categories=(), tags=(), status: str = "active", **extra):
+    """Build tool data as stored by the registry."""
+    return {
+        "tool_id": tool_id,
+        "manifest": {"tool_id": tool_id, "categories": list(categories), "tags": list(tags)},
+        "implementation": {"implementation_type": "fake", "config": {}},
+        "created_at": datetime(2024, 1, 1),
+        "updated_at": datetime(2024, 1, 1),
+        "status": status,
+        **extra,
+    }
+
+
+def make_manifest(version: str) -> ToolManifest:
+    """Build a minimal manifest."""
+    return ToolManifest(
+        tool_id="fake",
+        name="Fake",
+        version=version,
+        description="Fake tool",
+        author="Tests",
+        license="MIT",
+        capabilities=[{
+            "capability_id": "echo",
+            "name": "Echo",
+            "description": "Echo a value",
+            "parameters": {"type": "object"},
+            "returns": {"type": "object"},
+        }],
+        authentication={"type": "none", "required": False},
+        platform_requirements={"min_lyraios_version": "0.1.0"},
+    )
+
+
+@pytest.mark.asyncio
+async def test_tools_round_trip():
+    db = SQLiteToolDatabase(":memory:")
+    tool = make_tool("search", categories=["web"], owner="team-a")
+
+    await db.insert_tool(tool)
+
+    assert await db.get_tool("search") == tool
+    assert await db.get_tool("missing") is None
+
+
+@pytest.mark.asyncio
+async def test_upsert_creates_then_replaces_keeping_created_at_and_status():
+    db = SQLiteToolDatabase(":memory:")
+    assert await db.upsert_tool(make_tool("search", tags=["a"])) is True
+    await db.update_tool("search", {"status": "disabled"})
+
+    updated = make_tool("search", tags=["b"], status="active")
+    updated["created_at"] = updated["updated_at"] = datetime(2025, 1, 1)
+    assert await db.upsert_tool(updated) is False
+
+    tool = await db.get_tool("search")
+    assert tool["manifest"]["tags"] == ["b"]
+    assert tool["status"] == "disabled"
+    assert tool["created_at"] == datetime(2024, 1, 1)
+    assert tool["updated_at"] == datetime(2025, 1, 1)
+    assert await db.list_tools({"manifest.tags": "a"}) == []
+
+
+@pytest.mark.asyncio
+async def test_update_of_unknown_tool_raises():
+    db = SQLiteToolDatabase(":memory:")
+    with pytest.raises(ValueError):
+        await db.update_tool("missing", {"status": "disabled"})
+
+
+@pytest.mark.asyncio
+async def test_list_tools_filters_on_indexed_fields():
+    db = SQLiteToolDatabase(":memory:")
+    await db.insert_tool(make_tool("a", categories=["web", "search"], tags=["fast"]))
+    await db.insert_tool(make_tool("b", categories=["web"], status="disabled"))
+    await db.insert_tool(make_tool("c", categories=["finance"], tags=["fast"], owner="team-a"))
+
+    async def ids(filters):
+        return [tool["tool_id"] for tool in await db.list_tools(filters)]
+
+    assert await ids({}) == ["a", "b", "c"]
+    assert await ids({"manifest.categories": "web"}) == ["a", "b"]
+    assert await ids({"manifest.categories": "web", "status": "active"}) == ["a"]
+    assert await ids({"manifest.tags": "fast", "owner": "team-a"}) == ["c"]
+
+
+@pytest.mark.asyncio
+async def test_delete_removes_tool_and_its_index_entries():
+    db = SQLiteToolDatabase(":memory:")
+    await db.insert_tool(make_tool("a", categories=["web"]))
+
+    assert await db.delete_tool("a") is True
+    assert await db.delete_tool("a") is False
+    assert await db.list_tools({"manifest.categories": "web"}) == []
+
+
+@pytest.mark.asyncio
+async def test_catalog_is_shared_between_connections(tmp_path):
+    path = str(tmp_path / "tools.db")
+    first, second = SQLiteToolDatabase(path), SQLiteToolDatabase(path)
+    try:
+        await asyncio.gather(*[first.upsert_tool(make_tool(f"t{i}")) for i in range(10)])
+        await second.upsert_tool(make_tool("t0", tags=["second"]))
+
+        assert len(await second.list_tools({})) == 10
+        assert (await first.get_tool("t0"))["manifest"]["tags"] == ["second"]
+    finally:
+        await first.close()
+        await second.close()
+
+    reopened = SQLiteToolDatabase(path)
+    assert (await reopened.get_tool("t9"))["tool_id"] == "t9"
+    await reopened.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("make_db", [MemoryDatabase, lambda: SQLiteToolDatabase(":memory:")])
+async def test_registry_registers_and_updates_tools(make_db):
+    db = make_db()
+    registry = ToolRegistry(db)
+    implementation = ToolImplementation(implementation_type="fake", config={})
+
+    await registry.register(make_manifest(version="1.0.0"), implementation)
+    first = await db.get_tool("fake")
+    await registry.register(make_manifest(version="1.1.0"), implementation)
+
+    tool = await db.get_tool("fake")
+    assert tool["manifest"]["version"] == "1.1.0"
+    assert tool["created_at"] == first["created_at"]
+    assert tool["status"] == "active"
+    await db.close()
+
+
+@pytest.mark.asyncio
+async def test_changes_are_reported_to_other_instances_only(tmp_path):
+    path = str(tmp_path / "tools.db")
+    first, second = SQLiteToolDatabase(path), SQLiteToolDatabase(path)
+    version, _ = await second.get_changes(0)
+
+    await first.upsert_tool(make_tool("a"))
+    await first.upsert_tool(make_tool("b"))
+    await first.upsert_tool(make_tool("a"))
+    await second.upsert_tool(make_tool("c"))
+
+    version, changed = await second.get_changes(version)
+    assert changed == ["a", "b"]
+    assert await second.get_changes(version) == (version, [])
+
+    await first.delete_tool("b")
+    version, changed = await second.get_changes(version)
+    assert changed == ["b"]
+    await first.close()
+    await second.close()
+
+
+@pytest.mark.asyncio
+async def test_changes_beyond_the_change_log_are_unknown(tmp_path):
+    path = str(tmp_path / "tools.db")
+    first, second = SQLiteToolDatabase(path, max_changes=2), SQLiteToolDatabase(path)
+    await first.upsert_tool(make_tool("a"))
+    version, _ = await second.get_changes(0)
+
+    for tool_id in ("b", "c", "d"):
+        await first.upsert_tool(make_tool(tool_id))
+
+    assert (await second.get_changes(version))[1] is None
+    await first.close()
+    await second.close()
+
+
+@pytest.mark.asyncio
+async def test_workers_drop_tools_changed_by_other_workers(tmp_path):
+    path = str(tmp_path / "tools.db")
+    implementation = ToolImplementation(implementation_type="fake", config={})
+    worker_a = ToolRegistry(SQLiteToolDatabase(path))
+    worker_b = ToolRegistry(SQLiteToolDatabase(path))
+    executor_b = ToolExecutor(
+        worker_b,
+        execution_log=ExecutionLogSink(":memory:"),
+        adapter_grace_period=0.05
+    )
+    shutdowns = []
+
+    class Adapter:
+        async def shutdown(self):
+            shutdowns.append(self)
+
+    await worker_a.register(make_manifest(version="1.0.0"), implementation)
+    await worker_b.start_sync(interval=0.01)
+    assert (await worker_b.get_tool("fake"))["manifest"]["version"] == "1.0.0"
+    executor_b.adapters["fake"] = Adapter()
+
+    await worker_a.register(make_manifest(version="1.1.0"), implementation)
+    await asyncio.sleep(0.1)
+
+    assert (await worker_b.get_tool("fake"))["manifest"]["version"] == "1.1.0"
+    assert "fake" not in executor_b.adapters
+    assert len(shutdowns) == 1
+    await worker_b.stop_sync()
+    await executor_b.shutdown()
+
+
+DATABASES = [MemoryDatabase, lambda: SQLiteToolDatabase(":memory:")]
+
+
+async def fill_catalog(db):
+    """Store tools with overlapping search terms."""
+    await db.insert_tool(make_tool("a", categories=["web", "search"], tags=["fast"]))
+    await db.insert_tool(make_tool("b", categories=["web"], status="disabled"))
+    await db.insert_tool(make_tool("c", categories=["finance"], tags=["fast"]))
+    tool = make_tool("d", categories=["web"], tags=["slow"])
+    tool["manifest"].update(author="Acme", name="D", capabilities=[{"capability_id": "lookup"}])
+    await db.insert_tool(tool)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("make_db", DATABASES)
+async def test_list_tools_matches_dotted_filters(make_db):
+    db = make_db()
+    await fill_catalog(db)
+
+    async def ids(filters):
+        return [tool["tool_id"] for tool in await db.list_tools(filters)]
+
+    assert await ids({"manifest.categories": "web"}) == ["a", "b", "d"]
+    assert await ids({"manifest.categories": "web", "status": "active"}) == ["a", "d"]
+    assert await ids({"manifest.author": "Acme"}) == ["d"]
+    assert await ids({"manifest.categories": "missing"}) == []
+    await db.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("make_db", DATABASES)
+async def test_search_combines_terms(make_db):
+    db = make_db()
+    await fill_catalog(db)
+
+    async def ids(query, mode="and"):
+        page = await db.search_tools(query, mode=mode)
+        return [tool["tool_id"] for tool in page["items"]]
+
+    assert await ids({}) == ["a", "b", "c", "d"]
+    assert await ids({"category": ["web"], "tag": ["fast"]}) == ["a"]
+    assert await ids({"category": ["web"], "status": ["active"]}) == ["a", "d"]
+    assert await ids({"tag": ["fast", "slow"]}, mode="or") == ["a", "c", "d"]
+    assert await ids({"capability": ["lookup"], "author": ["Acme"]}) == ["d"]
+    assert await ids({"tag": ["missing"]}) == []
+    await db.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("make_db", DATABASES)
+async def test_search_pages_with_cursors(make_db):
+    db = make_db()
+    await fill_catalog(db)
+
+    first = await db.search_tools({"category": ["web", "finance"]}, mode="or", limit=2)
+    second = await db.search_tools({"category": ["web", "finance"]}, mode="or", cursor=first["next_cursor"], limit=2)
+
+    assert [tool["tool_id"] for tool in first["items"]] == ["a", "b"]
+    assert [tool["tool_id"] for tool in second["items"]] == ["c", "d"]
+    assert second["next_cursor"] is None
+    with pytest.raises(ValueError):
+        await db.search_tools({}, cursor="not a cursor!")
+    with pytest.raises(ValueError):
+        await db.search_tools({"owner": ["team-a"]})
+    await db.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("make_db", DATABASES)
+async def test_search_returns_summaries(make_db):
+    db = make_db()
+    await fill_catalog(db)
+
+    page = await db.search_tools({"author": ["Acme"]}, summary=True)
+
+    assert page["items"] == [{
+        "tool_id": "d",
+        "status": "active",
+        "updated_at": datetime(2024, 1, 1),
+        "name": "D",
+        "version": None,
+        "description": None,
+        "author": "Acme",
+        "categories": ["web"],
+        "tags": ["slow"],
+    }]
+    await db.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("make_db", DATABASES)
+async def test_search_follows_updates_and_deletes(make_db):
+    db = make_db()
+    await fill_catalog(db)
+
+    await db.update_tool("a", {"status": "disabled"})
+    await db.delete_tool("b")
+
+    page = await db.search_tools({"status": ["disabled"]})
+    assert [tool["tool_id"] for tool in page["items"]] == ["a"]
+    await db.close()
+
+
+def test_frozen_records_reject_changes_and_behave_like_plain_data():
+    tool = freeze(make_tool("a", tags=["fast"]))
+
+    with pytest.raises(TypeError):
+        tool["status"] = "disabled"
+    with pytest.raises(TypeError):
+        tool["manifest"]["tags"].append("slow")
+    assert tool == make_tool("a", tags=["fast"])
+    assert json.loads(json.dumps(tool, default=str))["manifest"]["tags"] == ["fast"]
+
+    copy = thaw(tool)
+    copy["manifest"]["tags"].append("slow")
+    assert type(copy) is dict and tool["manifest"]["tags"] == ["fast"]
+
+
+@pytest.mark.asyncio
+async def test_memory_database_shares_snapshots_and_replaces_them_on_write():
+    db = MemoryDatabase()
+    await db.insert_tool(make_tool("a", tags=["fast"]))
+    before = await db.get_tool("a")
+
+    assert isinstance(before, FrozenDict)
+    assert await db.get_tool("a") is before
+    assert (await db.list_tools({}))[0] is before
+
+    await db.update_tool("a", {"status": "disabled"})
+    after = await db.get_tool("a")
+
+    assert before["status"] == "active" and after["status"] == "disabled"
+    # Unchanged parts are shared between snapshots
+    assert after["manifest"] is before["manifest"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("make_db", DATABASES)
+async def test_registry_caches_stored_records(make_db):
+    db = make_db()
+    registry = ToolRegistry(db)
+    implementation = ToolImplementation(implementation_type="fake", config={"key": "value"})
+    await registry.register(make_manifest(version="1.0.0"), implementation)
+    await registry.db.update_tool("fake", {"status": "disabled"})
+    await registry.register(make_manifest(version="1.1.0"), implementation)
+
+    tool = await registry.get_tool("fake")
+
+    assert tool["status"] == "disabled"
+    assert tool["manifest"]["version"] == "1.1.0"
+    assert await registry.get_tool("fake") is tool
+    with pytest.raises(TypeError):
+        tool["implementation"]["config"]["key"] = "changed"
+    await db.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("make_db", DATABASES)
+async def test_register_many_reports_each_tool_and_skips_unchanged_ones(make_db):
+    db = make_db()
+    registry = ToolRegistry(db)
+    changed = []
+    registry.add_listener(changed.append)
+    implementation = ToolImplementation(implementation_type="fake", config={})
+    invalid = make_manifest(version="1.0.0")
+    invalid.tool_id, invalid.version = "broken", "latest"
+
+    results = await registry.register_many([
+        (make_manifest(version="1.0.0"), implementation),
+        (invalid, implementation),
+    ])
+
+    assert [(result.tool_id, result.status) for result in results] == [
+        ("fake", "created"),
+        ("broken", "invalid"),
+    ]
+    assert results[1].errors and await db.get_tool("broken") is None
+    first = await db.get_tool("fake")
+    await db.update_tool("fake", {"status": "disabled"})
+
+    validated = []
+    validate = registry.validate_manifest
+    registry.validate_manifest = lambda manifest: validated.append(manifest.version) or validate(manifest)
+    results = await registry.register_many([
+        (make_manifest(version="1.0.0"), implementation),
+        (make_manifest(version="1.1.0"), implementation),
+    ])
+
+    assert [result.status for result in results] == ["unchanged", "updated"]
+    assert validated == ["1.1.0"]
+    assert changed == ["fake", "fake"]
+    tool = await db.get_tool("fake")
+    assert tool["manifest"]["version"] == "1.1.0"
+    assert tool["status"] == "disabled"
+    assert tool["created_at"] == first["created_at"]
+    await db.close()
+
+
+@pytest.mark.asyncio
+async def test_register_many_skips_tools_registered_one_by_one():
+    db = SQLiteToolDatabase(":memory:")
+    registry = ToolRegistry(db)
+    implementation = ToolImplementation(implementation_type="fake", config={})
+    await registry.register(make_manifest(version="1.0.0"), implementation)
+    version, _ = await db.get_changes(0)
+
+    results = await registry.register_many([(make_manifest(version="1.0.0"), implementation)])
+
+    assert results[0].status == "unchanged"
+    assert (await db.get_changes(0))[0] == version
+    await db.close()
+
+
+@pytest.mark.asyncio
+async def test_register_many_rejects_missing_write_outcomes():
+    db = MemoryDatabase()
+    upsert_many = db.upsert_many
+
+    async def lose_an_outcome(tools):
+        return (await upsert_many(tools))[:-1]
+
+    db.upsert_many = lose_an_outcome
+    registry = ToolRegistry(db)
+    changed = []
+    registry.add_listener(changed.append)
+    implementation = ToolImplementation(implementation_type="fake", config={})
+    other = make_manifest(version="1.0.0")
+    other.tool_id = "other"
+
+    with pytest.raises(RuntimeError, match="1 outcomes for 2"):
+        await registry.register_many([(make_manifest(version="1.0.0"), implementation), (other, implementation)])
+    assert changed == ["fake", "other"]
+    await db.close()
+
+
+@pytest.mark.asyncio
+async def test_sqlite_upsert_many_writes_in_one_transaction():
+    db = SQLiteToolDatabase(":memory:")
+    await db.insert_tool(make_tool("a"))
+
+    with pytest.raises(ValueError):
+        await db.upsert_many([make_tool("b"), {"manifest": {}}])
+    # A failing write leaves the catalog as it was
+    await db.insert_tool(make_tool("c"))
+    failing = make_tool("d", created_at=object())
+    with pytest.raises(Exception):
+        await db.upsert_many([make_tool("e"), failing])
+
+    assert [tool["tool_id"] for tool in await db.list_tools({})] == ["a", "c"]
+    await db.close()
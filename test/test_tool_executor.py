@@ -0,0 +1,858 @@
+"""Tests for the Tool Executor"""
+
+import asyncio
+import sqlite3
+import time
+from typing import Any, Dict, Optional
+
+import pytest
+
+from app.db.memory import MemoryDatabase
+from app.tools.protocol.adaptive import GradientLimit
+from app.tools.protocol.admission import AdmissionQueue
+from app.tools.protocol.cache import ResultCache
+from app.tools.protocol.circuit_breaker import CircuitBreakerConfig
+from app.tools.protocol.execution_log import ExecutionLogSink, ExecutionRecord
+from app.tools.protocol.adapters.base import ToolAdapter
+from app.tools.protocol.errors import (
+    CircuitOpenError,
+    PipelineError,
+    ToolQueueFullError,
+    ToolQueueTimeoutError,
+    ToolRequestError,
+    ToolValidationError,
+)
+from app.tools.protocol.executor import ToolExecutionError, ToolExecutor, ToolTimeoutError
+from app.tools.protocol.models import Pipeline, ToolCall, ToolImplementation, ToolManifest, ValidationResult
+from app.tools.protocol.registry import ToolRegistry
+from app.tools.protocol.validation import ParameterValidator
+
+
+class FakeAdapter(ToolAdapter):
+    """Adapter that echoes its parameters after an optional delay."""
+
+    instances = []
+
+    async def initialize(self, config: Dict[str, Any]) -> bool:
+        await asyncio.sleep(config.get("init_delay", 0))
+        self.config = config
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+        FakeAdapter.instances.append(self)
+        return True
+
+    async def validate(self) -> ValidationResult:
+        return ValidationResult(is_valid=True)
+
+    async def execute(
+        self,
+        capability_id: str,
+        parameters: Dict[str, Any],
+        context: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        self.calls += 1
+        self.last_context = context
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            delay = parameters.get("delay", 0)
+            if parameters.get("honor_deadline") and "deadline" in context:
+                # Like a REST backend whose request timeout is derived from the deadline
+                await asyncio.wait_for(asyncio.sleep(delay), timeout=context["deadline"] - time.monotonic())
+            else:
+                await asyncio.sleep(delay)
+            if parameters.get("fail"):
+                raise RuntimeError("backend failure")
+            if parameters.get("reject"):
+                raise ToolRequestError("HTTP error: 404 not found")
+            if parameters.get("unknown"):
+                raise ValueError(f"Capability not found: {capability_id}")
+            return {"echo": parameters.get("value"), "capability_id": capability_id}
+        finally:
+            self.active -= 1
+
+    async def shutdown(self) -> None:
+        pass
+
+
+def make_manifest(
+    tool_id: str = "fake",
+    version: str = "1.0.0",
+    rate_limits: Optional[Dict[str, Any]] = None,
+    capability_metadata: Optional[Dict[str, Any]] = None
+) -> ToolManifest:
+    """Build a minimal manifest for the fake adapter."""
+    return ToolManifest(
+        tool_id=tool_id,
+        name="Fake",
+        version=version,
+        description="Fake tool",
+        author="Tests",
+        license="MIT",
+        capabilities=[
+            {
+                "capability_id": "echo",
+                "name": "Echo",
+                "description": "Echo a value",
+                "parameters": {"type": "object", "properties": {"value": {"type": "string"}}},
+                "returns": {"type": "object"},
+                "metadata": capability_metadata or {},
+            }
+        ],
+        authentication={"type": "none", "required": False},
+        rate_limits=rate_limits,
+        platform_requirements={"min_lyraios_version": "0.1.0"},
+    )
+
+
+async def make_executor(**kwargs) -> ToolExecutor:
+    """Create an executor with the fake tool registered."""
+    manifest_kwargs = {
+        key: kwargs.pop(key) for key in ("rate_limits", "capability_metadata") if key in kwargs
+    }
+    config = kwargs.pop("config", {})
+    registry = ToolRegistry(MemoryDatabase())
+    await registry.register(
+        make_manifest(**manifest_kwargs),
+        ToolImplementation(implementation_type="fake", config=config)
+    )
+    kwargs.setdefault("execution_log", ExecutionLogSink(":memory:"))
+    executor = ToolExecutor(registry, **kwargs)
+    executor.adapter_classes["fake"] = FakeAdapter
+    return executor
+
+
+@pytest.mark.asyncio
+async def test_execute_returns_adapter_result():
+    executor = await make_executor()
+
+    result = await executor.execute("fake", "echo", {"value": "hi"}, {})
+
+    assert result == {"echo": "hi", "capability_id": "echo"}
+
+
+@pytest.mark.asyncio
+async def test_execute_unknown_tool_raises():
+    executor = await make_executor()
+
+    with pytest.raises(ToolExecutionError):
+        await executor.execute("missing", "echo", {}, {})
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_limit_is_enforced():
+    executor = await make_executor(rate_limits={"concurrent_requests": 2})
+
+    await asyncio.gather(*[
+        executor.execute("fake", "echo", {"delay": 0.02}, {}) for _ in range(6)
+    ])
+
+    adapter = executor.adapters["fake"]
+    assert adapter.max_active == 2
+    stats = executor.get_metrics()["scheduler"]["fake"]
+    assert stats["admitted"] == 6
+    assert stats["queue_time_max"] > 0
+
+
+@pytest.mark.asyncio
+async def test_queue_depth_is_bounded():
+    executor = await make_executor(rate_limits={"concurrent_requests": 1}, max_queue_depth=1)
+
+    results = await asyncio.gather(
+        *[executor.execute("fake", "echo", {"delay": 0.05}, {}) for _ in range(3)],
+        return_exceptions=True
+    )
+
+    assert sum(isinstance(result, ToolQueueFullError) for result in results) == 1
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_times_out_when_wait_exceeds_queue_timeout():
+    executor = await make_executor(
+        rate_limits={"requests_per_minute": 60, "burst": 1},
+        queue_timeout=0.5
+    )
+
+    await executor.execute("fake", "echo", {}, {})
+    start = time.monotonic()
+    with pytest.raises(ToolQueueTimeoutError):
+        await executor.execute("fake", "echo", {}, {})
+
+    # The call fails fast instead of sleeping until the timeout
+    assert time.monotonic() - start < 0.5
+
+
+def feed_windows(limit: GradientLimit, rtt: float, windows: int, saturated: bool = True) -> None:
+    """Feed whole windows of latency samples to a limit."""
+    for _ in range(windows * limit.window_size):
+        limit.on_sample(rtt, limit.current if saturated else 1)
+
+
+def test_gradient_limit_grows_while_latency_is_stable_up_to_its_ceiling():
+    limit = GradientLimit(initial_limit=10, max_limit=40)
+
+    feed_windows(limit, 0.01, 5)
+    assert limit.current > 10
+
+    feed_windows(limit, 0.01, 100)
+    assert limit.current == 40
+
+
+def test_gradient_limit_shrinks_when_latency_rises():
+    limit = GradientLimit(initial_limit=30)
+    feed_windows(limit, 0.01, 3)
+    grown = limit.current
+
+    feed_windows(limit, 0.05, 5)
+
+    assert limit.current < grown
+    assert limit.get_stats()["decreases"] > 0
+
+
+def test_gradient_limit_ignores_unsaturated_traffic():
+    limit = GradientLimit(initial_limit=10)
+
+    feed_windows(limit, 0.01, 20, saturated=False)
+
+    assert limit.current == 10
+
+
+def test_gradient_limit_backs_off_once_per_round_trip_on_timeouts():
+    limit = GradientLimit(initial_limit=20)
+    started = time.monotonic()
+
+    limit.on_drop(started)
+    limit.on_drop(started)
+    limit.on_drop(time.monotonic())
+
+    assert limit.current == int(20 * 0.9 * 0.9)
+    assert limit.drops == 3
+
+
+@pytest.mark.asyncio
+async def test_timed_out_calls_lower_the_concurrency_limit():
+    executor = await make_executor(rate_limits={"concurrent_requests": 10})
+
+    results = await asyncio.gather(
+        *[executor.execute("fake", "echo", {"delay": 0.2}, {}, timeout=0.02) for _ in range(5)],
+        return_exceptions=True
+    )
+
+    assert all(isinstance(result, ToolTimeoutError) for result in results)
+    # The calls overlapped, so they cut the limit once
+    assert executor.scheduler.get_concurrency_limits() == {"fake": 9}
+    assert executor.get_metrics()["scheduler"]["fake"]["adaptive"]["max_limit"] == 10
+
+
+@pytest.mark.asyncio
+async def test_execute_many_returns_results_in_order():
+    executor = await make_executor()
+    calls = [
+        ToolCall(tool_id="fake", capability_id="echo", parameters={"value": "a", "delay": 0.02}),
+        ToolCall(tool_id="missing", capability_id="echo"),
+        ToolCall(tool_id="fake", capability_id="echo", parameters={"fail": True}),
+        ToolCall(tool_id="fake", capability_id="echo", parameters={"value": "d"}),
+    ]
+
+    results = await executor.execute_many(calls)
+
+    assert [result.success for result in results] == [True, False, False, True]
+    assert results[0].result["echo"] == "a"
+    assert results[3].result["echo"] == "d"
+    assert results[1].error_type == "ToolExecutionError"
+
+
+@pytest.mark.asyncio
+async def test_execute_many_limits_fan_out():
+    executor = await make_executor(max_batch_concurrency=3)
+    calls = [
+        ToolCall(tool_id="fake", capability_id="echo", parameters={"delay": 0.01}) for _ in range(10)
+    ]
+
+    results = await executor.execute_many(calls)
+
+    assert all(result.success for result in results)
+    assert executor.adapters["fake"].max_active == 3
+
+
+@pytest.mark.asyncio
+async def test_cacheable_capability_is_served_from_cache():
+    executor = await make_executor(capability_metadata={"cacheable": True, "ttl_seconds": 60})
+
+    first = await executor.execute("fake", "echo", {"value": "x", "delay": 0}, {})
+    second = await executor.execute("fake", "echo", {"delay": 0, "value": "x"}, {})
+
+    assert first == second
+    assert executor.adapters["fake"].calls == 1
+    stats = executor.get_metrics()["cache"]
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_uncacheable_capability_is_not_cached():
+    executor = await make_executor()
+
+    await executor.execute("fake", "echo", {"value": "x"}, {})
+    await executor.execute("fake", "echo", {"value": "x"}, {})
+
+    assert executor.adapters["fake"].calls == 2
+
+
+@pytest.mark.asyncio
+async def test_cache_is_invalidated_when_tool_is_re_registered():
+    executor = await make_executor(capability_metadata={"cacheable": True})
+    await executor.execute("fake", "echo", {"value": "x"}, {})
+
+    await executor.registry.register(
+        make_manifest(version="1.1.0", capability_metadata={"cacheable": True}),
+        ToolImplementation(implementation_type="fake", config={})
+    )
+
+    assert executor.get_metrics()["cache"]["entries"] == 0
+
+
+def test_result_cache_evicts_least_recently_used_entries_by_size():
+    cache = ResultCache(max_entries=10, max_bytes=60)
+    cache.set("a", "tool", {"value": "a" * 10})
+    cache.set("b", "tool", {"value": "b" * 10})
+    cache.get("a")
+    cache.set("c", "tool", {"value": "c" * 10})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"value": "a" * 10}
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_result_cache_expires_entries():
+    cache = ResultCache()
+    cache.set("a", "tool", {"value": 1}, ttl=0)
+
+    assert cache.get("a") is None
+    assert cache.get_stats()["expirations"] == 1
+
+
+def test_result_cache_key_ignores_parameter_order():
+    first = ResultCache.make_key("tool", "1.0.0", "echo", {"a": 1, "b": 2})
+    second = ResultCache.make_key("tool", "1.0.0", "echo", {"b": 2, "a": 1})
+
+    assert first == second
+    assert first != ResultCache.make_key("tool", "1.0.1", "echo", {"a": 1, "b": 2})
+
+
+@pytest.mark.asyncio
+async def test_identical_idempotent_calls_are_coalesced():
+    executor = await make_executor(capability_metadata={"idempotent": True})
+
+    results = await asyncio.gather(*[
+        executor.execute("fake", "echo", {"value": "x", "delay": 0.02}, {}) for _ in range(5)
+    ])
+
+    assert all(result == results[0] for result in results)
+    assert executor.adapters["fake"].calls == 1
+    assert executor.get_metrics()["single_flight"]["followers"] == 4
+
+
+@pytest.mark.asyncio
+async def test_calls_with_different_auth_are_not_coalesced():
+    executor = await make_executor(capability_metadata={"idempotent": True})
+
+    await asyncio.gather(
+        executor.execute("fake", "echo", {"delay": 0.02}, {"auth": {"key": "a"}}),
+        executor.execute("fake", "echo", {"delay": 0.02}, {"auth": {"key": "b"}}),
+    )
+
+    assert executor.adapters["fake"].calls == 2
+
+
+@pytest.mark.asyncio
+async def test_non_idempotent_calls_are_not_coalesced():
+    executor = await make_executor()
+
+    await asyncio.gather(*[
+        executor.execute("fake", "echo", {"delay": 0.02}, {}) for _ in range(3)
+    ])
+
+    assert executor.adapters["fake"].calls == 3
+
+
+@pytest.mark.asyncio
+async def test_coalesced_failure_reaches_every_waiter():
+    executor = await make_executor(capability_metadata={"idempotent": True})
+
+    results = await asyncio.gather(
+        *[executor.execute("fake", "echo", {"fail": True, "delay": 0.02}, {}) for _ in range(3)],
+        return_exceptions=True
+    )
+
+    assert all(isinstance(result, ToolExecutionError) for result in results)
+    assert executor.adapters["fake"].calls == 1
+
+
+@pytest.mark.asyncio
+async def test_follower_retries_when_the_leaders_deadline_fails_the_shared_call():
+    executor = await make_executor(capability_metadata={"idempotent": True})
+    parameters = {"value": "x", "delay": 0.1, "honor_deadline": True}
+
+    leader = asyncio.ensure_future(executor.execute("fake", "echo", parameters, {}, timeout=0.03))
+    await asyncio.sleep(0)
+    follower = asyncio.ensure_future(executor.execute("fake", "echo", parameters, {}, timeout=5))
+
+    assert (await follower)["echo"] == "x"
+    with pytest.raises(ToolTimeoutError):
+        await leader
+    assert executor.get_metrics()["single_flight"]["retries"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelling_one_waiter_does_not_cancel_shared_call():
+    executor = await make_executor(capability_metadata={"idempotent": True})
+    parameters = {"value": "x", "delay": 0.05}
+
+    first = asyncio.ensure_future(executor.execute("fake", "echo", parameters, {}))
+    second = asyncio.ensure_future(executor.execute("fake", "echo", parameters, {}))
+    await asyncio.sleep(0.01)
+    first.cancel()
+
+    assert (await second)["echo"] == "x"
+    assert first.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_call_is_cancelled_when_its_deadline_passes():
+    executor = await make_executor(rate_limits={"concurrent_requests": 1})
+
+    start = time.monotonic()
+    with pytest.raises(ToolTimeoutError):
+        await executor.execute("fake", "echo", {"delay": 1.0}, {}, timeout=0.05)
+
+    assert time.monotonic() - start < 0.5
+    stats = executor.scheduler.get_stats()["fake"]
+    assert stats["in_flight"] == 0
+    assert await executor.execute("fake", "echo", {"value": "next"}, {}) == {
+        "echo": "next", "capability_id": "echo"
+    }
+
+
+@pytest.mark.asyncio
+async def test_deadline_defaults_from_capability_metadata():
+    executor = await make_executor(capability_metadata={"timeout": 5})
+
+    before = time.monotonic()
+    await executor.execute("fake", "echo", {"value": "hi"}, {"trace": "abc"})
+
+    context = FakeAdapter.instances[-1].last_context
+    assert context["trace"] == "abc"
+    assert before + 4 < context["deadline"] <= time.monotonic() + 5
+    with pytest.raises(ToolTimeoutError):
+        await executor.execute("fake", "echo", {"delay": 1.0}, {}, timeout=0.01)
+
+
+@pytest.mark.asyncio
+async def test_enclosing_deadline_is_only_shortened():
+    executor = await make_executor(capability_metadata={"timeout": 5})
+    deadline = time.monotonic() + 1
+
+    await executor.execute("fake", "echo", {}, {"deadline": deadline})
+
+    assert FakeAdapter.instances[-1].last_context["deadline"] == deadline
+
+
+@pytest.mark.asyncio
+async def test_circuit_opens_on_errors_and_closes_after_probes():
+    executor = await make_executor(circuit_breaker=CircuitBreakerConfig(
+        min_calls=2, error_rate_threshold=0.5, open_seconds=0.1, half_open_max_calls=1
+    ))
+
+    for _ in range(2):
+        with pytest.raises(ToolExecutionError):
+            await executor.execute("fake", "echo", {"fail": True}, {})
+    adapter = FakeAdapter.instances[-1]
+
+    with pytest.raises(CircuitOpenError):
+        await executor.execute("fake", "echo", {"value": "hi"}, {})
+    assert adapter.calls == 2
+
+    await asyncio.sleep(0.15)
+    probes = await asyncio.gather(
+        executor.execute("fake", "echo", {"value": "a", "delay": 0.05}, {}),
+        executor.execute("fake", "echo", {"value": "b", "delay": 0.05}, {}),
+        return_exceptions=True
+    )
+    assert probes[0]["echo"] == "a"
+    assert isinstance(probes[1], CircuitOpenError)
+    assert executor.circuit_breakers.get_stats()["fake"]["state"] == "closed"
+
+
+@pytest.mark.asyncio
+async def test_circuit_ignores_errors_caused_by_the_call():
+    executor = await make_executor(circuit_breaker=CircuitBreakerConfig(min_calls=2, error_rate_threshold=0.5))
+
+    for _ in range(3):
+        with pytest.raises(ToolExecutionError, match="404"):
+            await executor.execute("fake", "echo", {"reject": True}, {})
+    with pytest.raises(ToolExecutionError, match="Capability not found"):
+        await executor.execute("fake", "echo", {"unknown": True}, {})
+
+    assert (await executor.execute("fake", "echo", {"value": "hi"}, {}))["echo"] == "hi"
+    assert executor.circuit_breakers.get_stats()["fake"]["times_opened"] == 0
+
+
+@pytest.mark.asyncio
+async def test_circuit_opens_on_slow_calls():
+    executor = await make_executor(circuit_breaker=CircuitBreakerConfig(
+        min_calls=2, slow_call_seconds=0.01, slow_call_rate_threshold=1.0
+    ))
+
+    await executor.execute("fake", "echo", {"delay": 0.02}, {})
+    await executor.execute("fake", "echo", {"delay": 0.02}, {})
+
+    with pytest.raises(CircuitOpenError):
+        await executor.execute("fake", "echo", {}, {})
+    assert executor.circuit_breakers.get_stats()["fake"]["times_opened"] == 1
+
+
+@pytest.mark.asyncio
+async def test_execute_stream_yields_chunks_and_releases_slot():
+    executor = await make_executor(rate_limits={"concurrent_requests": 1})
+
+    chunks = [chunk async for chunk in executor.execute_stream("fake", "echo", {"value": "hi"}, {})]
+    assert chunks == [{"echo": "hi", "capability_id": "echo"}]
+
+    stream = executor.execute_stream("fake", "echo", {"value": "abandoned"}, {})
+    await stream.__anext__()
+    await stream.aclose()
+
+    assert executor.scheduler.get_stats()["fake"]["in_flight"] == 0
+    with pytest.raises(ToolTimeoutError):
+        async for _ in executor.execute_stream("fake", "echo", {"delay": 1.0}, {}, timeout=0.05):
+            pass
+    assert executor.scheduler.get_stats()["fake"]["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_invalid_parameters_are_rejected_before_dispatch():
+    executor = await make_executor()
+
+    with pytest.raises(ToolValidationError) as excinfo:
+        await executor.execute("fake", "echo", {"value": 5}, {})
+
+    assert excinfo.value.errors == ["parameters.value: 5 is not of type string"]
+    assert FakeAdapter.instances[-1].calls == 0
+    assert executor.get_metrics()["validation"]["failures"] == 1
+
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "name": {"type": "string", "minLength": 1, "pattern": "^[a-z]+$"},
+        "count": {"type": "integer", "minimum": 1, "exclusiveMaximum": 10},
+        "mode": {"enum": ["fast", "slow"]},
+        "tags": {"type": "array", "items": {"type": "string"}, "maxItems": 2},
+    },
+    "required": ["name"],
+    "additionalProperties": False,
+}
+
+
+@pytest.mark.parametrize("parameters, valid", [
+    ({"name": "abc", "count": 3, "mode": "fast", "tags": ["x"]}, True),
+    ({"name": "abc", "count": 3.0}, True),
+    ({"count": 3}, False),
+    ({"name": "ABC"}, False),
+    ({"name": "abc", "count": True}, False),
+    ({"name": "abc", "count": 10}, False),
+    ({"name": "abc", "mode": "medium"}, False),
+    ({"name": "abc", "tags": ["x", 1]}, False),
+    ({"name": "abc", "tags": ["x", "y", "z"]}, False),
+    ({"name": "abc", "other": 1}, False),
+])
+def test_compiled_validator_agrees_with_jsonschema(parameters, valid):
+    compiled = ParameterValidator(SCHEMA)
+    fallback = ParameterValidator({**SCHEMA, "not": {"required": ["forbidden"]}})
+
+    assert compiled.compiled and not fallback.compiled
+    assert (compiled.validate(parameters) == []) is valid
+    assert (fallback.validate(parameters) == []) is valid
+
+
+@pytest.mark.asyncio
+async def test_registry_rejects_invalid_parameter_schemas():
+    registry = ToolRegistry(MemoryDatabase())
+    manifest = make_manifest()
+    manifest.capabilities[0].parameters = {"type": "object", "properties": {"value": {"type": "text"}}}
+
+    with pytest.raises(ValueError, match="invalid parameters schema"):
+        await registry.register(manifest, ToolImplementation(implementation_type="fake", config={}))
+
+
+def make_pipeline(*steps: Dict[str, Any], **kwargs) -> Pipeline:
+    """Build a pipeline of echo steps."""
+    return Pipeline(
+        steps=[{"tool_id": "fake", "capability_id": "echo", **step} for step in steps],
+        **kwargs
+    )
+
+
+@pytest.mark.asyncio
+async def test_pipeline_runs_independent_steps_concurrently_and_resolves_references():
+    executor = await make_executor()
+    pipeline = make_pipeline(
+        {"step_id": "a", "parameters": {"value": "x", "delay": 0.1}},
+        {"step_id": "b", "parameters": {"value": "y", "delay": 0.1}},
+        {"step_id": "c", "parameters": {"value": {"$ref": "a.echo"}, "other": [{"$ref": "b"}]}},
+    )
+
+    start = time.monotonic()
+    results = [result async for result in executor.execute_pipeline(pipeline)]
+
+    assert time.monotonic() - start < 0.18
+    assert [result.step_id for result in results][2] == "c"
+    assert all(result.status == "succeeded" for result in results)
+    assert results[2].result == {"echo": "x", "capability_id": "echo"}
+
+
+@pytest.mark.asyncio
+async def test_pipeline_short_circuits_on_failure():
+    executor = await make_executor()
+    pipeline = make_pipeline(
+        {"step_id": "a", "parameters": {"fail": True, "delay": 0.01}},
+        {"step_id": "b", "parameters": {"delay": 1.0}},
+        {"step_id": "c", "parameters": {"value": {"$ref": "a.echo"}}},
+    )
+
+    start = time.monotonic()
+    results = {result.step_id: result async for result in executor.execute_pipeline(pipeline)}
+
+    assert time.monotonic() - start < 0.5
+    assert {step_id: result.status for step_id, result in results.items()} == {
+        "a": "failed", "b": "cancelled", "c": "skipped"
+    }
+    assert "backend failure" in results["a"].error
+    assert executor.scheduler.get_stats()["fake"]["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_pipeline_without_fail_fast_only_skips_dependents():
+    executor = await make_executor()
+    pipeline = make_pipeline(
+        {"step_id": "a", "parameters": {"fail": True}},
+        {"step_id": "b", "parameters": {"delay": 0.05}},
+        {"step_id": "c", "parameters": {}, "depends_on": ["a"]},
+        {"step_id": "d", "parameters": {"value": "z"}, "depends_on": ["b"]},
+        fail_fast=False
+    )
+
+    results = {result.step_id: result.status async for result in executor.execute_pipeline(pipeline)}
+
+    assert results == {"a": "failed", "b": "succeeded", "c": "skipped", "d": "succeeded"}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("steps, message", [
+    ([{"step_id": "a", "depends_on": ["b"]}, {"step_id": "b", "depends_on": ["a"]}], "cycle"),
+    ([{"step_id": "a", "parameters": {"value": {"$ref": "missing.echo"}}}], "unknown steps"),
+    ([{"step_id": "a"}, {"step_id": "a"}], "Duplicate"),
+])
+async def test_malformed_pipelines_are_rejected(steps, message):
+    executor = await make_executor()
+
+    with pytest.raises(PipelineError, match=message):
+        await executor.execute_pipeline(make_pipeline(*steps)).__anext__()
+
+
+async def queue_waiters(queue: AdmissionQueue, waiters, order):
+    """Queue calls that record their admission order and keep their slots."""
+    async def wait(user_id, priority):
+        await queue.acquire(user_id, priority)
+        order.append(f"{priority}:{user_id}")
+
+    tasks = [asyncio.ensure_future(wait(user_id, priority)) for user_id, priority in waiters]
+    await asyncio.sleep(0)
+    return tasks
+
+
+async def release_all(queue: AdmissionQueue, tasks, order):
+    """Free one slot at a time until every queued call was admitted."""
+    while len(order) < len(tasks):
+        queue.release()
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_admission_prefers_interactive_calls_and_rotates_users():
+    queue = AdmissionQueue(max_concurrency=1)
+    await queue.acquire("holder")
+    order = []
+    tasks = await queue_waiters(
+        queue,
+        [("a", "batch")] * 3 + [("b", "interactive")] * 2 + [("c", "interactive")] * 2,
+        order
+    )
+
+    await release_all(queue, tasks, order)
+
+    assert order == [
+        "interactive:b", "interactive:c", "interactive:b", "interactive:c",
+        "batch:a", "batch:a", "batch:a",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_admission_shares_slots_by_class_weight():
+    queue = AdmissionQueue(max_concurrency=1, weights={"interactive": 2.0, "batch": 1.0})
+    await queue.acquire("holder")
+    order = []
+    tasks = await queue_waiters(queue, [("a", "batch")] * 3 + [("b", "interactive")] * 6, order)
+
+    await release_all(queue, tasks, order)
+
+    # Batch calls are delayed but not starved
+    assert [entry.split(":")[0] for entry in order] == ["interactive", "interactive", "batch"] * 3
+
+
+@pytest.mark.asyncio
+async def test_admission_drops_cancelled_and_timed_out_waiters():
+    queue = AdmissionQueue(max_concurrency=1, queue_timeout=0.05)
+    await queue.acquire("holder")
+
+    with pytest.raises(ToolQueueTimeoutError):
+        await queue.acquire("a", "batch")
+    cancelled = asyncio.ensure_future(queue.acquire("b"))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    await asyncio.gather(cancelled, return_exceptions=True)
+    queue.release()
+
+    stats = queue.get_stats()
+    assert stats["queued"] == 0 and stats["in_flight"] == 0
+    assert stats["classes"]["batch"]["timed_out"] == 1
+    assert await queue.acquire("c") == 0.0
+
+
+@pytest.mark.asyncio
+async def test_admission_skips_waiters_cancelled_while_a_slot_is_released():
+    queue = AdmissionQueue(max_concurrency=1)
+    await queue.acquire("holder")
+    cancelled = asyncio.ensure_future(queue.acquire("a"))
+    waiting = asyncio.ensure_future(queue.acquire("b"))
+    await asyncio.sleep(0)
+
+    # The cancelled call's waiter is done before the call withdraws it from the queue
+    cancelled.cancel()
+    await asyncio.sleep(0)
+    queue.release()
+
+    with pytest.raises(asyncio.CancelledError):
+        await cancelled
+    assert await asyncio.wait_for(waiting, 1) >= 0.0
+    stats = queue.get_stats()
+    assert stats["queued"] == 0 and stats["in_flight"] == 1
+    queue.release()
+    assert await queue.acquire("c") == 0.0
+
+
+@pytest.mark.asyncio
+async def test_execute_respects_global_concurrency_cap_and_reports_queue_waits():
+    executor = await make_executor(max_concurrency=2)
+
+    await asyncio.gather(*[
+        executor.execute("fake", "echo", {"delay": 0.02}, {}, user_id=f"user{i % 2}", priority=priority)
+        for i, priority in enumerate(["interactive", "batch"] * 3)
+    ])
+
+    assert FakeAdapter.instances[-1].max_active == 2
+    stats = executor.get_metrics()["admission"]
+    assert stats["in_flight"] == 0
+    assert stats["classes"]["interactive"]["admitted"] == 3
+    assert stats["classes"]["batch"]["admitted"] == 3
+    assert stats["classes"]["batch"]["queue_time_max"] > 0
+
+
+@pytest.mark.asyncio
+async def test_concurrent_first_calls_share_adapter_initialization():
+    executor = await make_executor(config={"init_delay": 0.02})
+    FakeAdapter.instances.clear()
+
+    await asyncio.gather(*[executor.execute("fake", "echo", {}, {}) for _ in range(10)])
+
+    assert len(FakeAdapter.instances) == 1
+    assert executor.adapters["fake"].calls == 10
+
+
+@pytest.mark.asyncio
+async def test_warm_up_initializes_registered_tools():
+    executor = await make_executor()
+    await executor.registry.register(
+        make_manifest(tool_id="broken"),
+        ToolImplementation(implementation_type="unknown", config={})
+    )
+
+    status = await executor.warm_up("all")
+
+    assert status == {"fake": True, "broken": False}
+    assert "fake" in executor.adapters
+
+
+@pytest.mark.asyncio
+async def test_executions_are_written_to_the_execution_log(tmp_path):
+    sink = ExecutionLogSink(str(tmp_path / "executions.db"), flush_size=2, max_result_bytes=64)
+    executor = await make_executor(execution_log=sink)
+
+    await executor.execute("fake", "echo", {"value": "short"}, {})
+    await executor.execute("fake", "echo", {"value": "x" * 100}, {})
+    with pytest.raises(ToolExecutionError):
+        await executor.execute("fake", "echo", {"fail": True}, {})
+    await executor.shutdown()
+
+    conn = sqlite3.connect(str(tmp_path / "executions.db"))
+    rows = conn.execute(
+        "SELECT result_truncated, result_hash, error FROM tool_executions ORDER BY created_at"
+    ).fetchall()
+    assert len(rows) == 3
+    assert sorted(row[0] for row in rows) == [0, 0, 1]
+    assert sum(row[2] is not None for row in rows) == 1
+    assert sink.get_stats()["written"] == 3
+
+
+@pytest.mark.asyncio
+async def test_execution_log_records_values_as_of_recording(tmp_path):
+    sink = ExecutionLogSink(str(tmp_path / "executions.db"))
+    parameters, result = {"value": "before"}, {"items": [1]}
+    sink.record(ExecutionRecord("id", "tool", "cap", None, parameters, result, None, 0.0, 0.0, False, False, 0.0))
+
+    parameters["value"] = "after"
+    result["items"].append(2)
+    await sink.flush()
+
+    await sink.close()
+
+    row = sqlite3.connect(str(tmp_path / "executions.db")).execute(
+        "SELECT parameters, result FROM tool_executions"
+    ).fetchone()
+    assert row == ('{"value": "before"}', '{"items": [1]}')
+
+
+def test_execution_log_records_large_results_as_fast_as_small_ones():
+    sink = ExecutionLogSink(":memory:", capacity=1000)
+    large = {"items": [{"id": i, "name": "item" * 10} for i in range(20000)]}
+
+    def fastest(result: Dict[str, Any]) -> float:
+        timings = []
+        for _ in range(50):
+            record = ExecutionRecord("id", "tool", "cap", None, {}, result, None, 0.0, 0.0, False, False, 0.0)
+            start = time.perf_counter()
+            sink.record(record)
+            timings.append(time.perf_counter() - start)
+        return min(timings)
+
+    assert fastest(large) < 5 * fastest({"value": 1})
+
+
+def test_execution_log_drops_records_when_full():
+    sink = ExecutionLogSink(":memory:", capacity=2)
+    record = ExecutionRecord("id", "tool", "cap", None, {}, {}, None, 0.0, 0.0, False, False, 0.0)
+
+    assert [sink.record(record) for _ in range(3)] == [True, True, False]
+    assert sink.get_stats()["dropped"] == 1